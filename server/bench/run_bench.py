@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Offline benchmarks for the Python daemon and the one-shot CLI.
+Starts the local stub server, drives mixed workloads through the daemon's
+stdin/stdout protocol (and the CLI through subprocesses), and writes
+requests/sec, p50/p99/p999 latency and process RSS as JSON. Pass a previous
+results file as --baseline to fail on throughput or tail-latency regressions.
+
+    python server/bench/run_bench.py --output bench.json
+    python server/bench/run_bench.py --baseline bench.json --tolerance 0.15
+
+--stream runs the daemon's market stream against a WebSocket stand-in;
+--ws-drop-every N cuts its connections every N seconds to exercise reconnects.
+
+    python server/bench/run_bench.py --stream --ws-drop-every 2 --workloads reads,mixed
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from stub_server import BASE_COINS, add_stub_arguments, config_from_args, start_stub
+from ws_stub import add_ws_arguments, start_ws_stub
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+
+from hyperliquid_framing import LineCodec, codec_for  # noqa: E402
+
+DAEMON_PATH = os.path.join(SERVER_DIR, "hyperliquid_daemon.py")
+CLI_PATH = os.path.join(SERVER_DIR, "hyperliquid_api.py")
+
+# Throwaway signing key; the stub accepts any signature
+BENCH_KEY = "0x" + "11" * 32
+BENCH_ADDRESS = "0x" + "ab" * 20
+
+WORKLOADS = ("reads", "order_burst", "cancel_storm", "mixed", "cli")
+READ_COMMANDS = ("get_all_mids", "get_l2_snapshot", "get_user_state", "get_open_orders")
+# Unlimited upstream budget: the benchmark measures the daemon, not the limiter
+UNLIMITED_BUDGETS = {"ip": 1e9, "exchange": 1e9, "info_light": 1e9, "info_heavy": 1e9}
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(1, math.ceil(q * len(sorted_values))) - 1]
+
+def summarize(latencies: List[float], duration: float, errors: int, throttled: int) -> Dict[str, Any]:
+    ms = sorted(v * 1000 for v in latencies)
+    return {
+        "requests": len(ms),
+        "errors": errors,
+        "throttled": throttled,
+        "duration_s": round(duration, 4),
+        "rps": round(len(ms) / duration, 2) if duration > 0 else None,
+        "latency_ms": {
+            "mean": round(sum(ms) / len(ms), 3) if ms else None,
+            "p50": percentile(ms, 0.50),
+            "p99": percentile(ms, 0.99),
+            "p999": percentile(ms, 0.999),
+            "max": ms[-1] if ms else None,
+        },
+    }
+
+def rss_kb(pid: int) -> Dict[str, Optional[int]]:
+    """Current and peak resident set size from /proc (None where unavailable)."""
+    out: Dict[str, Optional[int]] = {"rss_kb": None, "peak_rss_kb": None}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    out["rss_kb"] = int(line.split()[1])
+                elif line.startswith("VmHWM:"):
+                    out["peak_rss_kb"] = int(line.split()[1])
+    except OSError:
+        pass
+    return out
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SERVER_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+class DaemonClient:
+    """Drives one daemon process over its stdin/stdout protocol (line JSON or MessagePack frames)."""
+
+    def __init__(self, api_url: str, data_dir: str, options: argparse.Namespace):
+        init = {
+            "account_address": BENCH_ADDRESS,
+            "api_secret": BENCH_KEY,
+            "api_url": api_url,
+            "data_dir": data_dir,
+            "rate_limits": UNLIMITED_BUDGETS,
+            "trade_workers": options.trade_workers,
+            "read_workers": options.read_workers,
+            "max_pending_reads": options.max_pending_reads,
+        }
+        if options.sign_workers is not None:
+            init["sign_workers"] = options.sign_workers
+        if options.protocol != LineCodec.name:
+            init["protocol"] = options.protocol
+        if options.numeric:
+            init["numeric"] = True
+        if options.replay_dir:
+            speed = options.replay_speed if options.replay_speed == "max" else float(options.replay_speed)
+            init["replay"] = {"dir": options.replay_dir, "speed": speed, "loop": True}
+        elif options.record_dir:
+            init["record"] = {"dir": options.record_dir}
+        if options.ws_url:
+            init["stream"] = {"coins": BASE_COINS[:options.stream_coins], "ws_url": options.ws_url}
+        if options.no_cache:
+            init["cache_ttls"] = {command: 0 for command in READ_COMMANDS}
+        started = time.perf_counter()
+        self.proc = subprocess.Popen(
+            [sys.executable, DAEMON_PATH],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=None if options.verbose else subprocess.DEVNULL,
+        )
+        self.proc.stdin.write(json.dumps(init).encode() + b"\n")
+        self.proc.stdin.flush()
+        ready = json.loads(self.proc.stdout.readline() or b"{}")
+        if not ready.get("ready"):
+            raise RuntimeError(f"Daemon failed to start: {ready}")
+        self.startup_s = time.perf_counter() - started
+        self.codec = codec_for(ready.get("protocol", LineCodec.name))
+        self._frames = self.codec.frames(self.proc.stdout)
+        self._next_id = 0
+
+    def send(self, command: str, args: Dict[str, Any]) -> int:
+        self._next_id += 1
+        self.proc.stdin.write(self.codec.encode({"id": self._next_id, "command": command, "args": args}))
+        self.proc.stdin.flush()
+        return self._next_id
+
+    def recv(self) -> Dict[str, Any]:
+        while True:
+            frame = next(self._frames, None)
+            if frame is None:
+                raise RuntimeError("Daemon exited")
+            message = self.codec.decode(frame)
+            if "event" not in message:
+                return message
+
+    def call(self, command: str, args: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        self.send(command, args or {})
+        return self.recv()
+
+    def run(self, requests: Iterator[tuple], concurrency: int) -> Dict[str, Any]:
+        """Closed loop: keep `concurrency` requests outstanding until `requests` is exhausted."""
+        sent: Dict[int, float] = {}
+        latencies: List[float] = []
+        errors = throttled = 0
+
+        def send_next() -> bool:
+            item = next(requests, None)
+            if item is None:
+                return False
+            sent[self.send(*item)] = time.perf_counter()
+            return True
+
+        started = time.perf_counter()
+        for _ in range(concurrency):
+            if not send_next():
+                break
+        while sent:
+            response = self.recv()
+            latencies.append(time.perf_counter() - sent.pop(response.get("id")))
+            if not response.get("success"):
+                errors += 1
+                throttled += bool(response.get("throttled"))
+            send_next()
+        return summarize(latencies, time.perf_counter() - started, errors, throttled)
+
+    def close(self):
+        self.proc.stdin.close()
+        try:
+            self.proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+def coin(i: int) -> str:
+    return ("BTC", "ETH", "SOL")[i % 3]
+
+def read_requests(n: int) -> Iterator[tuple]:
+    for i in range(n):
+        command = READ_COMMANDS[i % len(READ_COMMANDS)]
+        yield (command, {"coin": coin(i)} if command == "get_l2_snapshot" else {})
+
+def order_requests(n: int) -> Iterator[tuple]:
+    for i in range(n):
+        yield ("place_order", {"coin": coin(i), "is_buy": i % 2 == 0, "sz": 0.01, "limit_px": 100.0 - i % 2 * 0.5 + 0.25})
+
+def cancel_requests(n: int, batch: int) -> Iterator[tuple]:
+    # Alternate single cancels with bulk cancels of `batch` orders
+    for i in range(n):
+        if i % 2:
+            yield ("bulk_cancel", {"cancels": [{"coin": coin(j), "oid": 1000 + i * batch + j} for j in range(batch)]})
+        else:
+            yield ("cancel_order", {"coin": coin(i), "oid": 1000 + i})
+
+def mixed_requests(n: int, trade_share: float) -> Iterator[tuple]:
+    reads, orders, cancels = read_requests(n), order_requests(n), cancel_requests(n, 5)
+    every = max(1, int(round(1 / trade_share))) if trade_share > 0 else 0
+    for i in range(n):
+        if every and i % every == 0:
+            yield next(orders) if (i // every) % 2 == 0 else next(cancels)
+        else:
+            yield next(reads)
+
+def bench_daemon(api_url: str, options: argparse.Namespace) -> Dict[str, Any]:
+    workloads: Dict[str, Callable[[DaemonClient], Dict[str, Any]]] = {
+        "reads": lambda d: d.run(read_requests(options.requests), options.concurrency),
+        # Bursts: the whole burst is written before any response is awaited
+        "order_burst": lambda d: d.run(order_requests(options.requests), options.burst),
+        "cancel_storm": lambda d: d.run(cancel_requests(options.requests, options.cancel_batch), options.burst),
+        "mixed": lambda d: d.run(mixed_requests(options.requests, options.trade_share), options.concurrency),
+    }
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="hl-bench-") as data_dir:
+        daemon = DaemonClient(api_url, data_dir, options)
+        try:
+            results["startup_s"] = round(daemon.startup_s, 4)
+            results.update(rss_kb(daemon.proc.pid))
+            for name, workload in workloads.items():
+                if name not in options.workloads:
+                    continue
+                # Warm connections and caches so the first sample is not an outlier
+                daemon.run(read_requests(options.concurrency), options.concurrency)
+                result = workload(daemon)
+                result.update(rss_kb(daemon.proc.pid))
+                results[name] = result
+            stats = daemon.call("stats")
+            results["daemon_stats"] = stats.get("data")
+            results["signing_stats"] = daemon.call("signing_stats").get("data")
+            if options.ws_url:
+                results["stream_status"] = daemon.call("stream_status").get("data")
+        finally:
+            daemon.close()
+    return results
+
+def bench_cli(api_url: str, options: argparse.Namespace) -> Dict[str, Any]:
+    """One process per request, as the non-daemon code path runs."""
+    env = dict(os.environ, HYPERLIQUID_API_URL=api_url)
+    commands = ["get_all_mids", "get_user_state", "get_open_orders"]
+    latencies: List[float] = []
+    peak_rss: List[int] = []
+    errors = 0
+    started = time.perf_counter()
+    for i in range(options.cli_requests):
+        call_started = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, CLI_PATH, commands[i % len(commands)], BENCH_ADDRESS, BENCH_KEY],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+        )
+        output = proc.stdout.read()
+        proc.stdout.close()
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss is in kilobytes on Linux
+            peak_rss.append(usage.ru_maxrss)
+        else:
+            proc.wait()
+        latencies.append(time.perf_counter() - call_started)
+        if proc.returncode != 0 or b'"error"' in output[:200]:
+            errors += 1
+    result = summarize(latencies, time.perf_counter() - started, errors, 0)
+    result["peak_rss_kb"] = max(peak_rss) if peak_rss else None
+    return result
+
+# Lower is worse for rps; higher is worse for latency
+REGRESSION_CHECKS = (("rps", -1), ("latency_ms.p50", 1), ("latency_ms.p99", 1))
+
+def _lookup(result: Dict[str, Any], path: str) -> Optional[float]:
+    for key in path.split("."):
+        result = result.get(key) if isinstance(result, dict) else None
+    return result
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Human-readable regressions of results against a baseline beyond `tolerance` (fractional)."""
+    regressions = []
+    for name in WORKLOADS:
+        current, previous = results["workloads"].get(name), baseline.get("workloads", {}).get(name)
+        if not current or not previous:
+            continue
+        for path, direction in REGRESSION_CHECKS:
+            new, old = _lookup(current, path), _lookup(previous, path)
+            if not new or not old:
+                continue
+            change = (new - old) / old
+            if change * direction > tolerance:
+                regressions.append(f"{name}.{path}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workloads", default=",".join(WORKLOADS), help=f"Comma-separated subset of {','.join(WORKLOADS)}")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per daemon workload")
+    parser.add_argument("--concurrency", type=int, default=32, help="Outstanding requests for read/mixed workloads")
+    parser.add_argument("--burst", type=int, default=64, help="Outstanding requests for order/cancel workloads")
+    parser.add_argument("--cancel-batch", type=int, default=20, help="Orders per bulk_cancel in the cancel storm")
+    parser.add_argument("--trade-share", type=float, default=0.2, help="Fraction of trades in the mixed workload")
+    parser.add_argument("--cli-requests", type=int, default=20, help="Subprocess invocations for the cli workload")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the daemon read cache (TTL 0)")
+    parser.add_argument("--trade-workers", type=int, default=4)
+    parser.add_argument("--read-workers", type=int, default=8)
+    parser.add_argument("--max-pending-reads", type=int, default=256)
+    parser.add_argument("--sign-workers", type=int, help="Signing processes (0 signs inline; default: daemon default)")
+    parser.add_argument("--protocol", choices=("line", "msgpack"), default="line", help="Daemon stdin/stdout framing")
+    parser.add_argument("--numeric", action="store_true", help="Ask the daemon for numeric price/size fields")
+    parser.add_argument("--record-dir", help="Record the daemon's upstream Info traffic here")
+    parser.add_argument("--replay-dir", help="Serve Info reads from recordings here instead of the stub")
+    parser.add_argument("--replay-speed", default="max", help="Replay pace: 1, N (times faster) or max")
+    parser.add_argument("--stream", action="store_true", help="Run the daemon's market stream against the WebSocket stub")
+    parser.add_argument("--stream-coins", type=int, default=3, help="Coins the market stream subscribes to")
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed fractional regression vs --baseline")
+    parser.add_argument("--verbose", action="store_true", help="Show daemon stderr")
+    add_stub_arguments(parser)
+    add_ws_arguments(parser)
+    options = parser.parse_args()
+    options.workloads = [w.strip() for w in options.workloads.split(",") if w.strip()]
+    unknown = set(options.workloads) - set(WORKLOADS)
+    if unknown:
+        parser.error(f"Unknown workloads: {', '.join(sorted(unknown))}")
+
+    stub = start_stub(config_from_args(options))
+    # Shares the REST stub's data, so resnapshots after a drop agree with the stream
+    ws = start_ws_stub(stub.data, options.ws_tick_ms, options.ws_drop_every) if options.stream else None
+    options.ws_url = ws.url if ws else None
+    try:
+        workloads = bench_daemon(stub.url, options)
+        if "cli" in options.workloads:
+            workloads["cli"] = bench_cli(stub.url, options)
+    finally:
+        stub.shutdown()
+        if ws is not None:
+            ws.shutdown()
+
+    results = {
+        "timestamp": int(time.time()),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": {k: v for k, v in vars(options).items() if k not in ("output", "baseline", "verbose")},
+        "stub": stub.config.to_dict(),
+        "upstream_requests": dict(stub.counts),
+        "ws_stub": ws.stats() if ws else None,
+        "workloads": workloads,
+    }
+    text = json.dumps(results, indent=2)
+    if options.output:
+        with open(options.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if options.baseline:
+        with open(options.baseline) as f:
+            regressions = compare(results, json.load(f), options.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Hyperliquid REST API used by the benchmarks.
+Answers /info and /exchange with synthetic data of configurable size after a
+configurable delay, so the daemon and CLI can be measured without mainnet.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+DEFAULT_LATENCY_MS = 20.0
+DEFAULT_JITTER_MS = 5.0
+DEFAULT_BOOK_LEVELS = 20
+DEFAULT_FILLS = 500
+DEFAULT_OPEN_ORDERS = 50
+DEFAULT_POSITIONS = 5
+DEFAULT_ASSETS = 150
+
+# First asset names; the rest of the universe is filled with synthetic coins
+BASE_COINS = ["BTC", "ETH", "SOL", "ARB", "DOGE", "AVAX", "OP", "LINK", "MATIC", "ATOM"]
+
+class StubConfig:
+    def __init__(
+        self,
+        latency_ms: float = DEFAULT_LATENCY_MS,
+        jitter_ms: float = DEFAULT_JITTER_MS,
+        exchange_latency_ms: Optional[float] = None,
+        book_levels: int = DEFAULT_BOOK_LEVELS,
+        fills: int = DEFAULT_FILLS,
+        open_orders: int = DEFAULT_OPEN_ORDERS,
+        positions: int = DEFAULT_POSITIONS,
+        assets: int = DEFAULT_ASSETS,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.exchange_latency_ms = latency_ms if exchange_latency_ms is None else exchange_latency_ms
+        self.book_levels = book_levels
+        self.fills = fills
+        self.open_orders = open_orders
+        self.positions = positions
+        self.assets = max(assets, len(BASE_COINS))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+class StubData:
+    """Synthetic responses, built once per config and reused for every request."""
+
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self.coins = BASE_COINS + [f"COIN{i}" for i in range(config.assets - len(BASE_COINS))]
+        self.mids = {coin: str(round(100.0 + i * 7.5, 2)) for i, coin in enumerate(self.coins)}
+        self.meta = {"universe": [{"name": coin, "szDecimals": 3, "maxLeverage": 20} for coin in self.coins]}
+        self.spot_meta = {
+            "tokens": [
+                {"name": "USDC", "szDecimals": 8, "weiDecimals": 8, "index": 0},
+                {"name": "PURR", "szDecimals": 0, "weiDecimals": 5, "index": 1},
+            ],
+            "universe": [{"name": "PURR/USDC", "tokens": [1, 0], "index": 0}],
+        }
+        now = int(time.time() * 1000)
+        self.fills = [
+            {
+                "coin": self.coins[i % 3], "px": str(100 + i % 7), "sz": "0.1", "side": "B" if i % 2 else "A",
+                "time": now - (config.fills - i) * 60_000, "startPosition": "0", "dir": "Close Long",
+                "closedPnl": str(i % 5 - 2), "hash": "0x%064x" % i, "oid": i, "tid": i, "fee": "0.01", "crossed": True,
+            }
+            for i in range(config.fills)
+        ]
+        self.open_orders = [
+            {"coin": self.coins[i % 3], "oid": i + 1, "side": "B" if i % 2 else "A", "limitPx": str(90 + i % 10),
+             "sz": "0.1", "timestamp": now - i * 1000}
+            for i in range(config.open_orders)
+        ]
+        self.user_state = {
+            "assetPositions": [
+                {
+                    "type": "oneWay",
+                    "position": {
+                        "coin": self.coins[i], "szi": "1.0", "entryPx": self.mids[self.coins[i]],
+                        "liquidationPx": str(float(self.mids[self.coins[i]]) * 0.5), "marginUsed": "10",
+                        "positionValue": self.mids[self.coins[i]], "unrealizedPnl": "0", "leverage": {"type": "cross", "value": 10},
+                    },
+                }
+                for i in range(min(config.positions, len(self.coins)))
+            ],
+            "marginSummary": {"accountValue": "100000", "totalMarginUsed": "50", "totalNtlPos": "1000", "totalRawUsd": "100000"},
+            "crossMarginSummary": {"accountValue": "100000", "totalMarginUsed": "50", "totalNtlPos": "1000", "totalRawUsd": "100000"},
+            "withdrawable": "99950",
+            "time": now,
+        }
+
+    def book(self, coin: str) -> Dict[str, Any]:
+        mid = float(self.mids.get(coin, "100"))
+        levels = self.config.book_levels
+        return {
+            "coin": coin,
+            "time": int(time.time() * 1000),
+            "levels": [
+                [{"px": str(round(mid - 0.01 * (i + 1), 2)), "sz": "1.0", "n": 1} for i in range(levels)],
+                [{"px": str(round(mid + 0.01 * (i + 1), 2)), "sz": "1.0", "n": 1} for i in range(levels)],
+            ],
+        }
+
+    def info(self, body: Dict[str, Any]) -> Any:
+        kind = body.get("type")
+        if kind == "meta":
+            return self.meta
+        if kind == "spotMeta":
+            return self.spot_meta
+        if kind == "allMids":
+            return self.mids
+        if kind == "l2Book":
+            return self.book(body.get("coin", "BTC"))
+        if kind == "clearinghouseState":
+            return self.user_state
+        if kind in ("openOrders", "frontendOpenOrders"):
+            return self.open_orders
+        if kind == "userFills":
+            return self.fills
+        if kind == "userFillsByTime":
+            start, end = body.get("startTime", 0), body.get("endTime") or float("inf")
+            return [f for f in self.fills if start <= f["time"] <= end][:2000]
+        return []
+
+    def exchange(self, body: Dict[str, Any]) -> Any:
+        action = body.get("action", {})
+        kind = action.get("type")
+        if kind == "order":
+            statuses = [{"resting": {"oid": random.randint(1, 2**40)}} for _ in action.get("orders", [])]
+        elif kind in ("cancel", "cancelByCloid", "batchModify"):
+            statuses = ["success" for _ in action.get("cancels") or action.get("modifies") or []]
+        else:
+            return {"status": "ok", "response": {"type": "default"}}
+        return {"status": "ok", "response": {"type": kind, "data": {"statuses": statuses}}}
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config: StubConfig):
+        super().__init__(address, _Handler)
+        self.config = config
+        self.data = StubData(config)
+        self.counts: Dict[str, int] = {}
+        self._counts_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, kind: str):
+        with self._counts_lock:
+            self.counts[kind] = self.counts.get(kind, 0) + 1
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server: StubServer = self.server
+        config = server.config
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path == "/exchange":
+            server.count("exchange:" + str(body.get("action", {}).get("type")))
+            latency = config.exchange_latency_ms
+            result = server.data.exchange(body)
+        elif self.path == "/info":
+            server.count("info:" + str(body.get("type")))
+            latency = config.latency_ms
+            result = server.data.info(body)
+        else:
+            self.send_error(404)
+            return
+        delay = latency + random.uniform(-config.jitter_ms, config.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        payload = json.dumps(result).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        # Request counts by endpoint/type, for checking what a run sent upstream
+        payload = json.dumps(self.server.counts).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+def start_stub(config: StubConfig, host: str = "127.0.0.1", port: int = 0) -> StubServer:
+    """Serve on a background thread; port 0 picks a free port (see .url)."""
+    server = StubServer((host, port), config)
+    threading.Thread(target=server.serve_forever, name="stub-server", daemon=True).start()
+    return server
+
+def add_stub_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency-ms", type=float, default=DEFAULT_LATENCY_MS, help="Delay before each /info response")
+    parser.add_argument("--jitter-ms", type=float, default=DEFAULT_JITTER_MS, help="Uniform +/- jitter on every delay")
+    parser.add_argument("--exchange-latency-ms", type=float, default=None, help="Delay for /exchange (default: --latency-ms)")
+    parser.add_argument("--book-levels", type=int, default=DEFAULT_BOOK_LEVELS, help="Levels per side in l2Book")
+    parser.add_argument("--fills", type=int, default=DEFAULT_FILLS, help="Fills returned by userFills")
+    parser.add_argument("--open-orders", type=int, default=DEFAULT_OPEN_ORDERS, help="Orders returned by openOrders")
+    parser.add_argument("--positions", type=int, default=DEFAULT_POSITIONS, help="Positions in clearinghouseState")
+    parser.add_argument("--assets", type=int, default=DEFAULT_ASSETS, help="Perp assets in meta/allMids")
+
+def config_from_args(args: argparse.Namespace) -> StubConfig:
+    return StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        exchange_latency_ms=args.exchange_latency_ms,
+        book_levels=args.book_levels,
+        fills=args.fills,
+        open_orders=args.open_orders,
+        positions=args.positions,
+        assets=args.assets,
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18080)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    server = StubServer((args.host, args.port), config_from_args(args))
+    print(json.dumps({"url": server.url, "config": server.config.to_dict()}), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Hyperliquid WebSocket API used by the benchmarks.
+Serves allMids, l2Book and trades subscriptions from the REST stub's
+synthetic data, moving mids every tick, and can drop every connection on a
+timer (or on demand) so the daemon's reconnect and REST resnapshot path can
+be exercised without mainnet. Standard library only.
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import Any, Dict, List, Set
+
+from stub_server import StubData, add_stub_arguments, config_from_args, start_stub
+
+DEFAULT_TICK_MS = 100.0
+# 0 never drops on a timer
+DEFAULT_DROP_EVERY_S = 0.0
+# Relative mid move per tick, uniform in +/- this
+MID_STEP = 0.0005
+
+_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_TEXT, _CLOSE, _PING, _PONG = 0x1, 0x8, 0x9, 0xA
+
+def _read_exact(sock: socket.socket, n: int) -> bytes:
+    data = b""
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            raise ConnectionError("client closed the connection")
+        data += chunk
+    return data
+
+def _frame(opcode: int, payload: bytes) -> bytes:
+    """One unmasked, unfragmented server frame."""
+    n = len(payload)
+    if n < 126:
+        header = struct.pack(">BB", 0x80 | opcode, n)
+    elif n < 1 << 16:
+        header = struct.pack(">BBH", 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack(">BBQ", 0x80 | opcode, 127, n)
+    return header + payload
+
+class _Connection:
+    """One client: its subscriptions, and a lock so ticks and replies never interleave frames."""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.mids = False
+        self.books: Set[str] = set()
+        self.trades: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def send(self, message: Any):
+        with self._lock:
+            self.sock.sendall(_frame(_TEXT, json.dumps(message).encode()))
+
+    def send_raw(self, frame: bytes):
+        with self._lock:
+            self.sock.sendall(frame)
+
+    def read_frame(self):
+        """(opcode, payload) of the next client frame; clients always mask."""
+        b0, b1 = _read_exact(self.sock, 2)
+        length = b1 & 0x7F
+        if length == 126:
+            (length,) = struct.unpack(">H", _read_exact(self.sock, 2))
+        elif length == 127:
+            (length,) = struct.unpack(">Q", _read_exact(self.sock, 8))
+        mask = _read_exact(self.sock, 4) if b1 & 0x80 else b"\0\0\0\0"
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(_read_exact(self.sock, length)))
+        return b0 & 0x0F, payload
+
+class WsStubServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self, address, data: StubData, tick_ms: float = DEFAULT_TICK_MS, drop_every_s: float = DEFAULT_DROP_EVERY_S
+    ):
+        super().__init__(address, _Handler)
+        self.data = data
+        self.tick_ms = tick_ms
+        self.drop_every_s = drop_every_s
+        self._connections: List[_Connection] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._tid = 0
+        self.connections = 0
+        self.drops = 0
+        self.messages = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"ws://{host}:{port}/ws"
+
+    def add(self, connection: _Connection):
+        with self._lock:
+            self._connections.append(connection)
+            self.connections += 1
+
+    def remove(self, connection: _Connection):
+        with self._lock:
+            if connection in self._connections:
+                self._connections.remove(connection)
+
+    def drop(self, clean: bool = False) -> int:
+        """
+        Cut every open connection: abruptly (as a network failure looks to the
+        client) or, with clean, with a close frame first. Returns how many.
+        """
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self.drops += len(connections)
+        for connection in connections:
+            try:
+                if clean:
+                    connection.send_raw(_frame(_CLOSE, struct.pack(">H", 1001)))
+                connection.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        return len(connections)
+
+    def send(self, connection: _Connection, message: Any):
+        try:
+            connection.send(message)
+            with self._lock:
+                self.messages += 1
+        except OSError:
+            self.remove(connection)
+
+    # ------------------------------------------------------------------
+    # Market simulation
+    # ------------------------------------------------------------------
+
+    def _move_mids(self):
+        mids = {}
+        for coin, mid in self.data.mids.items():
+            mids[coin] = str(round(float(mid) * (1 + random.uniform(-MID_STEP, MID_STEP)), 2))
+        # Swapped whole, so REST resnapshots served by the HTTP stub read one consistent set
+        self.data.mids = mids
+
+    def _trade(self, coin: str) -> Dict[str, Any]:
+        self._tid += 1
+        return {
+            "coin": coin, "side": random.choice("AB"), "px": self.data.mids.get(coin, "100"),
+            "sz": str(round(random.uniform(0.01, 2.0), 3)), "time": int(time.time() * 1000),
+            "hash": "0x%064x" % self._tid, "tid": self._tid,
+            "users": ["0x%040x" % random.getrandbits(160), "0x%040x" % random.getrandbits(160)],
+        }
+
+    def _tick(self):
+        self._move_mids()
+        with self._lock:
+            connections = list(self._connections)
+        books: Dict[str, Any] = {}
+        for connection in connections:
+            if connection.mids:
+                self.send(connection, {"channel": "allMids", "data": {"mids": self.data.mids}})
+            for coin in list(connection.books):
+                if coin not in books:
+                    books[coin] = self.data.book(coin)
+                self.send(connection, {"channel": "l2Book", "data": books[coin]})
+            for coin in list(connection.trades):
+                self.send(connection, {"channel": "trades", "data": [self._trade(coin)]})
+
+    def _run(self):
+        next_drop = time.monotonic() + self.drop_every_s if self.drop_every_s > 0 else None
+        while not self._stop.wait(self.tick_ms / 1000):
+            self._tick()
+            if next_drop is not None and time.monotonic() >= next_drop:
+                self.drop()
+                next_drop = time.monotonic() + self.drop_every_s
+
+    def start_feed(self):
+        threading.Thread(target=self._run, name="ws-stub-feed", daemon=True).start()
+
+    def shutdown(self):
+        self._stop.set()
+        self.drop()
+        super().shutdown()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "url": self.url,
+                "open": len(self._connections),
+                "connections": self.connections,
+                "dropped": self.drops,
+                "messages": self.messages,
+                "tick_ms": self.tick_ms,
+                "drop_every_s": self.drop_every_s,
+            }
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server: WsStubServer = self.server
+        if not self._handshake():
+            return
+        connection = _Connection(self.request)
+        server.add(connection)
+        try:
+            while True:
+                opcode, payload = connection.read_frame()
+                if opcode == _CLOSE:
+                    connection.send_raw(_frame(_CLOSE, payload[:2]))
+                    return
+                if opcode == _PING:
+                    connection.send_raw(_frame(_PONG, payload))
+                elif opcode == _TEXT:
+                    self._on_message(connection, json.loads(payload))
+        except (ConnectionError, OSError, ValueError):
+            pass
+        finally:
+            server.remove(connection)
+
+    def _handshake(self) -> bool:
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = self.request.recv(4096)
+            if not chunk:
+                return False
+            request += chunk
+        headers = {}
+        for line in request.split(b"\r\n")[1:]:
+            name, _, value = line.partition(b":")
+            headers[name.strip().lower()] = value.strip()
+        key = headers.get(b"sec-websocket-key")
+        if key is None:
+            self.request.sendall(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            return False
+        accept = base64.b64encode(hashlib.sha1(key + _GUID).digest())
+        self.request.sendall(
+            b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n"
+        )
+        return True
+
+    def _on_message(self, connection: _Connection, message: Dict[str, Any]):
+        server: WsStubServer = self.server
+        method = message.get("method")
+        if method == "ping":
+            server.send(connection, {"channel": "pong"})
+            return
+        subscription = message.get("subscription") or {}
+        if method not in ("subscribe", "unsubscribe"):
+            return
+        subscribe = method == "subscribe"
+        kind, coin = subscription.get("type"), subscription.get("coin")
+        if kind == "allMids":
+            connection.mids = subscribe
+        elif kind in ("l2Book", "trades"):
+            coins = connection.books if kind == "l2Book" else connection.trades
+            (coins.add if subscribe else coins.discard)(coin)
+        server.send(connection, {"channel": "subscriptionResponse", "data": message})
+        # As upstream, a new subscription starts with a snapshot
+        if subscribe and kind == "allMids":
+            server.send(connection, {"channel": "allMids", "data": {"mids": server.data.mids}})
+        elif subscribe and kind == "l2Book":
+            server.send(connection, {"channel": "l2Book", "data": server.data.book(coin)})
+
+def start_ws_stub(
+    data: StubData, tick_ms: float = DEFAULT_TICK_MS, drop_every_s: float = DEFAULT_DROP_EVERY_S,
+    host: str = "127.0.0.1", port: int = 0,
+) -> WsStubServer:
+    """Serve and publish on background threads; pass the REST stub's data so both agree on prices."""
+    server = WsStubServer((host, port), data, tick_ms, drop_every_s)
+    threading.Thread(target=server.serve_forever, name="ws-stub-server", daemon=True).start()
+    server.start_feed()
+    return server
+
+def add_ws_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--ws-tick-ms", type=float, default=DEFAULT_TICK_MS, help="Interval between pushed updates")
+    parser.add_argument("--ws-drop-every", type=float, default=DEFAULT_DROP_EVERY_S,
+                        help="Drop every WebSocket connection this often, in seconds (0: never)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18081)
+    parser.add_argument("--rest-port", type=int, default=18080, help="Port of the REST stub served alongside")
+    add_ws_arguments(parser)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    rest = start_stub(config_from_args(args), args.host, args.rest_port)
+    server = WsStubServer((args.host, args.port), rest.data, args.ws_tick_ms, args.ws_drop_every)
+    server.start_feed()
+    print(json.dumps({"url": server.url, "rest_url": rest.url, "config": rest.config.to_dict()}), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@
  */
 
 import { spawn } from "child_process";
+import net from "net";
 import path from "path";
 import { fileURLToPath } from "url";
 import { dirname } from "path";
@@ -14,14 +15,144 @@ const PYTHON_SCRIPT = path.join(__dirname, "hyperliquid_api.py");
 const ACCOUNT_ADDRESS = process.env.HYPERLIQUID_ACCOUNT_ADDRESS || "";
 const API_SECRET = process.env.HYPERLIQUID_API_SECRET || "";
 const USE_TESTNET = process.env.HYPERLIQUID_TESTNET === "true";
+// Unix socket of a running `hyperliquid_api.py serve` process. When set, calls
+// go to that warm process instead of spawning Python per call.
+const API_SOCKET = process.env.HYPERLIQUID_API_SOCKET || "";
+// A wedged server would otherwise leave callers waiting forever
+const API_SOCKET_TIMEOUT_MS = Number(process.env.HYPERLIQUID_API_SOCKET_TIMEOUT_MS) || 30_000;
+
+type PythonArg = string | number | boolean | object | null | undefined;
+
+interface PendingRequest {
+  resolve: (value: any) => void;
+  reject: (error: Error) => void;
+  timer: NodeJS.Timeout;
+}
 
 /**
- * Execute Python command and return parsed JSON result
+ * Multiplexed connection to the API socket server: requests are id-tagged
+ * JSON lines and responses may arrive in any order. A request unanswered
+ * after timeoutMs fails, and the connection is reset since the server
+ * behind it can no longer be trusted to answer.
+ */
+class ApiSocketClient {
+  private socket: net.Socket | null = null;
+  private connecting: Promise<net.Socket> | null = null;
+  private pending = new Map<number, PendingRequest>();
+  private nextId = 1;
+  private buffer = "";
+
+  constructor(private socketPath: string, private timeoutMs: number) {}
+
+  private connect(): Promise<net.Socket> {
+    if (this.socket) return Promise.resolve(this.socket);
+    if (this.connecting) return this.connecting;
+
+    this.connecting = new Promise((resolve, reject) => {
+      const socket = net.createConnection(this.socketPath);
+      socket.setEncoding("utf8");
+      socket.once("connect", () => {
+        this.socket = socket;
+        this.connecting = null;
+        resolve(socket);
+      });
+      socket.on("data", (chunk: string) => this.onData(chunk));
+      socket.on("error", (error) => {
+        if (this.connecting) {
+          this.connecting = null;
+          reject(error);
+        }
+      });
+      socket.on("close", () => {
+        this.socket = null;
+        this.buffer = "";
+        const error = new Error("API socket closed");
+        Array.from(this.pending.values()).forEach((p) => {
+          clearTimeout(p.timer);
+          p.reject(error);
+        });
+        this.pending.clear();
+      });
+    });
+    return this.connecting;
+  }
+
+  private onData(chunk: string) {
+    this.buffer += chunk;
+    let newline: number;
+    while ((newline = this.buffer.indexOf("\n")) >= 0) {
+      const line = this.buffer.slice(0, newline);
+      this.buffer = this.buffer.slice(newline + 1);
+      if (!line.trim()) continue;
+
+      let response: any;
+      try {
+        response = JSON.parse(line);
+      } catch {
+        console.error("[Hyperliquid] Unparseable API socket line:", line.slice(0, 200));
+        continue;
+      }
+      const pending = this.pending.get(response.id);
+      if (!pending) continue;
+      this.pending.delete(response.id);
+      clearTimeout(pending.timer);
+      if (!response.success) {
+        pending.reject(new Error(response.error || "Unknown error"));
+      } else if (response.data && response.data.error) {
+        pending.reject(new Error(response.data.error));
+      } else {
+        pending.resolve(response.data);
+      }
+    }
+  }
+
+  async request<T = any>(command: string, args: PythonArg[]): Promise<T> {
+    const socket = await this.connect();
+    const id = this.nextId++;
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        this.pending.delete(id);
+        reject(new Error(`API socket request ${command} timed out after ${this.timeoutMs}ms`));
+        // Fails every other call on this connection; the next request reconnects
+        socket.destroy();
+      }, this.timeoutMs);
+      this.pending.set(id, { resolve, reject, timer });
+      socket.write(JSON.stringify({ id, command, args }) + "\n");
+    });
+  }
+}
+
+const apiSocket = API_SOCKET ? new ApiSocketClient(API_SOCKET, API_SOCKET_TIMEOUT_MS) : null;
+
+/**
+ * Execute Python command and return parsed JSON result.
+ * Args are passed typed over the socket and as strings to a spawned process.
  */
 async function executePythonCommand<T = any>(
   command: string,
-  ...args: string[]
+  ...args: PythonArg[]
 ): Promise<T> {
+  if (apiSocket) {
+    try {
+      return await apiSocket.request<T>(command, args);
+    } catch (error: any) {
+      // No server listening: fall back to a one-shot process
+      if (error.code !== "ENOENT" && error.code !== "ECONNREFUSED") throw error;
+    }
+  }
+  return spawnPythonCommand<T>(command, args);
+}
+
+function toArgv(args: PythonArg[]): string[] {
+  const argv = args.map((arg) =>
+    arg === undefined || arg === null ? "" : typeof arg === "object" ? JSON.stringify(arg) : String(arg)
+  );
+  // Trailing optional arguments are left off rather than passed empty
+  while (argv.length && argv[argv.length - 1] === "") argv.pop();
+  return argv;
+}
+
+function spawnPythonCommand<T = any>(command: string, args: PythonArg[]): Promise<T> {
   return new Promise((resolve, reject) => {
     const pythonArgs = [
       PYTHON_SCRIPT,
@@ -29,7 +160,7 @@ async function executePythonCommand<T = any>(
       ACCOUNT_ADDRESS,
       API_SECRET,
       USE_TESTNET.toString(),
-      ...args,
+      ...toArgv(args),
     ];
 
     const process = spawn("python3.11", pythonArgs);
@@ -173,15 +304,15 @@ export interface OrderResult {
 // ============================================================================
 
 export async function getUserState(address?: string): Promise<UserState> {
-  return executePythonCommand("get_user_state");
+  return executePythonCommand("get_user_state", address);
 }
 
 export async function getOpenOrders(address?: string): Promise<OpenOrder[]> {
-  return executePythonCommand("get_open_orders");
+  return executePythonCommand("get_open_orders", address);
 }
 
 export async function getUserFills(address?: string): Promise<Fill[]> {
-  return executePythonCommand("get_user_fills");
+  return executePythonCommand("get_user_fills", address);
 }
 
 // ============================================================================
@@ -214,10 +345,7 @@ export async function getCandlesSnapshot(
   startTime?: number,
   endTime?: number
 ): Promise<any[]> {
-  const args = [coin, interval];
-  if (startTime) args.push(startTime.toString());
-  if (endTime) args.push(endTime.toString());
-  return executePythonCommand("get_candles_snapshot", ...args);
+  return executePythonCommand("get_candles_snapshot", coin, interval, startTime, endTime);
 }
 
 // ============================================================================
@@ -230,13 +358,7 @@ export async function placeMarketOrder(
   size: number,
   slippage: number = 0.05
 ): Promise<OrderResult> {
-  return executePythonCommand(
-    "place_market_order",
-    coin,
-    isBuy.toString(),
-    size.toString(),
-    slippage.toString()
-  );
+  return executePythonCommand("place_market_order", coin, isBuy, size, slippage);
 }
 
 export async function placeLimitOrder(
@@ -247,23 +369,24 @@ export async function placeLimitOrder(
   reduceOnly: boolean = false,
   cloid?: string
 ): Promise<OrderResult> {
-  const args = [
+  return executePythonCommand(
+    "place_order",
     coin,
-    isBuy.toString(),
-    size.toString(),
-    price.toString(),
-    reduceOnly.toString(),
-  ];
-  if (cloid) args.push(cloid);
-  return executePythonCommand("place_limit_order", ...args);
+    isBuy,
+    size,
+    price,
+    { limit: { tif: "Gtc" } },
+    reduceOnly,
+    cloid
+  );
 }
 
 export async function cancelOrder(coin: string, oid: number): Promise<any> {
-  return executePythonCommand("cancel_order", coin, oid.toString());
+  return executePythonCommand("cancel_order", coin, oid);
 }
 
 export async function cancelAllOrders(coin?: string): Promise<any> {
-  return executePythonCommand("cancel_all_orders", coin || "");
+  return executePythonCommand("cancel_all_orders", coin);
 }
 
 export async function updateLeverage(
@@ -271,12 +394,7 @@ export async function updateLeverage(
   leverage: number,
   isCross: boolean = true
 ): Promise<any> {
-  return executePythonCommand(
-    "update_leverage",
-    coin,
-    leverage.toString(),
-    isCross.toString()
-  );
+  return executePythonCommand("update_leverage", coin, leverage, isCross);
 }
 
 export async function placeStopLossOrder(
@@ -286,16 +404,7 @@ export async function placeStopLossOrder(
   triggerPrice: number,
   limitPrice?: number
 ): Promise<any> {
-  const args = [
-    coin,
-    isBuy.toString(),
-    size.toString(),
-    triggerPrice.toString(),
-  ];
-  if (limitPrice !== undefined) {
-    args.push(limitPrice.toString());
-  }
-  return executePythonCommand("place_stop_loss_order", ...args);
+  return executePythonCommand("place_stop_loss_order", coin, isBuy, size, triggerPrice, limitPrice);
 }
 
 export async function placeTakeProfitOrder(
@@ -305,16 +414,7 @@ export async function placeTakeProfitOrder(
   triggerPrice: number,
   limitPrice?: number
 ): Promise<any> {
-  const args = [
-    coin,
-    isBuy.toString(),
-    size.toString(),
-    triggerPrice.toString(),
-  ];
-  if (limitPrice !== undefined) {
-    args.push(limitPrice.toString());
-  }
-  return executePythonCommand("place_take_profit_order", ...args);
+  return executePythonCommand("place_take_profit_order", coin, isBuy, size, triggerPrice, limitPrice);
 }
 
 export async function placeBracketOrder(
@@ -328,11 +428,11 @@ export async function placeBracketOrder(
   return executePythonCommand(
     "place_bracket_order",
     coin,
-    isBuy.toString(),
-    size.toString(),
-    entryPrice.toString(),
-    stopLossPrice.toString(),
-    takeProfitPrice.toString()
+    isBuy,
+    size,
+    entryPrice,
+    stopLossPrice,
+    takeProfitPrice
   );
 }
 
@@ -344,11 +444,7 @@ export async function usdTransfer(
   destination: string,
   amount: number
 ): Promise<any> {
-  return executePythonCommand(
-    "usd_transfer",
-    destination,
-    amount.toString()
-  );
+  return executePythonCommand("usd_transfer", destination, amount);
 }
 
 export async function spotTransfer(
@@ -368,11 +464,7 @@ export async function withdrawFromBridge(
   destination: string,
   amount: number
 ): Promise<any> {
-  return executePythonCommand(
-    "withdraw_from_bridge",
-    destination,
-    amount.toString()
-  );
+  return executePythonCommand("withdraw_from_bridge", destination, amount);
 }
 
 export async function getSpotBalances(): Promise<any> {
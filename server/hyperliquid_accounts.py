@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Multi-account credentials and a bounded pool of per-address Exchange clients.
+Accounts are registered at runtime; Exchange objects are built on first use,
+share the daemon's Info client and are evicted least-recently-used.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from eth_account import Account
+from eth_account.signers.local import LocalAccount
+from hyperliquid.exchange import Exchange
+from hyperliquid.info import Info
+
+DEFAULT_MAX_CLIENTS = 64
+
+# The Info an Exchange builds for itself is replaced by the shared one, so it
+# is constructed from empty metadata instead of fetching meta per account.
+_EMPTY_META = {"universe": []}
+_EMPTY_SPOT_META = {"universe": [], "tokens": []}
+
+class Credentials(NamedTuple):
+    address: str
+    secret: str
+    vault_address: Optional[str]
+
+def normalize_address(address: str) -> str:
+    address = (address or "").lower()
+    if not re.fullmatch(r"0x[0-9a-f]{40}", address):
+        raise ValueError(f"Invalid address: {address}")
+    return address
+
+class AccountPool:
+    """
+    Registered accounts by address, with an LRU pool of their Exchange clients.
+
+    Only credentials are kept for every account; wallets and Exchange clients
+    exist for at most max_clients accounts at a time and are rebuilt on demand.
+    """
+
+    def __init__(self, api_url: str, info: Info, max_clients: int = DEFAULT_MAX_CLIENTS):
+        self.api_url = api_url
+        self.info = info
+        self.max_clients = max_clients
+        self.default: Optional[str] = None
+        self._credentials: Dict[str, Credentials] = {}
+        self._clients: "OrderedDict[str, Exchange]" = OrderedDict()
+        # Key derivation is slow; wallets outlive their pooled Exchange clients
+        self._wallets: Dict[str, LocalAccount] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def register(self, address: str, secret: str, vault_address: Optional[str] = None, default: bool = False) -> Dict[str, Any]:
+        """Add or replace an account. The secret may be the account's own key or an agent key."""
+        address = normalize_address(address)
+        wallet = Account.from_key(secret)
+        signer = wallet.address
+        with self._lock:
+            self._credentials[address] = Credentials(address, secret, vault_address)
+            self._wallets[address] = wallet
+            # Replaced credentials must not keep signing with the old wallet
+            self._clients.pop(address, None)
+            if default or self.default is None:
+                self.default = address
+        return {"address": address, "signer": signer, "vault_address": vault_address}
+
+    def unregister(self, address: str) -> bool:
+        address = normalize_address(address)
+        with self._lock:
+            self._clients.pop(address, None)
+            self._wallets.pop(address, None)
+            removed = self._credentials.pop(address, None) is not None
+            if self.default == address:
+                self.default = None
+        return removed
+
+    def resolve(self, account: Optional[str] = None) -> str:
+        """Address of the named account, or the default one."""
+        if account:
+            return normalize_address(account)
+        if self.default is None:
+            raise ValueError("No account given and no default account registered")
+        return self.default
+
+    def _build(self, credentials: Credentials) -> Exchange:
+        with self._lock:
+            wallet = self._wallets.get(credentials.address)
+        if wallet is None:
+            wallet = Account.from_key(credentials.secret)
+        account_address = credentials.address if wallet.address.lower() != credentials.address else None
+        exchange = Exchange(
+            wallet,
+            self.api_url,
+            meta=_EMPTY_META,
+            spot_meta=_EMPTY_SPOT_META,
+            vault_address=credentials.vault_address,
+            account_address=account_address,
+        )
+        exchange.info = self.info
+        exchange.session = self.info.session
+        return exchange
+
+    def exchange(self, account: Optional[str] = None) -> Exchange:
+        """Exchange client for an account, building it if it is not pooled."""
+        address = self.resolve(account)
+        with self._lock:
+            exchange = self._clients.get(address)
+            if exchange is not None:
+                self._clients.move_to_end(address)
+                self.hits += 1
+                return exchange
+            credentials = self._credentials.get(address)
+            if credentials is None:
+                raise ValueError(f"Account {address} is not registered")
+            self.misses += 1
+        exchange = self._build(credentials)
+        with self._lock:
+            # Keep a client built concurrently for the same account
+            exchange = self._clients.setdefault(address, exchange)
+            self._clients.move_to_end(address)
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+                self.evictions += 1
+        return exchange
+
+    def registered(self, address: str) -> bool:
+        with self._lock:
+            return (address or "").lower() in self._credentials
+
+    def addresses(self) -> List[str]:
+        with self._lock:
+            return list(self._credentials)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "accounts": len(self._credentials),
+                "default": self.default,
+                "pooled": len(self._clients),
+                "max_clients": self.max_clients,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Vectorized portfolio analytics over the local fills/funding ledger.
+Computes the stats behind server/performance_metrics.ts (plus Sortino, the
+drawdown curve and fee/funding attribution) with NumPy array operations
+instead of per-trade loops.
+"""
+
+import datetime
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DAY_MS = 86_400_000
+# Day 4 since the epoch (1970-01-05) is a Monday, the start of an ISO week
+EPOCH_MONDAY = 4
+# Daily ratios are annualized over calendar days: perps trade every day
+PERIODS_PER_YEAR = 365
+DEFAULT_CURVE_POINTS = 500
+MAX_CACHED_QUERIES = 16
+
+# JSON paths pulled from the ledger for each kind, in the order compute_metrics expects
+FILL_PATHS = ["$.coin", "$.px", "$.sz", "$.closedPnl", "$.fee", "$.dir"]
+FUNDING_PATHS = ["$.delta.coin", "$.delta.usdc"]
+
+def _floats(column: Sequence[Any]) -> np.ndarray:
+    return np.array([value or 0 for value in column], dtype=np.float64)
+
+def _strings(column: Sequence[Any]) -> np.ndarray:
+    return np.array([value or "" for value in column], dtype=str)
+
+def _day_label(day: int) -> str:
+    return str(np.datetime64(day, "D"))
+
+def _week_label(monday: int) -> str:
+    year, week, _ = (datetime.date(1970, 1, 1) + datetime.timedelta(days=monday)).isocalendar()
+    return f"{year}-W{week:02d}"
+
+def _month_label(month: int) -> str:
+    return str(np.datetime64(month, "M"))
+
+def _ratio(numerator: float, denominator: float) -> float:
+    return float(numerator / denominator) if denominator > 0 else 0.0
+
+def _by_period(
+    keys: np.ndarray,
+    label: Callable[[int], str],
+    realized: np.ndarray,
+    fees: np.ndarray,
+    funding: np.ndarray,
+) -> List[Dict[str, Any]]:
+    """Sum P&L components per period key; pnl is net of fees and funding."""
+    periods, inverse = np.unique(keys, return_inverse=True)
+    sums = [np.bincount(inverse, weights=w, minlength=len(periods)) for w in (realized, fees, funding)]
+    net = sums[0] - sums[1] + sums[2]
+    cumulative = np.cumsum(net)
+    return [
+        {
+            "date": label(int(period)),
+            "pnl": float(net[i]),
+            "cumulative": float(cumulative[i]),
+            "realizedPnl": float(sums[0][i]),
+            "fees": float(sums[1][i]),
+            "funding": float(sums[2][i]),
+        }
+        for i, period in enumerate(periods)
+    ]
+
+def empty_metrics() -> Dict[str, Any]:
+    return {
+        "totalTrades": 0,
+        "totalFills": 0,
+        "winningTrades": 0,
+        "losingTrades": 0,
+        "winRate": 0.0,
+        "totalPnL": 0.0,
+        "realizedPnL": 0.0,
+        "totalFees": 0.0,
+        "totalFunding": 0.0,
+        "totalProfit": 0.0,
+        "totalLoss": 0.0,
+        "averageWin": 0.0,
+        "averageLoss": 0.0,
+        "largestWin": 0.0,
+        "largestLoss": 0.0,
+        "profitFactor": 0.0,
+        "sharpeRatio": 0.0,
+        "sortinoRatio": 0.0,
+        "maxDrawdown": 0.0,
+        "maxDrawdownPercent": 0.0,
+        "averageTradeSize": 0.0,
+        "totalVolume": 0.0,
+        "pnlCurve": {"t": [], "pnl": [], "drawdown": []},
+        "dailyPnL": [],
+        "weeklyPnL": [],
+        "monthlyPnL": [],
+        "byCoin": {},
+    }
+
+def compute_metrics(
+    fills: List[tuple],
+    funding: List[tuple],
+    curve_points: int = DEFAULT_CURVE_POINTS,
+) -> Dict[str, Any]:
+    """
+    Performance metrics from ledger rows (see FILL_PATHS / FUNDING_PATHS).
+
+    A trade is a closing fill; win/loss stats use its realized P&L like the
+    TypeScript calculator. Every pnl series (curve, periods, per coin) is net
+    of trading fees and funding payments, which are also reported separately.
+    profitFactor is None when there are wins but no losses.
+    """
+    if not fills and not funding:
+        return empty_metrics()
+
+    fill_cols = list(zip(*fills)) if fills else [()] * (len(FILL_PATHS) + 1)
+    funding_cols = list(zip(*funding)) if funding else [()] * (len(FUNDING_PATHS) + 1)
+    fill_t = np.array(fill_cols[0], dtype=np.int64)
+    fill_coin = _strings(fill_cols[1])
+    px, sz, closed, fee = (_floats(fill_cols[i]) for i in (2, 3, 4, 5))
+    closing = (closed != 0) | np.char.startswith(_strings(fill_cols[6]), "Close")
+    funding_t = np.array(funding_cols[0], dtype=np.int64)
+    funding_coin = _strings(funding_cols[1])
+    funding_usdc = _floats(funding_cols[2])
+
+    # One event per fill or funding payment, in time order
+    n_fills, n_funding = len(fill_t), len(funding_t)
+    t = np.concatenate([fill_t, funding_t])
+    order = np.argsort(t, kind="stable")
+    t = t[order]
+    realized = np.concatenate([closed, np.zeros(n_funding)])[order]
+    fees = np.concatenate([fee, np.zeros(n_funding)])[order]
+    fund = np.concatenate([np.zeros(n_fills), funding_usdc])[order]
+    net = realized - fees + fund
+
+    # Realized P&L curve and drawdown from the running peak (equity starts at 0)
+    curve = np.cumsum(net)
+    peak = np.maximum.accumulate(np.maximum(curve, 0.0))
+    drawdown = peak - curve
+    trough = int(np.argmax(drawdown))
+    max_drawdown = float(drawdown[trough])
+    if len(curve) > curve_points > 0:
+        idx = np.unique(np.append(np.linspace(0, len(curve) - 1, curve_points).astype(np.int64), trough))
+    else:
+        idx = np.arange(len(curve))
+
+    # Sharpe / Sortino on daily net P&L, counting days without activity as 0
+    days = t // DAY_MS
+    daily = np.bincount(days - days[0], weights=net)
+    mean = daily.mean()
+    std = daily.std(ddof=1) if len(daily) > 1 else 0.0
+    downside = np.sqrt(np.mean(np.minimum(daily, 0.0) ** 2))
+    annualize = np.sqrt(PERIODS_PER_YEAR)
+
+    # Win/loss over closing fills
+    trades = closed[closing]
+    wins, losses = trades[trades > 0], trades[trades < 0]
+    total_profit, total_loss = float(wins.sum()), float(-losses.sum())
+    if total_loss > 0:
+        profit_factor: Optional[float] = total_profit / total_loss
+    else:
+        profit_factor = None if total_profit > 0 else 0.0
+
+    volume = px * sz
+    total_volume = float(volume.sum())
+
+    # Per-coin attribution over both fills and funding
+    coins, coin_idx = np.unique(np.concatenate([fill_coin, funding_coin]), return_inverse=True)
+    n_coins = len(coins)
+
+    def per_coin(weights: np.ndarray) -> np.ndarray:
+        return np.bincount(coin_idx, weights=weights, minlength=n_coins)
+
+    zeros = np.zeros(n_funding)
+    coin_trades = per_coin(np.concatenate([closing, zeros]))
+    coin_wins = per_coin(np.concatenate([closing & (closed > 0), zeros]))
+    coin_realized = per_coin(np.concatenate([closed, zeros]))
+    coin_fees = per_coin(np.concatenate([fee, zeros]))
+    coin_funding = per_coin(np.concatenate([np.zeros(n_fills), funding_usdc]))
+    coin_volume = per_coin(np.concatenate([volume, zeros]))
+    by_coin = {
+        str(coin): {
+            "trades": int(coin_trades[i]),
+            "pnl": float(coin_realized[i] - coin_fees[i] + coin_funding[i]),
+            "winRate": _ratio(coin_wins[i] * 100, coin_trades[i]),
+            "realizedPnl": float(coin_realized[i]),
+            "fees": float(coin_fees[i]),
+            "funding": float(coin_funding[i]),
+            "volume": float(coin_volume[i]),
+        }
+        for i, coin in enumerate(coins)
+    }
+
+    months = t.astype("datetime64[ms]").astype("datetime64[M]").astype(np.int64)
+    return {
+        "totalTrades": int(len(trades)),
+        "totalFills": n_fills,
+        "winningTrades": int(len(wins)),
+        "losingTrades": int(len(losses)),
+        "winRate": _ratio(len(wins) * 100, len(trades)),
+        "totalPnL": float(curve[-1]),
+        "realizedPnL": float(closed.sum()),
+        "totalFees": float(fee.sum()),
+        "totalFunding": float(funding_usdc.sum()),
+        "totalProfit": total_profit,
+        "totalLoss": total_loss,
+        "averageWin": _ratio(total_profit, len(wins)),
+        "averageLoss": _ratio(total_loss, len(losses)),
+        "largestWin": float(wins.max()) if len(wins) else 0.0,
+        "largestLoss": float(losses.min()) if len(losses) else 0.0,
+        "profitFactor": profit_factor,
+        "sharpeRatio": _ratio(mean, std) * annualize,
+        "sortinoRatio": _ratio(mean, downside) * annualize,
+        "maxDrawdown": max_drawdown,
+        "maxDrawdownPercent": _ratio(max_drawdown * 100, peak[trough]),
+        "averageTradeSize": _ratio(total_volume, n_fills),
+        "totalVolume": total_volume,
+        "pnlCurve": {"t": t[idx].tolist(), "pnl": curve[idx].tolist(), "drawdown": drawdown[idx].tolist()},
+        "dailyPnL": _by_period(days, _day_label, realized, fees, fund),
+        "weeklyPnL": _by_period(days - (days - EPOCH_MONDAY) % 7, _week_label, realized, fees, fund),
+        "monthlyPnL": _by_period(months, _month_label, realized, fees, fund),
+        "byCoin": by_coin,
+    }
+
+class MetricsCache:
+    """
+    Computed metrics per address, tagged with the ledger version they were
+    built from. Any new fill or funding row changes the version and drops
+    every cached result for that address.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Hashable, Dict[Hashable, Any]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, address: str, version: Hashable, params: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(address)
+            if entry is not None and entry[0] == version and params in entry[1]:
+                self.hits += 1
+                return entry[1][params]
+            self.misses += 1
+        result = compute()
+        with self._lock:
+            entry = self._entries.get(address)
+            if entry is None or entry[0] != version:
+                entry = self._entries[address] = (version, {})
+            if len(entry[1]) >= MAX_CACHED_QUERIES:
+                entry[1].clear()
+            entry[1][params] = result
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "addresses": len(self._entries)}
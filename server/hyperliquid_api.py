@@ -4,45 +4,137 @@ Hyperliquid API integration module.
 Provides trading operations, account data retrieval, and market information.
 """
 
+import inspect
 import json
+import os
+import signal
+import socket
+import socketserver
 import sys
-from typing import Any, Dict, List, Optional
-from hyperliquid.info import Info
-from hyperliquid.exchange import Exchange
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union, get_args, get_origin, get_type_hints
 from hyperliquid.utils import constants
+from hyperliquid_orderbook import OrderBook, market_limit_price
+from hyperliquid_symbols import SymbolTable
+from hyperliquid_tracker import AccountTracker
+
+# Info, Exchange and the signing stack (eth_account, ABI codecs) take hundreds
+# of ms to import, so they are imported where first used: one-shot reads
+# never load the signing stack, and server mode pays for it once.
+if TYPE_CHECKING:
+    from hyperliquid.exchange import Exchange
+    from hyperliquid.info import Info
 
 # Environment variables will be passed via command line arguments
 ACCOUNT_ADDRESS = None
 API_SECRET = None
-API_URL = constants.MAINNET_API_URL
+# HYPERLIQUID_API_URL points the CLI at another server (e.g. the server/bench stand-in)
+API_URL = os.environ.get("HYPERLIQUID_API_URL") or constants.MAINNET_API_URL
 
 # Singleton instances to avoid recreating clients
 _info_client = None
 _exchange_client = None
+_symbol_table = None
+_transport = None
+# Positions/open orders of ACCOUNT_ADDRESS; only kept in server mode, where it outlives a call
+_account_tracker = None
+_clients_lock = threading.RLock()
+_nonce_lock = threading.Lock()
+_last_nonce = 0
 
 def init_clients(account_address: str, api_secret: str, testnet: bool = False):
     """Initialize Hyperliquid clients."""
     global ACCOUNT_ADDRESS, API_SECRET, API_URL
     ACCOUNT_ADDRESS = account_address
     API_SECRET = api_secret
-    API_URL = constants.TESTNET_API_URL if testnet else constants.MAINNET_API_URL
+    API_URL = os.environ.get("HYPERLIQUID_API_URL") or (
+        constants.TESTNET_API_URL if testnet else constants.MAINNET_API_URL
+    )
 
-def get_info_client() -> Info:
+def next_nonce() -> int:
+    """Millisecond timestamp nonce that stays unique across concurrent server-mode requests."""
+    global _last_nonce
+    with _nonce_lock:
+        _last_nonce = max(int(time.time() * 1000), _last_nonce + 1)
+        return _last_nonce
+
+def get_transport():
+    """Pooled HTTP session shared by the Info and Exchange clients (singleton)."""
+    global _transport
+    if _transport is None:
+        from hyperliquid_transport import Transport
+        with _clients_lock:
+            if _transport is None:
+                _transport = Transport(API_URL)
+    return _transport
+
+def get_info_client() -> "Info":
     """Get Info client for read-only operations (singleton)."""
     global _info_client
     if _info_client is None:
-        _info_client = Info(API_URL, skip_ws=True)
+        from hyperliquid.info import Info
+        with _clients_lock:
+            if _info_client is None:
+                _info_client = get_transport().attach(Info(API_URL, skip_ws=True))
     return _info_client
 
-def get_exchange_client() -> Exchange:
+def get_exchange_client() -> "Exchange":
     """Get Exchange client for trading operations (singleton)."""
     global _exchange_client
     if not ACCOUNT_ADDRESS or not API_SECRET:
         raise ValueError("Account address and API secret must be initialized")
     if _exchange_client is None:
-        _exchange_client = Exchange(ACCOUNT_ADDRESS, API_SECRET, API_URL)
+        from eth_account import Account
+        import hyperliquid.exchange as hl_exchange
+        # SDK actions (leverage, transfers) share our nonce sequence
+        hl_exchange.get_timestamp_ms = next_nonce
+        with _clients_lock:
+            if _exchange_client is None:
+                wallet = Account.from_key(API_SECRET)
+                exchange = hl_exchange.Exchange(wallet, API_URL, account_address=ACCOUNT_ADDRESS)
+                _exchange_client = get_transport().attach(exchange)
     return _exchange_client
 
+def get_symbol_table() -> SymbolTable:
+    """Get the memoized coin -> asset/precision table (singleton)."""
+    global _symbol_table
+    if _symbol_table is None:
+        with _clients_lock:
+            if _symbol_table is None:
+                _symbol_table = SymbolTable(get_meta, get_spot_meta)
+    return _symbol_table
+
+def post_exchange_action(action: Dict[str, Any]) -> Dict[str, Any]:
+    """Sign a raw exchange action (order/cancel/modify wires) and submit it."""
+    from hyperliquid.utils.signing import sign_l1_action
+    exchange = get_exchange_client()
+    nonce = next_nonce()
+    signature = sign_l1_action(
+        exchange.wallet,
+        action,
+        exchange.vault_address,
+        nonce,
+        exchange.expires_after,
+        API_URL == constants.MAINNET_API_URL,
+    )
+    return exchange._post_action(action, signature, nonce)
+
+def response_statuses(result: Dict[str, Any], count: int) -> List[Any]:
+    """Per-item statuses of an exchange response, aligned with what was submitted."""
+    if result.get("status") == "ok":
+        return result.get("response", {}).get("data", {}).get("statuses", [])
+    return [{"error": result.get("response")}] * count
+
+def track_orders(orders: List[Dict[str, Any]], result: Dict[str, Any]):
+    if _account_tracker is not None:
+        _account_tracker.on_orders(ACCOUNT_ADDRESS, orders, response_statuses(result, len(orders)))
+
+def track_cancels(cancels: List[Dict[str, Any]], result: Dict[str, Any]):
+    if _account_tracker is not None:
+        _account_tracker.on_cancels(ACCOUNT_ADDRESS, cancels, response_statuses(result, len(cancels)))
+
 # ============================================================================
 # Account Information
 # ============================================================================
@@ -57,8 +149,10 @@ def get_user_state(address: Optional[str] = None) -> Dict[str, Any]:
 
 def get_open_orders(address: Optional[str] = None) -> List[Dict[str, Any]]:
     """Get user's open orders."""
-    info = get_info_client()
     addr = address or ACCOUNT_ADDRESS
+    if _account_tracker is not None and addr.lower() == ACCOUNT_ADDRESS.lower():
+        return _account_tracker.open_orders(addr)
+    info = get_info_client()
     return info.open_orders(addr)
 
 def get_user_fills(address: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -121,13 +215,13 @@ def place_order(
     cloid: Optional[str] = None
 ) -> Dict[str, Any]:
     """Place a new order."""
-    exchange = get_exchange_client()
+    symbols = get_symbol_table()
     
     order_request = {
         "a": get_asset_index(coin),
         "b": is_buy,
-        "p": str(price),
-        "s": str(size),
+        "p": symbols.price_wire(coin, price),
+        "s": symbols.size_wire(coin, size),
         "r": reduce_only,
         "t": order_type,
     }
@@ -135,7 +229,9 @@ def place_order(
     if cloid:
         order_request["c"] = cloid
     
-    return exchange.order(order_request)
+    result = post_exchange_action({"type": "order", "orders": [order_request], "grouping": "na"})
+    track_orders([{"coin": coin, "is_buy": is_buy, "sz": order_request["s"], "limit_px": order_request["p"], "cloid": cloid}], result)
+    return result
 
 def place_market_order(
     coin: str,
@@ -144,18 +240,10 @@ def place_market_order(
     slippage: float = 0.05
 ) -> Dict[str, Any]:
     """Place a market order with slippage protection."""
-    # Get current mid price
-    all_mids = get_all_mids()
-    mid_price = float(all_mids.get(coin, 0))
-    
-    if mid_price == 0:
-        raise ValueError(f"Could not get mid price for {coin}")
-    
-    # Calculate limit price with slippage
-    if is_buy:
-        limit_price = mid_price * (1 + slippage)
-    else:
-        limit_price = mid_price * (1 - slippage)
+    # Price from the book so we know the size fits inside the slippage band
+    book = OrderBook(coin)
+    book.load_snapshot(get_l2_snapshot(coin))
+    limit_price = market_limit_price(book, is_buy, size, slippage)
     
     # Use IOC (Immediate or Cancel) order type for market-like execution
     return place_order(
@@ -168,30 +256,42 @@ def place_market_order(
 
 def cancel_order(coin: str, oid: int) -> Dict[str, Any]:
     """Cancel an order by order ID."""
-    exchange = get_exchange_client()
-    return exchange.cancel({"a": get_asset_index(coin), "o": oid})
+    result = post_exchange_action({"type": "cancel", "cancels": [{"a": get_asset_index(coin), "o": oid}]})
+    track_cancels([{"coin": coin, "oid": oid}], result)
+    return result
 
 def cancel_order_by_cloid(coin: str, cloid: str) -> Dict[str, Any]:
     """Cancel an order by client order ID."""
-    exchange = get_exchange_client()
-    return exchange.cancel({"a": get_asset_index(coin), "c": cloid})
+    result = post_exchange_action({"type": "cancelByCloid", "cancels": [{"asset": get_asset_index(coin), "cloid": cloid}]})
+    track_cancels([{"coin": coin, "cloid": cloid}], result)
+    return result
+
+def bulk_cancel_orders(cancels: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Cancel many orders ({"coin", "oid"} each) in a single signed action."""
+    result = post_exchange_action({
+        "type": "cancel",
+        "cancels": [{"a": get_asset_index(c["coin"]), "o": c["oid"]} for c in cancels],
+    })
+    track_cancels(cancels, result)
+    return result
 
 def cancel_all_orders(coin: Optional[str] = None) -> Dict[str, Any]:
     """Cancel all orders for a coin or all coins."""
-    exchange = get_exchange_client()
-    if coin:
-        return exchange.cancel({"a": get_asset_index(coin), "o": None})
-    else:
-        # Cancel all orders across all assets
-        open_orders = get_open_orders()
-        results = []
-        for order in open_orders:
-            try:
-                result = cancel_order(order["coin"], order["oid"])
-                results.append(result)
-            except Exception as e:
-                results.append({"error": str(e), "order": order})
-        return {"results": results}
+    # Served from tracked state in server mode, so only the cancel goes upstream
+    open_orders = [o for o in get_open_orders() if not coin or o["coin"] == coin]
+    if not open_orders:
+        return {"results": []}
+    
+    # One round trip for the whole set instead of one per order
+    result = bulk_cancel_orders(open_orders)
+    statuses = response_statuses(result, len(open_orders))
+    return {
+        "results": [
+            {"coin": order["coin"], "oid": order["oid"], "status": status}
+            for order, status in zip(open_orders, statuses)
+        ],
+        "response": result,
+    }
 
 def modify_order(
     coin: str,
@@ -200,21 +300,25 @@ def modify_order(
     new_size: Optional[float] = None
 ) -> Dict[str, Any]:
     """Modify an existing order."""
-    exchange = get_exchange_client()
+    symbols = get_symbol_table()
     
     modify_request = {
         "oid": oid,
         "order": {
             "a": get_asset_index(coin),
             "b": True,  # Will be ignored, just placeholder
-            "p": str(new_price) if new_price else "0",
-            "s": str(new_size) if new_size else "0",
+            "p": symbols.price_wire(coin, new_price) if new_price else "0",
+            "s": symbols.size_wire(coin, new_size) if new_size else "0",
             "r": False,
             "t": {"limit": {"tif": "Gtc"}},
         }
     }
     
-    return exchange.modify(modify_request)
+    result = post_exchange_action({"type": "batchModify", "modifies": [modify_request]})
+    if _account_tracker is not None:
+        # The placeholder side/size leave the new order unknown until the next sync
+        _account_tracker.invalidate(ACCOUNT_ADDRESS)
+    return result
 
 def update_leverage(coin: str, leverage: int, is_cross: bool = True) -> Dict[str, Any]:
     """Update leverage for a coin."""
@@ -252,37 +356,58 @@ def get_spot_balances(address: Optional[str] = None) -> Dict[str, Any]:
     user_state = info.user_state(addr)
     return user_state.get("spotBalances", [])
 
-def place_stop_loss_order(
+# Default distance of a trigger order's limit price from its trigger
+TRIGGER_SLIPPAGE = 0.01  # 1% slippage
+
+def stop_loss_limit_price(is_buy: bool, trigger_price: float) -> float:
+    """Limit price for a stop loss with no explicit limit: the trigger with small slippage."""
+    return trigger_price * (1 + TRIGGER_SLIPPAGE) if is_buy else trigger_price * (1 - TRIGGER_SLIPPAGE)
+
+def take_profit_limit_price(is_buy: bool, trigger_price: float) -> float:
+    """Limit price for a take profit with no explicit limit: the trigger with small slippage."""
+    return trigger_price * (1 - TRIGGER_SLIPPAGE) if is_buy else trigger_price * (1 + TRIGGER_SLIPPAGE)
+
+def trigger_order_request(
     coin: str,
     is_buy: bool,
     size: float,
     trigger_price: float,
-    limit_price: Optional[float] = None
+    limit_price: float,
+    tpsl: str
 ) -> Dict[str, Any]:
-    """Place a stop loss order (trigger order)."""
-    exchange = get_exchange_client()
-    
-    # If no limit price specified, use trigger price with small slippage
-    if limit_price is None:
-        slippage = 0.01  # 1% slippage
-        limit_price = trigger_price * (1 + slippage) if is_buy else trigger_price * (1 - slippage)
-    
-    order_request = {
+    """Order wire for a reduce-only stop loss ("sl") or take profit ("tp")."""
+    symbols = get_symbol_table()
+    return {
         "a": get_asset_index(coin),
         "b": is_buy,
-        "p": str(limit_price),
-        "s": str(size),
-        "r": True,  # reduce only for stop loss
+        "p": symbols.price_wire(coin, limit_price),
+        "s": symbols.size_wire(coin, size),
+        "r": True,  # reduce only for stop loss / take profit
         "t": {
             "trigger": {
-                "triggerPx": str(trigger_price),
+                "triggerPx": symbols.price_wire(coin, trigger_price),
                 "isMarket": False,
-                "tpsl": "sl"  # stop loss
+                "tpsl": tpsl,
             }
         },
     }
+
+def place_stop_loss_order(
+    coin: str,
+    is_buy: bool,
+    size: float,
+    trigger_price: float,
+    limit_price: Optional[float] = None
+) -> Dict[str, Any]:
+    """Place a stop loss order (trigger order)."""
+    # If no limit price specified, use trigger price with small slippage
+    if limit_price is None:
+        limit_price = stop_loss_limit_price(is_buy, trigger_price)
     
-    return exchange.order(order_request)
+    order_request = trigger_order_request(coin, is_buy, size, trigger_price, limit_price, "sl")
+    result = post_exchange_action({"type": "order", "orders": [order_request], "grouping": "na"})
+    track_orders([{"coin": coin, "is_buy": is_buy, "sz": order_request["s"], "limit_px": order_request["p"]}], result)
+    return result
 
 def place_take_profit_order(
     coin: str,
@@ -292,69 +417,65 @@ def place_take_profit_order(
     limit_price: Optional[float] = None
 ) -> Dict[str, Any]:
     """Place a take profit order (trigger order)."""
-    exchange = get_exchange_client()
-    
     # If no limit price specified, use trigger price with small slippage
     if limit_price is None:
-        slippage = 0.01  # 1% slippage
-        limit_price = trigger_price * (1 - slippage) if is_buy else trigger_price * (1 + slippage)
-    
-    order_request = {
-        "a": get_asset_index(coin),
-        "b": is_buy,
-        "p": str(limit_price),
-        "s": str(size),
-        "r": True,  # reduce only for take profit
-        "t": {
-            "trigger": {
-                "triggerPx": str(trigger_price),
-                "isMarket": False,
-                "tpsl": "tp"  # take profit
-            }
-        },
-    }
+        limit_price = take_profit_limit_price(is_buy, trigger_price)
     
-    return exchange.order(order_request)
+    order_request = trigger_order_request(coin, is_buy, size, trigger_price, limit_price, "tp")
+    result = post_exchange_action({"type": "order", "orders": [order_request], "grouping": "na"})
+    track_orders([{"coin": coin, "is_buy": is_buy, "sz": order_request["s"], "limit_px": order_request["p"]}], result)
+    return result
 
 def place_bracket_order(
     coin: str,
     is_buy: bool,
     size: float,
     entry_price: float,
-    stop_loss_price: float,
-    take_profit_price: float
+    stop_loss_price: Optional[float] = None,
+    take_profit_price: Optional[float] = None
 ) -> Dict[str, Any]:
-    """Place a bracket order (entry + stop loss + take profit)."""
-    results = []
-    
-    # Place entry order
-    entry_result = place_limit_order(coin, is_buy, size, entry_price)
-    results.append({"type": "entry", "result": entry_result})
-    
-    # Place stop loss (opposite side, reduce only)
-    sl_result = place_stop_loss_order(coin, not is_buy, size, stop_loss_price)
-    results.append({"type": "stop_loss", "result": sl_result})
+    """
+    Place a bracket order (entry + stop loss + take profit) as one signed action.
+    With "normalTpsl" grouping the exchange attaches the TP/SL to the entry, so
+    the position is never open without them. Either TP or SL may be omitted.
+    """
+    if stop_loss_price is None and take_profit_price is None:
+        raise ValueError("A bracket needs a stop loss and/or a take profit price")
+    symbols = get_symbol_table()
     
-    # Place take profit (opposite side, reduce only)
-    tp_result = place_take_profit_order(coin, not is_buy, size, take_profit_price)
-    results.append({"type": "take_profit", "result": tp_result})
+    legs = [("entry", {
+        "a": get_asset_index(coin),
+        "b": is_buy,
+        "p": symbols.price_wire(coin, entry_price),
+        "s": symbols.size_wire(coin, size),
+        "r": False,
+        "t": {"limit": {"tif": "Gtc"}},
+    })]
+    # Exits are the opposite side, reduce only
+    if stop_loss_price is not None:
+        limit_price = stop_loss_limit_price(not is_buy, stop_loss_price)
+        legs.append(("stop_loss", trigger_order_request(coin, not is_buy, size, stop_loss_price, limit_price, "sl")))
+    if take_profit_price is not None:
+        limit_price = take_profit_limit_price(not is_buy, take_profit_price)
+        legs.append(("take_profit", trigger_order_request(coin, not is_buy, size, take_profit_price, limit_price, "tp")))
     
-    return {"bracket_orders": results}
+    orders = [wire for _, wire in legs]
+    result = post_exchange_action({"type": "order", "orders": orders, "grouping": "normalTpsl"})
+    track_orders([{"coin": coin, "is_buy": w["b"], "sz": w["s"], "limit_px": w["p"]} for w in orders], result)
+    statuses = response_statuses(result, len(legs))
+    return {
+        "grouping": "normalTpsl",
+        "bracket_orders": [{"type": leg, "status": status} for (leg, _), status in zip(legs, statuses)],
+        "response": result,
+    }
 
 # ============================================================================
 # Helper Functions
 # ============================================================================
 
 def get_asset_index(coin: str) -> int:
-    """Get asset index for a coin from metadata."""
-    meta = get_meta()
-    universe = meta.get("universe", [])
-    
-    for idx, asset in enumerate(universe):
-        if asset.get("name") == coin:
-            return idx
-    
-    raise ValueError(f"Asset {coin} not found in universe")
+    """Get asset index for a coin (perp or spot) from the cached symbol table."""
+    return get_symbol_table().asset_index(coin)
 
 def format_position(position: Dict[str, Any]) -> Dict[str, Any]:
     """Format position data for frontend."""
@@ -378,10 +499,162 @@ def format_balance(balance: Dict[str, Any]) -> Dict[str, Any]:
         "available": float(balance.get("total", 0)) - float(balance.get("hold", 0)),
     }
 
+# ============================================================================
+# Socket Server Mode
+# ============================================================================
+
+def get_transport_stats() -> Dict[str, Any]:
+    """Connection pool usage: reuse rate, pings and timeouts of the shared HTTP session."""
+    return get_transport().stats()
+
+# Functions callable over the socket, by name. Args are a JSON list (positional)
+# or object (keyword) matching the function's parameters.
+SOCKET_COMMANDS = {
+    fn.__name__: fn
+    for fn in (
+        get_user_state, get_open_orders, get_user_fills, get_user_funding_history,
+        get_meta, get_spot_meta, get_all_mids, get_l2_snapshot, get_candles_snapshot, get_funding_history,
+        place_order, place_market_order, cancel_order, cancel_order_by_cloid, bulk_cancel_orders,
+        cancel_all_orders, modify_order, update_leverage, update_isolated_margin,
+        usd_transfer, spot_transfer, withdraw_from_bridge, get_spot_balances,
+        place_stop_loss_order, place_take_profit_order, place_bracket_order, get_transport_stats,
+    )
+}
+
+DEFAULT_SERVER_WORKERS = 16
+
+def handle_socket_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one {"id", "command", "args"} request and build its response."""
+    request_id = request.get("id")
+    command = request.get("command")
+    fn = SOCKET_COMMANDS.get(command)
+    if fn is None:
+        return {"id": request_id, "success": False, "error": f"Unknown command: {command}"}
+    args = request.get("args") or []
+    try:
+        result = fn(**args) if isinstance(args, dict) else fn(*args)
+        return {"id": request_id, "success": True, "data": result}
+    except Exception as e:
+        return {"id": request_id, "success": False, "error": str(e)}
+
+class SocketConnection(socketserver.StreamRequestHandler):
+    """
+    One client connection. Requests are newline-delimited JSON tagged with an
+    id; each runs on the shared worker pool and its response is written as
+    soon as it is ready, so a slow call never blocks others on the connection.
+    """
+
+    def handle(self):
+        self.write_lock = threading.Lock()
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except Exception as e:
+                self.respond({"success": False, "error": str(e)})
+                continue
+            self.server.workers.submit(self.run, request)
+
+    def run(self, request: Dict[str, Any]):
+        self.respond(handle_socket_request(request))
+
+    def respond(self, response: Dict[str, Any]):
+        line = json.dumps(response, default=str).encode() + b"\n"
+        try:
+            with self.write_lock:
+                self.wfile.write(line)
+                self.wfile.flush()
+        except (OSError, ValueError):
+            pass  # Client went away; its remaining responses are dropped
+
+def socket_in_use(socket_path: str) -> bool:
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+def serve(socket_path: str, workers: int = DEFAULT_SERVER_WORKERS):
+    """
+    Serve every SOCKET_COMMANDS function on a Unix domain socket until
+    SIGTERM/SIGINT. Any number of clients may connect and keep many requests
+    in flight; all of them share this process's warm clients.
+    """
+    global _account_tracker
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    if os.path.exists(socket_path):
+        if socket_in_use(socket_path):
+            raise RuntimeError(f"Another server is listening on {socket_path}")
+        os.unlink(socket_path)
+
+    # Build clients and load metadata before the first request arrives
+    get_info_client()
+    get_symbol_table().refresh()
+    if ACCOUNT_ADDRESS and API_SECRET:
+        get_exchange_client()
+        _account_tracker = AccountTracker(get_user_state, lambda address: get_info_client().open_orders(address))
+        _account_tracker.start()
+    # Keep pooled connections open so a request after a quiet spell starts warm
+    get_transport().start()
+
+    # The process holds the trading key: only this user may connect. The socket
+    # is created 0600, never briefly open to others between bind and chmod.
+    umask = os.umask(0o177)
+    try:
+        server = Server(socket_path, SocketConnection)
+    finally:
+        os.umask(umask)
+    server.workers = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api")
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(json.dumps({"ready": True, "socket": socket_path}), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.workers.shutdown(wait=False)
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
 # ============================================================================
 # CLI Interface
 # ============================================================================
 
+def parse_cli_arg(value: str, annotation: Any) -> Any:
+    """One argv string as the parameter's annotated type (objects and lists arrive as JSON)."""
+    if get_origin(annotation) is Union:
+        annotation = next(a for a in get_args(annotation) if a is not type(None))
+    if annotation is bool:
+        return value.lower() == "true"
+    if annotation in (int, float):
+        return annotation(value)
+    if annotation is str:
+        return value
+    return json.loads(value)
+
+def cli_call(command: str, argv: List[str]) -> Any:
+    """
+    Run a SOCKET_COMMANDS function from positional argv strings, so the
+    one-shot CLI serves every command the socket server does. Empty strings
+    (optional arguments the caller left out) keep the parameter's default.
+    """
+    fn = SOCKET_COMMANDS.get(command)
+    if fn is None:
+        return {"error": f"Unknown command: {command}"}
+    hints = get_type_hints(fn)
+    params = list(inspect.signature(fn).parameters)
+    if len(argv) > len(params):
+        return {"error": f"{command} takes at most {len(params)} arguments, got {len(argv)}"}
+    kwargs = {name: parse_cli_arg(value, hints.get(name, Any)) for name, value in zip(params, argv) if value != ""}
+    return fn(**kwargs)
+
 def main():
     """CLI interface for testing."""
     if len(sys.argv) < 2:
@@ -397,35 +670,25 @@ def main():
         testnet = sys.argv[4].lower() == "true" if len(sys.argv) > 4 else False
         init_clients(account_address, api_secret, testnet)
     
+    if command == "serve":
+        # serve [address secret testnet [socket_path]]; credentials and path
+        # may also come from the environment the Node server uses
+        if len(sys.argv) < 4 and os.environ.get("HYPERLIQUID_ACCOUNT_ADDRESS"):
+            init_clients(
+                os.environ["HYPERLIQUID_ACCOUNT_ADDRESS"],
+                os.environ.get("HYPERLIQUID_API_SECRET"),
+                os.environ.get("HYPERLIQUID_TESTNET") == "true",
+            )
+        socket_path = sys.argv[5] if len(sys.argv) > 5 else os.environ.get("HYPERLIQUID_API_SOCKET")
+        if not socket_path:
+            print(json.dumps({"error": "No socket path (argument or HYPERLIQUID_API_SOCKET)"}))
+            sys.exit(1)
+        serve(socket_path, int(os.environ.get("HYPERLIQUID_API_WORKERS") or DEFAULT_SERVER_WORKERS))
+        return
+    
     try:
-        if command == "get_user_state":
-            result = get_user_state()
-        elif command == "get_open_orders":
-            result = get_open_orders()
-        elif command == "get_user_fills":
-            result = get_user_fills()
-        elif command == "get_meta":
-            result = get_meta()
-        elif command == "get_spot_meta":
-            result = get_spot_meta()
-        elif command == "get_all_mids":
-            result = get_all_mids()
-        elif command == "get_l2_snapshot":
-            coin = sys.argv[5] if len(sys.argv) > 5 else "BTC"
-            result = get_l2_snapshot(coin)
-        elif command == "place_market_order":
-            if len(sys.argv) < 8:
-                result = {"error": "Missing arguments: coin, is_buy, size"}
-            else:
-                coin = sys.argv[5]
-                is_buy = sys.argv[6].lower() == "true"
-                size = float(sys.argv[7])
-                result = place_market_order(coin, is_buy, size)
-        elif command == "cancel_all_orders":
-            result = cancel_all_orders()
-        else:
-            result = {"error": f"Unknown command: {command}"}
-        
+        # argv: command address secret testnet [function arguments...]
+        result = cli_call(command, sys.argv[5:])
         print(json.dumps(result, default=str))
     except Exception as e:
         print(json.dumps({"error": str(e)}))
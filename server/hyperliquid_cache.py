@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+TTL read cache with single-flight request coalescing for daemon Info calls.
+Identical reads that arrive together share one upstream call, and repeated
+polls within a command's TTL are served from memory.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+# Seconds a result stays fresh, per daemon command. A TTL of 0 disables
+# caching but still coalesces concurrent identical requests.
+DEFAULT_TTLS = {
+    "get_all_mids": 1.0,
+    "get_meta": 60.0,
+    "get_l2_snapshot": 0.5,
+    "get_user_state": 2.0,
+    "get_open_orders": 1.0,
+    "get_user_fills": 5.0,
+    "get_candles": 5.0,
+}
+DEFAULT_MAX_ENTRIES = 1024
+
+class _Flight:
+    """An upstream call in progress that other callers can wait on."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+class ReadCache:
+    """
+    LRU cache keyed by (command, args) with per-command TTLs.
+
+    Misses for a key that is already being fetched wait for that fetch instead
+    of issuing their own. Errors are propagated to every waiter but never cached.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self._ttls = dict(DEFAULT_TTLS)
+        self._ttls.update(ttls or {})
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, Hashable], _Flight] = {}
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self.evictions = 0
+
+    def configure(self, ttls: Optional[Dict[str, float]] = None, max_entries: Optional[int] = None):
+        """Override TTLs and/or the size bound (e.g. from the daemon init line)."""
+        with self._lock:
+            if ttls:
+                self._ttls.update({command: float(ttl) for command, ttl in ttls.items()})
+            if max_entries is not None:
+                self._max_entries = int(max_entries)
+                self._evict()
+
+    def ttl(self, command: str) -> float:
+        return self._ttls.get(command, 0.0)
+
+    def _count(self, command: str, field: str):
+        counts = self._counts.get(command)
+        if counts is None:
+            counts = self._counts[command] = {"hits": 0, "misses": 0, "coalesced": 0}
+        counts[field] += 1
+
+    def _evict(self):
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, command: str, args: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for (command, args), loading it at most once."""
+        key = (command, args)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._count(command, "hits")
+                return entry[1]
+
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self._count(command, "coalesced")
+                leader = False
+            else:
+                flight = self._inflight[key] = _Flight()
+                self._count(command, "misses")
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = loader()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                ttl = self.ttl(command)
+                if flight.error is None and ttl > 0:
+                    self._entries[key] = (time.monotonic() + ttl, flight.result)
+                    self._entries.move_to_end(key)
+                    self._evict()
+            flight.done.set()
+        return flight.result
+
+    def invalidate(self, commands: Iterable[str], args: Optional[Hashable] = None):
+        """Drop cached entries for the given commands (optionally only one args key)."""
+        commands = set(commands)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] in commands and (args is None or k[1] == args)]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            totals = {"hits": 0, "misses": 0, "coalesced": 0}
+            for counts in self._counts.values():
+                for field in totals:
+                    totals[field] += counts[field]
+            return {
+                **totals,
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "evictions": self.evictions,
+                "inflight": len(self._inflight),
+                "ttls": dict(self._ttls),
+                "by_command": {command: dict(counts) for command, counts in self._counts.items()},
+            }
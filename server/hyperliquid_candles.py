@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Persistent columnar candle store.
+Keeps one set of memory-mapped NumPy columns per (coin, interval) on disk,
+remembers which time ranges are already cached and only fetches the gaps.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from hyperliquid_paging import INTERVAL_MS, MAX_CANDLES_PER_FETCH
+
+COLUMNS = (("t", np.int64), ("o", np.float64), ("h", np.float64), ("l", np.float64),
+           ("c", np.float64), ("v", np.float64), ("n", np.int64))
+
+Fetch = Callable[[str, str, int, int], List[Dict[str, Any]]]
+
+def _decimal(x: float) -> str:
+    """Upstream's decimal-string shape: positional, shortest round-trip digits ("0.00001", "29258.0")."""
+    return np.format_float_positional(x, trim="0")
+
+def _merge_ranges(ranges: List[List[int]]) -> List[List[int]]:
+    merged: List[List[int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+def _missing(ranges: List[List[int]], start: int, end: int) -> List[Tuple[int, int]]:
+    """Sub-ranges of [start, end] not covered by `ranges` (sorted and merged)."""
+    gaps = []
+    cursor = start
+    for r_start, r_end in ranges:
+        if r_end < cursor:
+            continue
+        if r_start > end:
+            break
+        if r_start > cursor:
+            gaps.append((cursor, r_start - 1))
+        cursor = max(cursor, r_end + 1)
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+def _to_columns(candles: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    return {name: np.array([c[name] for c in candles], dtype=dtype) for name, dtype in COLUMNS}
+
+class CandleSeries:
+    """On-disk columns and covered ranges for one (coin, interval)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self.ranges = self._load_ranges()
+        self.columns = self._load_columns()
+
+    def _load_ranges(self) -> List[List[int]]:
+        try:
+            with open(os.path.join(self.path, "ranges.json")) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return []
+
+    def _load_columns(self) -> Dict[str, np.ndarray]:
+        try:
+            return {name: np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r") for name, _ in COLUMNS}
+        except (FileNotFoundError, ValueError):
+            # Missing or torn column files: start over so ranges never outlive data
+            self.ranges = []
+            return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS}
+
+    def _save(self):
+        for name, _ in COLUMNS:
+            tmp = os.path.join(self.path, f"{name}.npy.tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, np.ascontiguousarray(self.columns[name]))
+            os.replace(tmp, os.path.join(self.path, f"{name}.npy"))
+        tmp = os.path.join(self.path, "ranges.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.ranges, f)
+        os.replace(tmp, os.path.join(self.path, "ranges.json"))
+        self.columns = self._load_columns()
+
+    def add(self, fetched: Dict[str, np.ndarray], start: int, end: int):
+        """Merge fetched candles (deduplicated on open time) and mark [start, end] covered."""
+        if len(fetched["t"]):
+            merged = {name: np.concatenate([self.columns[name], fetched[name]]) for name, _ in COLUMNS}
+            # Keep the most recently fetched copy of any duplicated open time
+            _, last = np.unique(merged["t"][::-1], return_index=True)
+            keep = len(merged["t"]) - 1 - last
+            self.columns = {name: col[keep] for name, col in merged.items()}
+        self.ranges = _merge_ranges(self.ranges + [[start, end]])
+        self._save()
+
+    def slice(self, start: int, end: int) -> Dict[str, np.ndarray]:
+        t = self.columns["t"]
+        lo = int(np.searchsorted(t, start, side="left"))
+        hi = int(np.searchsorted(t, end, side="right"))
+        return {name: np.asarray(col[lo:hi]) for name, col in self.columns.items()}
+
+class CandleStore:
+    """
+    Range queries over cached candles with incremental gap filling.
+
+    Only fully closed candles are persisted and marked covered; the still-open
+    tail of a request is fetched live on every call and never stored.
+    """
+
+    def __init__(self, root: str, fetch: Fetch):
+        self.root = os.path.join(root, "candles")
+        self._fetch = fetch
+        self._series: Dict[Tuple[str, str], CandleSeries] = {}
+        self._lock = threading.Lock()
+        self.upstream_calls = 0
+
+    def _get_series(self, coin: str, interval: str) -> CandleSeries:
+        key = (coin, interval)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                safe_coin = re.sub(r"[^A-Za-z0-9_.-]", "_", coin)
+                series = self._series[key] = CandleSeries(os.path.join(self.root, safe_coin, interval))
+            return series
+
+    def _fetch_range(self, coin: str, interval: str, start: int, end: int) -> List[Dict[str, Any]]:
+        """Fetch [start, end] from upstream in pages of at most MAX_CANDLES_PER_FETCH."""
+        step = INTERVAL_MS[interval] * MAX_CANDLES_PER_FETCH
+        candles: List[Dict[str, Any]] = []
+        page_start = start
+        while page_start <= end:
+            page_end = min(end, page_start + step - 1)
+            self.upstream_calls += 1
+            candles.extend(self._fetch(coin, interval, page_start, page_end))
+            page_start = page_end + 1
+        return candles
+
+    def get(self, coin: str, interval: str, start: int, end: int, compact: bool = False) -> Any:
+        """Candles with open time in [start, end], as dicts or (compact) column lists."""
+        if interval not in INTERVAL_MS:
+            # Calendar intervals (1M) have no fixed width; serve them directly
+            candles = self._fetch(coin, interval, start, end)
+            return self._format(_to_columns(candles), coin, interval, compact) if compact else candles
+
+        step = INTERVAL_MS[interval]
+        start -= start % step
+        # Open time of the newest candle that has already closed
+        closed_end = (int(time.time() * 1000) // step) * step - step
+        series = self._get_series(coin, interval)
+
+        with series.lock:
+            stored_end = min(end, closed_end)
+            if stored_end >= start:
+                for gap_start, gap_end in _missing(series.ranges, start, stored_end):
+                    fetched = _to_columns(self._fetch_range(coin, interval, gap_start, gap_end))
+                    series.add(fetched, gap_start, gap_end)
+            columns = series.slice(start, stored_end) if stored_end >= start else series.slice(1, 0)
+
+        live_start = max(start, closed_end + step)
+        if end >= live_start:
+            self.upstream_calls += 1
+            live = _to_columns(self._fetch(coin, interval, live_start, end))
+            columns = {name: np.concatenate([columns[name], live[name]]) for name, _ in COLUMNS}
+
+        return self._format(columns, coin, interval, compact)
+
+    @staticmethod
+    def _format(columns: Dict[str, np.ndarray], coin: str, interval: str, compact: bool) -> Any:
+        if compact:
+            return {"s": coin, "i": interval, **{name: col.tolist() for name, col in columns.items()}}
+        step = INTERVAL_MS.get(interval, 0)
+        t, n = columns["t"].tolist(), columns["n"].tolist()
+        o, h, l, c, v = ([_decimal(x) for x in columns[name].tolist()] for name in "ohlcv")
+        return [
+            {"t": t[k], "T": t[k] + step - 1, "s": coin, "i": interval, "o": o[k], "c": c[k],
+             "h": h[k], "l": l[k], "v": v[k], "n": n[k]}
+            for k in range(len(t))
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            series = dict(self._series)
+        return {
+            "root": self.root,
+            "upstream_calls": self.upstream_calls,
+            "series": {
+                f"{coin}:{interval}": {"candles": int(len(s.columns["t"])), "ranges": s.ranges}
+                for (coin, interval), s in series.items()
+            },
+        }
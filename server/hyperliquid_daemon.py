@@ -4,34 +4,600 @@ Persistent Hyperliquid API daemon.
 Stays running and handles requests via stdin/stdout to avoid recreating clients.
 """
 
+import itertools
 import json
+import math
+import os
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import hyperliquid.api as hl_api
+import hyperliquid.exchange as hl_exchange
 from hyperliquid.info import Info
-from hyperliquid.exchange import Exchange
 from hyperliquid.utils import constants
-from eth_account.signers.local import LocalAccount
-from eth_account import Account
+from hyperliquid.utils.error import ClientError, ServerError
+from hyperliquid.utils.types import Cloid
+from hyperliquid_accounts import DEFAULT_MAX_CLIENTS, AccountPool, normalize_address
+from hyperliquid_api import stop_loss_limit_price, take_profit_limit_price
+from hyperliquid_cache import ReadCache
+from hyperliquid_delta import DeltaEncoder, project
+from hyperliquid_execution import ExecutionEngine
+from hyperliquid_framing import LineCodec, codec_for, to_numbers
+from hyperliquid_ledger import DEFAULT_MIN_SYNC_INTERVAL_SECONDS, FILLS_PAGE_LIMIT, FUNDING_PAGE_LIMIT, Ledgers
+from hyperliquid_metrics import Metrics, serve_prometheus
+from hyperliquid_paging import DEFAULT_CHUNK_ROWS, candle_windows, chunked, time_pages
+from hyperliquid_orderbook import DEFAULT_MAX_SLIPPAGE, OrderBook, OrderBooks, market_limit_price
+from hyperliquid_recorder import Recorder, ReplayUpstream
+from hyperliquid_ratelimit import DEFAULT_READ_DEADLINE_MS, READ, TRADE, RateLimitScheduler, Throttled
+from hyperliquid_signing import DEFAULT_SIGN_WORKERS, SigningPool
+from hyperliquid_stream import DEFAULT_MAX_STALENESS_MS, MarketStream, ws_url_for
+from hyperliquid_symbols import SymbolTable
+from hyperliquid_tracker import AccountTracker
+from hyperliquid_transport import Transport
+
+try:
+    from hyperliquid_candles import CandleStore
+except ImportError:  # NumPy not installed; get_candles stays on the direct REST path
+    CandleStore = None
+try:
+    from hyperliquid_analytics import DEFAULT_CURVE_POINTS, FILL_PATHS, FUNDING_PATHS, MetricsCache, compute_metrics
+except ImportError:  # NumPy not installed; get_performance_metrics is unavailable
+    MetricsCache = None
+try:
+    from hyperliquid_risk import RiskScanner
+except ImportError:  # NumPy not installed; liquidation-risk scanning is unavailable
+    RiskScanner = None
 
 # Global clients (initialized once)
 info_client = None
-exchange_client = None
-ACCOUNT_ADDRESS = None
-API_SECRET = None
-
-def init_clients(account_address: str, api_secret: str, testnet: bool = False):
-    """Initialize clients once."""
-    global info_client, exchange_client, ACCOUNT_ADDRESS, API_SECRET
-    ACCOUNT_ADDRESS = account_address
-    API_SECRET = api_secret
-    api_url = constants.TESTNET_API_URL if testnet else constants.MAINNET_API_URL
+# Pooled HTTP session shared by info_client and every Exchange client
+transport = None
+# Records upstream Info traffic, or replays it in place of the network
+recorder = None
+replay = None
+accounts = None
+symbol_table = None
+read_cache = ReadCache()
+rate_limiter = RateLimitScheduler()
+metrics = Metrics()
+delta_encoder = DeltaEncoder()
+signing_pool = SigningPool()
+order_books = OrderBooks()
+candle_store = None
+ledgers = None
+metrics_cache = MetricsCache() if MetricsCache is not None else None
+market_stream = None
+risk_scanner = None
+# Positions and open orders of registered accounts, so trades need no pre-read
+account_tracker = AccountTracker(
+    lambda address: info_client.user_state(address),
+    lambda address: info_client.open_orders(address),
+)
+execution_engine = None
+stream_max_staleness_ms = DEFAULT_MAX_STALENESS_MS
+API_URL = None
+
+# Commands that change exchange state. They run in their own lane so a slow
+# read (candles, books) can never sit in front of an order or a cancel.
+TRADING_COMMANDS = {
+    "place_order",
+    "cancel_order",
+    "cancel_all_orders",
+    "close_position",
+    "modify_order",
+    "place_market_order",
+    "bulk_place_orders",
+    "bulk_cancel",
+    "bulk_modify",
+    "place_bracket_order",
+    # Registration is ordered with the trades that follow it
+    "register_account",
+    "unregister_account",
+    # Parent orders and their controls
+    "start_execution",
+    "pause_execution",
+    "resume_execution",
+    "cancel_execution",
+}
+
+# History reads that can answer as chunk frames (args.stream) instead of one line
+STREAMING_COMMANDS = {"get_user_fills", "get_candles", "get_user_funding", "get_funding_history"}
+
+# Upper bound on sub-requests carried by one batch envelope
+MAX_BATCH_SIZE = 100
+
+# Upper bound on addresses in one get_user_states fan-out, and its concurrency
+MAX_FANOUT_ADDRESSES = 1000
+FANOUT_WORKERS = 16
+
+# Cached reads that a trading command can make stale
+ACCOUNT_READ_COMMANDS = ("get_user_state", "get_open_orders")
+
+# Local state (candle store, ledgers) lives here unless the init line overrides it
+DEFAULT_DATA_DIR = os.environ.get("HYPERLIQUID_DATA_DIR") or os.path.join(os.path.expanduser("~"), ".hypertrade")
+
+# Executor sizing, overridable from the init line
+DEFAULT_TRADE_WORKERS = 4
+DEFAULT_READ_WORKERS = 8
+DEFAULT_MAX_PENDING_READS = 64
+
+_stdout_lock = threading.Lock()
+# Wire framing negotiated on the init line; numeric_payloads sends decimal strings as numbers
+protocol = LineCodec()
+numeric_payloads = False
+# Threads for per-address fan-out reads, separate from the read lane that waits on them
+_fanout_pool = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="fanout")
+_nonce_lock = threading.Lock()
+_last_nonce = 0
+
+def next_nonce() -> int:
+    """Millisecond timestamp nonce that stays unique across concurrent signers."""
+    global _last_nonce
+    with _nonce_lock:
+        _last_nonce = max(int(time.time() * 1000), _last_nonce + 1)
+        return _last_nonce
+
+# The SDK stamps every action with get_timestamp_ms(); two orders signed in the
+# same millisecond would share a nonce and one of them would be rejected.
+hl_exchange.get_timestamp_ms = next_nonce
+_network_post = hl_api.API.post
+
+def network_post(api, url_path: str, payload=None):
+    """One call over the wire; /info is recorded in record mode."""
+    result = _network_post(api, url_path, payload)
+    if recorder is not None and url_path == "/info":
+        recorder.record(url_path, payload, result)
+    return result
+
+# Every Info/Exchange REST call that reaches the network goes through the
+# rate-limit scheduler. Time waiting for budget, on the wire and signing is
+# attributed to the request.
+_scheduled_post = rate_limiter.wrap_post(metrics.timed("upstream", network_post))
+_replay_post = metrics.timed("upstream", lambda payload: replay.post(payload))
+
+def upstream_post(api, url_path: str, payload=None):
+    """In replay mode /info is served from recordings, which spend no upstream budget."""
+    if replay is not None and url_path == "/info":
+        return _replay_post(payload)
+    return _scheduled_post(api, url_path, payload)
+
+hl_api.API.post = upstream_post
+rate_limiter.acquire = metrics.timed("rate_limit", rate_limiter.acquire)
+# Signing runs on the pool's worker processes once it is started
+hl_exchange.sign_l1_action = metrics.timed("sign", signing_pool.sign_l1_action)
+
+def start_recording(config, data_dir: str):
+    """
+    Record or replay upstream Info traffic. Runs before the clients are built
+    so their meta loads are recorded (or replayed) too. /exchange always
+    goes to api_url.
+    """
+    global recorder, replay
+    if config.get("replay"):
+        replay_config = config["replay"]
+        replay = ReplayUpstream(
+            replay_config.get("dir") or os.path.join(data_dir, "recordings"),
+            replay_config.get("speed", 1.0),
+            bool(replay_config.get("loop")),
+        )
+        replay.start()
+    elif config.get("record"):
+        record_config = config["record"] if isinstance(config["record"], dict) else {}
+        recorder = Recorder(record_config.get("dir") or os.path.join(data_dir, "recordings"))
+        recorder.start()
+
+def init_clients(
+    account_address: str,
+    api_secret: str,
+    testnet: bool = False,
+    max_clients: int = DEFAULT_MAX_CLIENTS,
+    api_url: Optional[str] = None,
+    transport_config: Optional[dict] = None,
+):
+    """
+    Initialize the shared clients once and register the default account.
+    api_url (or HYPERLIQUID_API_URL) points the daemon at another server,
+    e.g. the local stand-in used by server/bench. transport_config tunes the
+    shared HTTP pool (pool_size, warm_connections, keepalive_seconds, timeouts).
+    """
+    global info_client, accounts, symbol_table, transport, API_URL
+    api_url = api_url or os.environ.get("HYPERLIQUID_API_URL") or (
+        constants.TESTNET_API_URL if testnet else constants.MAINNET_API_URL
+    )
+    API_URL = api_url
     
     if info_client is None:
-        info_client = Info(api_url, skip_ws=True)
+        transport = Transport(api_url, **(transport_config or {}))
+        # Exchange clients built by the pool take info_client's session, i.e. this one
+        info_client = transport.attach(Info(api_url, skip_ws=True))
+        symbol_table = SymbolTable(info_client.meta, info_client.spot_meta)
+        # Load now so the first order does not pay for (and wait on budget for) meta
+        symbol_table.refresh()
     
-    if exchange_client is None:
-        # Create LocalAccount from private key
-        wallet = Account.from_key(API_SECRET)
-        exchange_client = Exchange(wallet, api_url)
+    if accounts is None:
+        # Every account shares info_client; Exchange clients are pooled per address
+        accounts = AccountPool(api_url, info_client, max_clients)
+        if account_address and api_secret:
+            accounts.register(account_address, api_secret, default=True)
+
+def account_for(args: dict) -> str:
+    """Address a request acts on: args["account"] or the default account."""
+    return accounts.resolve(args.get("account"))
+
+def address_for(args: dict) -> str:
+    """Address a read is about: args["address"], else the request's account; always normalized."""
+    address = args.get("address")
+    return normalize_address(address) if address else account_for(args)
+
+def exchange_for(args: dict):
+    """Pooled Exchange client for the request's account."""
+    return accounts.exchange(args.get("account"))
+
+def start_market_stream(config: dict):
+    """
+    Start the optional WebSocket market-state mode.
+
+    config: {"coins": [...], "ws_url": optional override (e.g. a local stand-in
+    server), "max_staleness_ms": how old streamed state may be before reads
+    fall back to REST, "user": account whose order updates and fills feed
+    the account tracker (default: the default account)}.
+    """
+    global market_stream, stream_max_staleness_ms
+    stream_max_staleness_ms = int(config.get("max_staleness_ms", DEFAULT_MAX_STALENESS_MS))
+    market_stream = MarketStream(
+        config.get("ws_url") or ws_url_for(API_URL),
+        config.get("coins", []),
+        snapshot_mids=info_client.all_mids,
+        snapshot_book=info_client.l2_snapshot,
+        user=config.get("user") or accounts.default,
+    )
+    market_stream.add_listener("l2Book", order_books.load)
+    if market_stream.user:
+        account_tracker.streamed_user = market_stream.user
+        account_tracker.stream_connected = lambda: market_stream.connected
+        market_stream.add_listener("orderUpdates", account_tracker.on_order_updates)
+        market_stream.add_listener("userFills", account_tracker.on_user_fills)
+        market_stream.add_listener("connected", account_tracker.on_stream_connected)
+    market_stream.start()
+
+def start_candle_store(data_dir: str):
+    """Serve get_candles from the on-disk store under data_dir."""
+    global candle_store
+    candle_store = CandleStore(data_dir, info_client.candles_snapshot)
+
+def start_risk_scanner():
+    """
+    Scan watched users' positions against every mids update.
+    Mids come from the market stream when it runs, else from polling.
+    """
+    global risk_scanner
+    poll_mids = None
+    if market_stream is None:
+        poll_mids = lambda: read_cache.get("get_all_mids", (), info_client.all_mids)
+    risk_scanner = RiskScanner(
+        lambda address: read_cache.get(
+            "get_user_state", (normalize_address(address),), lambda: info_client.user_state(address)
+        ),
+        write_response,
+        poll_mids,
+    )
+    if market_stream is not None:
+        market_stream.add_listener("allMids", risk_scanner.on_mids)
+    risk_scanner.start()
+
+def require_risk_scanner():
+    if risk_scanner is None:
+        raise RuntimeError("Liquidation-risk scanning requires NumPy")
+    return risk_scanner
+
+def submit_child(account: str, coin: str, is_buy: bool, sz: float, limit_px: float, tif: str) -> dict:
+    """Send one child order of a parent execution; returns its exchange status."""
+    args = {"account": account}
+    order = {
+        "coin": coin, "is_buy": is_buy, "sz": sz, "limit_px": limit_px,
+        "order_type": {"limit": {"tif": tif}}, "reduce_only": False,
+    }
+    with rate_limiter.context(TRADE):
+        result = exchange_for(args).bulk_orders([order])
+    statuses = order_statuses(result, 1)
+    account_tracker.on_orders(account, [order], statuses)
+    account_changed(args)
+    return statuses[0] if statuses else {"error": "No order status returned"}
+
+def child_price(coin: str, is_buy: bool, sz: float, slippage: float) -> float:
+    return symbol_table.round_price(coin, market_limit_price(load_book(coin), is_buy, sz, slippage))
+
+def child_order_state(account: str, oid: int) -> tuple:
+    """(still open, filled size) of a resting child: tracked state first, one order query once it is gone."""
+    with rate_limiter.context(TRADE):
+        if any(order["oid"] == oid for order in account_tracker.open_orders(account)):
+            return True, 0.0
+        order = info_client.query_order_by_oid(account, oid).get("order") or {}
+    if order.get("status") == "open":
+        return True, 0.0
+    details = order.get("order") or {}
+    return False, float(details.get("origSz") or 0) - float(details.get("sz") or 0)
+
+def cancel_child(account: str, coin: str, oid: int):
+    args = {"account": account}
+    with rate_limiter.context(TRADE):
+        result = exchange_for(args).cancel(coin, oid)
+    statuses = order_statuses(result, 1)
+    account_tracker.on_cancels(account, [{"coin": coin, "oid": oid}], statuses)
+    account_changed(args)
+    return statuses[0] if statuses else None
+
+def transient_error(e: Exception) -> bool:
+    """Failures a parent order retries rather than dying on: network, upstream 5xx and 429."""
+    if isinstance(e, ClientError):
+        return e.status_code == 429
+    return isinstance(e, (OSError, ServerError, Throttled))
+
+def start_execution_engine():
+    """Run parent orders in the daemon; POV parents count volume from streamed trades."""
+    global execution_engine
+    execution_engine = ExecutionEngine(
+        submit_child,
+        child_price,
+        symbol_table.round_size,
+        child_order_state,
+        cancel_child,
+        write_response,
+        streamed_coins=market_stream.coins if market_stream else (),
+        transient=transient_error,
+    )
+    if market_stream is not None:
+        market_stream.add_listener("trades", execution_engine.on_trades)
+    execution_engine.start()
+
+def start_ledgers(data_dir: str):
+    """Keep per-address fill/funding ledgers under data_dir."""
+    global ledgers
+    ledgers = Ledgers(
+        data_dir,
+        lambda address, start, end: info_client.user_fills_by_time(address, start, end),
+        lambda address, start, end: info_client.user_funding_history(address, start, end),
+    )
+
+def read_ledger(kind: str, args: dict) -> dict:
+    """Sync the address's ledger (throttled) and read fills/funding by cursor or time range."""
+    ledger = ledgers.get(address_for(args))
+    if args.get("sync", True):
+        ledger.sync(DEFAULT_MIN_SYNC_INTERVAL_SECONDS)
+    return ledger.read(kind, args.get("cursor"), args.get("startTime"), args.get("endTime"), args.get("limit"))
+
+def performance_metrics(args: dict) -> dict:
+    """Portfolio metrics from the address's ledger, recomputed only when it gains rows."""
+    if metrics_cache is None:
+        raise RuntimeError("get_performance_metrics requires NumPy")
+    ledger = ledgers.get(address_for(args))
+    if args.get("sync", True):
+        ledger.sync(DEFAULT_MIN_SYNC_INTERVAL_SECONDS)
+    start, end = args.get("startTime"), args.get("endTime")
+    points = int(args.get("curvePoints") or DEFAULT_CURVE_POINTS)
+    return metrics_cache.get(
+        ledger.address,
+        ledger.version(),
+        (start, end, points),
+        lambda: compute_metrics(
+            ledger.rows("fills", FILL_PATHS, start, end),
+            ledger.rows("funding", FUNDING_PATHS, start, end),
+            points,
+        ),
+    )
+
+def load_book(coin: str) -> OrderBook:
+    """Local book for a coin: kept current by the stream when fresh, else one REST snapshot."""
+    if market_stream and market_stream.book(coin, stream_max_staleness_ms):
+        return order_books.get(coin)
+    l2 = read_cache.get("get_l2_snapshot", (coin,), lambda: info_client.l2_snapshot(coin))
+    return order_books.load(l2)
+
+def market_order(args: dict, coin: str, is_buy: bool, sz: float, slippage: float, reduce_only: bool = False) -> dict:
+    """
+    IOC order priced from the book so the size actually fits inside the slippage
+    band. A reduce-only order too big for the band goes out at the band's edge
+    and fills partially rather than being refused.
+    """
+    sz = symbol_table.round_size(coin, sz)
+    book = load_book(coin)
+    limit_px = symbol_table.round_price(coin, market_limit_price(book, is_buy, sz, slippage, allow_partial=reduce_only))
+    result = exchange_for(args).order(coin, is_buy, sz, limit_px, {"limit": {"tif": "Ioc"}}, reduce_only)
+    order = {"coin": coin, "is_buy": is_buy, "sz": sz, "limit_px": limit_px}
+    account_tracker.on_orders(account_for(args), [order], order_statuses(result, 1))
+    return result
+
+def round_order_type(coin: str, order_type: dict) -> dict:
+    """Round a trigger order's triggerPx to the asset's price precision."""
+    trigger = order_type.get("trigger")
+    if not trigger or not trigger.get("triggerPx"):
+        return order_type
+    trigger = dict(trigger, triggerPx=symbol_table.round_price(coin, trigger["triggerPx"]))
+    return dict(order_type, trigger=trigger)
+
+def account_changed(args: dict):
+    """Drop cached reads of the request's account after a trading command."""
+    address = account_for(args)
+    read_cache.invalidate(ACCOUNT_READ_COMMANDS, (address,))
+    if risk_scanner is not None:
+        risk_scanner.refresh_soon(address)
+
+def order_request(args: dict) -> dict:
+    """Build an SDK OrderRequest from command args, rounded to asset precision."""
+    coin = args.get("coin")
+    order = {
+        "coin": coin,
+        "is_buy": args.get("is_buy"),
+        # Round up front so the exchange never rejects on precision
+        "sz": symbol_table.round_size(coin, args.get("sz")),
+        "limit_px": symbol_table.round_price(coin, args.get("limit_px")),
+        "order_type": round_order_type(coin, args.get("order_type") or {"limit": {"tif": "Gtc"}}),
+        "reduce_only": args.get("reduce_only", False),
+    }
+    if args.get("cloid"):
+        order["cloid"] = Cloid.from_str(args["cloid"])
+    return order
+
+def order_statuses(result: dict, count: int) -> list:
+    """Per-order statuses from an exchange response, aligned with the submitted orders."""
+    if result.get("status") == "ok":
+        return result.get("response", {}).get("data", {}).get("statuses", [])
+    return [{"error": result.get("response")}] * count
+
+def bracket_order(args: dict) -> dict:
+    """
+    Entry plus attached TP and/or SL as one signed "normalTpsl" action, so the
+    exits exist the moment the entry fills. Without limit_px the entry is an
+    IOC priced from the book.
+    """
+    coin = args.get("coin")
+    is_buy = bool(args.get("is_buy"))
+    sz = symbol_table.round_size(coin, float(args.get("sz")))
+    if args.get("stop_loss_px") is None and args.get("take_profit_px") is None:
+        raise ValueError("place_bracket_order needs stop_loss_px and/or take_profit_px")
+    if args.get("limit_px") is not None:
+        entry = dict(args, sz=sz, order_type={"limit": {"tif": args.get("tif", "Gtc")}}, reduce_only=False)
+    else:
+        slippage = float(args.get("slippage", DEFAULT_MAX_SLIPPAGE))
+        limit_px = market_limit_price(load_book(coin), is_buy, sz, slippage)
+        entry = dict(args, sz=sz, limit_px=limit_px, order_type={"limit": {"tif": "Ioc"}}, reduce_only=False)
+    legs = [("entry", order_request(entry))]
+    # Exits close the entry: opposite side, reduce only, limit derived like standalone TP/SL
+    exits = (("stop_loss", "sl", args.get("stop_loss_px"), stop_loss_limit_price),
+             ("take_profit", "tp", args.get("take_profit_px"), take_profit_limit_price))
+    for leg, tpsl, trigger_px, limit_price in exits:
+        if trigger_px is None:
+            continue
+        trigger_px = float(trigger_px)
+        legs.append((leg, order_request({
+            "coin": coin,
+            "is_buy": not is_buy,
+            "sz": sz,
+            "limit_px": limit_price(not is_buy, trigger_px),
+            "order_type": {"trigger": {"triggerPx": trigger_px, "isMarket": False, "tpsl": tpsl}},
+            "reduce_only": True,
+        })))
+    requests = [order for _, order in legs]
+    result = exchange_for(args).bulk_orders(requests, grouping="normalTpsl")
+    statuses = order_statuses(result, len(requests))
+    account_tracker.on_orders(account_for(args), requests, statuses)
+    return {
+        "status": result.get("status"),
+        "grouping": "normalTpsl",
+        "legs": [{"type": leg, "status": status} for (leg, _), status in zip(legs, statuses)],
+    }
+
+def bulk_cancel(args: dict, cancels: list) -> dict:
+    """Cancel many orders (by oid and/or cloid) with one signed action per id kind."""
+    exchange = exchange_for(args)
+    by_oid = [c for c in cancels if c.get("oid") is not None]
+    by_cloid = [c for c in cancels if c.get("oid") is None]
+    results = []
+    if by_oid:
+        result = exchange.bulk_cancel([{"coin": c["coin"], "oid": int(c["oid"])} for c in by_oid])
+        results += zip(by_oid, order_statuses(result, len(by_oid)))
+    if by_cloid:
+        result = exchange.bulk_cancel_by_cloid(
+            [{"coin": c["coin"], "cloid": Cloid.from_str(c["cloid"])} for c in by_cloid]
+        )
+        results += zip(by_cloid, order_statuses(result, len(by_cloid)))
+    account_tracker.on_cancels(account_for(args), [c for c, _ in results], [status for _, status in results])
+    return {
+        "statuses": [
+            {"coin": c["coin"], "oid": c.get("oid"), "cloid": c.get("cloid"), "status": status}
+            for c, status in results
+        ]
+    }
+
+def tracks(address: str) -> bool:
+    """Whether reads of an address are served from the account tracker (registered accounts only)."""
+    return accounts.registered(address)
+
+def user_states(addresses: list) -> dict:
+    """Clearinghouse state for many addresses, fetched concurrently through the read cache."""
+    if len(addresses) > MAX_FANOUT_ADDRESSES:
+        raise ValueError(f"get_user_states accepts at most {MAX_FANOUT_ADDRESSES} addresses")
+
+    def load(address):
+        try:
+            key = normalize_address(address)
+            state = read_cache.get("get_user_state", (key,), lambda: info_client.user_state(key))
+            return {"success": True, "data": state}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    addresses = list(dict.fromkeys(addresses))
+    return dict(zip(addresses, _fanout_pool.map(rate_limiter.propagate(load), addresses)))
+
+def history_pages(command: str, args: dict):
+    """Upstream pages of a history read, oldest first, one time window at a time."""
+    start = int(args.get("startTime") or 0)
+    end = int(args.get("endTime") or time.time() * 1000)
+    if command == "get_candles":
+        coin = args.get("coin")
+        interval = args.get("interval", "1h")
+        for window_start, window_end in candle_windows(interval, start, end):
+            if candle_store is not None:
+                yield candle_store.get(coin, interval, window_start, window_end, bool(args.get("compact", False)))
+            else:
+                yield info_client.candles_snapshot(coin, interval, window_start, window_end)
+        return
+    if command == "get_funding_history":
+        coin = args.get("coin")
+        fetch = lambda page_start, page_end: info_client.funding_history(coin, page_start, page_end)
+        yield from time_pages(fetch, start, end, FUNDING_PAGE_LIMIT)
+        return
+    address = address_for(args)
+    if command == "get_user_funding":
+        fetch = lambda page_start, page_end: info_client.user_funding_history(address, page_start, page_end)
+        yield from time_pages(fetch, start, end, FUNDING_PAGE_LIMIT)
+    elif args.get("startTime") is None:
+        # No range: the most recent fills, as get_user_fills has always returned
+        yield info_client.user_fills(address)
+    else:
+        fetch = lambda page_start, page_end: info_client.user_fills_by_time(address, page_start, page_end)
+        yield from time_pages(fetch, start, end, FILLS_PAGE_LIMIT)
+
+def polled_response(request_id, args: dict, data, **extra) -> dict:
+    """
+    Response for a polled read: projected to the depth/sections/fields the
+    caller asked for, and delta-encoded against its last poll when it names
+    a subscription.
+    """
+    data = project(data, args.get("depth"), args.get("sections"), args.get("fields"))
+    if args.get("subscription"):
+        data = delta_encoder.encode(str(args["subscription"]), args.get("since"), data)
+    return {"id": request_id, "success": True, "data": data, **extra}
+
+def is_trading_request(request: dict) -> bool:
+    """Whether a request (or any request inside a batch) changes exchange state."""
+    command = request.get("command")
+    if command == "batch":
+        return any(is_trading_request(sub) for sub in (request.get("args") or {}).get("requests", []))
+    return command in TRADING_COMMANDS
+
+def handle_batch(request_id, requests: list, account=None) -> dict:
+    """
+    Run the sub-requests of a batch envelope in order and combine their responses.
+    An account on the batch applies to every sub-request that does not name its own.
+    """
+    if len(requests) > MAX_BATCH_SIZE:
+        return {"id": request_id, "success": False, "error": f"Batch exceeds {MAX_BATCH_SIZE} requests"}
+    responses = []
+    for index, sub in enumerate(requests):
+        sub = dict(sub, id=sub.get("id", index))
+        if account:
+            sub["args"] = {"account": account, **(sub.get("args") or {})}
+        if sub.get("command") == "batch":
+            responses.append({"id": sub["id"], "success": False, "error": "Nested batches are not supported"})
+        elif (sub.get("args") or {}).get("stream"):
+            responses.append({"id": sub["id"], "success": False, "error": "Streamed reads are not supported in a batch"})
+        else:
+            responses.append(handle_request(sub))
+    return {"id": request_id, "success": True, "data": responses}
 
 def handle_request(request: dict) -> dict:
     """Handle a single API request."""
@@ -40,79 +606,249 @@ def handle_request(request: dict) -> dict:
     try:
         command = request.get("command")
         args = request.get("args", {})
+
+        if args.get("stream") and command in STREAMING_COMMANDS:
+            # Pages are fetched as the executor writes them out, never all at once
+            chunks = chunked(history_pages(command, args), int(args.get("chunk_rows") or DEFAULT_CHUNK_ROWS))
+            return {"id": request_id, "success": True, "stream": chunks}
         
         if command == "get_user_state":
-            address = args.get("address") or ACCOUNT_ADDRESS
-            result = info_client.user_state(address)
-            return {"id": request_id, "success": True, "data": result}
+            address = address_for(args)
+            result = read_cache.get(command, (address,), lambda: info_client.user_state(address))
+            return polled_response(request_id, args, result)
             
         elif command == "get_all_mids":
-            result = info_client.all_mids()
-            return {"id": request_id, "success": True, "data": result}
+            streamed = market_stream.mids(stream_max_staleness_ms) if market_stream else None
+            if streamed:
+                mids, age_ms = streamed
+                return {"id": request_id, "success": True, "data": mids, "source": "stream", "age_ms": age_ms}
+            result = read_cache.get(command, (), info_client.all_mids)
+            return {"id": request_id, "success": True, "data": result, "source": "rest"}
             
+        elif command == "get_user_states":
+            result = user_states(args.get("addresses", []))
+            return {"id": request_id, "success": True, "data": result}
+
+        elif command == "list_accounts":
+            result = {"addresses": accounts.addresses(), **accounts.stats()}
+            return {"id": request_id, "success": True, "data": result}
+
         elif command == "get_meta":
-            result = info_client.meta()
+            result = read_cache.get(command, (), info_client.meta)
             return {"id": request_id, "success": True, "data": result}
             
         elif command == "get_l2_snapshot":
             coin = args.get("coin")
-            result = info_client.l2_snapshot(coin)
-            return {"id": request_id, "success": True, "data": result}
+            streamed = market_stream.book(coin, stream_max_staleness_ms) if market_stream else None
+            if streamed:
+                book, age_ms = streamed
+                return polled_response(request_id, args, book, source="stream", age_ms=age_ms)
+            result = read_cache.get(command, (coin,), lambda: info_client.l2_snapshot(coin))
+            return polled_response(request_id, args, result, source="rest")
             
         elif command == "get_open_orders":
-            address = args.get("address") or ACCOUNT_ADDRESS
-            result = info_client.open_orders(address)
-            return {"id": request_id, "success": True, "data": result}
+            address = address_for(args)
+            if tracks(address):
+                result = account_tracker.open_orders(address)
+            else:
+                result = read_cache.get(command, (address,), lambda: info_client.open_orders(address))
+            return polled_response(request_id, args, result)
 
         elif command == "get_user_fills":
-            address = args.get("address") or ACCOUNT_ADDRESS
-            result = info_client.user_fills(address)
+            address = address_for(args)
+            result = read_cache.get(command, (address,), lambda: info_client.user_fills(address))
             return {"id": request_id, "success": True, "data": result}
             
+        elif command in ("get_user_funding", "get_funding_history"):
+            result = list(itertools.chain.from_iterable(history_pages(command, args)))
+            return {"id": request_id, "success": True, "data": result}
+
+        elif command == "get_book_quote":
+            result = load_book(args.get("coin")).quote()
+            return {"id": request_id, "success": True, "data": result}
+
+        elif command == "get_book_depth":
+            book = load_book(args.get("coin"))
+            bps_levels = args.get("bps") or [10, 25, 50, 100]
+            result = {"coin": book.coin, "mid": book.mid(), "depth": {str(bps): book.depth(float(bps)) for bps in bps_levels}}
+            return {"id": request_id, "success": True, "data": result}
+
+        elif command == "estimate_fill":
+            book = load_book(args.get("coin"))
+            result = book.estimate_fill(bool(args.get("is_buy")), float(args.get("sz")))
+            return {"id": request_id, "success": True, "data": result}
+
+        elif command == "get_recent_trades":
+            if not market_stream:
+                return {"id": request_id, "success": False, "error": "Streaming mode is not enabled"}
+            result = market_stream.trades(args.get("coin"), int(args.get("limit", 50)))
+            return {"id": request_id, "success": True, "data": result}
+
+        elif command == "stream_status":
+            result = market_stream.status() if market_stream else {"enabled": False}
+            return {"id": request_id, "success": True, "data": result}
+
+        elif command == "get_ledger_fills":
+            return {"id": request_id, "success": True, "data": read_ledger("fills", args)}
+
+        elif command == "get_ledger_funding":
+            return {"id": request_id, "success": True, "data": read_ledger("funding", args)}
+
+        elif command == "watch_liquidation_risk":
+            scanner = require_risk_scanner()
+            if args.get("thresholds"):
+                scanner.configure(args["thresholds"])
+            added = scanner.watch(args.get("addresses", []), bool(args.get("replace")))
+            return {"id": request_id, "success": True, "data": {"added": added, **scanner.stats()}}
+
+        elif command == "unwatch_liquidation_risk":
+            removed = require_risk_scanner().unwatch(args.get("addresses", []))
+            return {"id": request_id, "success": True, "data": {"removed": removed}}
+
+        elif command == "scan_liquidation_risk":
+            scanner = require_risk_scanner()
+            result = {"positions": scanner.snapshot(args.get("maxDistancePercent")), "stats": scanner.stats()}
+            return {"id": request_id, "success": True, "data": result}
+
+        elif command == "get_performance_metrics":
+            return {"id": request_id, "success": True, "data": performance_metrics(args)}
+
+        elif command == "sync_ledger":
+            ledger = ledgers.get(address_for(args))
+            result = {"added": ledger.sync(), **ledger.stats()}
+            return {"id": request_id, "success": True, "data": result}
+
+        elif command == "candle_store_stats":
+            result = candle_store.stats() if candle_store is not None else {"enabled": False}
+            return {"id": request_id, "success": True, "data": result}
+
+        elif command == "stats":
+            if args.get("format") == "prometheus":
+                return {"id": request_id, "success": True, "data": metrics.prometheus()}
+            return {"id": request_id, "success": True, "data": metrics.stats()}
+
+        elif command == "rate_limit_status":
+            return {"id": request_id, "success": True, "data": rate_limiter.status()}
+
+        elif command == "get_execution":
+            return {"id": request_id, "success": True, "data": execution_engine.get(args.get("id"))}
+
+        elif command == "list_executions":
+            executions = execution_engine.list(bool(args.get("include_finished")))
+            return {"id": request_id, "success": True, "data": {"executions": executions, **execution_engine.stats()}}
+
+        elif command == "account_state_stats":
+            return {"id": request_id, "success": True, "data": account_tracker.stats()}
+
+        elif command == "signing_stats":
+            return {"id": request_id, "success": True, "data": signing_pool.stats()}
+
+        elif command == "recorder_stats":
+            upstream = replay or recorder
+            result = upstream.stats() if upstream is not None else {"mode": "network"}
+            return {"id": request_id, "success": True, "data": result}
+
+        elif command == "transport_stats":
+            return {"id": request_id, "success": True, "data": transport.stats()}
+
+        elif command == "cache_stats":
+            return {"id": request_id, "success": True, "data": read_cache.stats()}
+
+        elif command == "delta_stats":
+            return {"id": request_id, "success": True, "data": delta_encoder.stats()}
+
+        elif command == "get_asset_info":
+            result = symbol_table.get(args.get("coin"))._asdict()
+            return {"id": request_id, "success": True, "data": result}
+
         elif command == "get_candles":
             coin = args.get("coin")
             interval = args.get("interval", "1h")
-            start_time = args.get("startTime")
-            end_time = args.get("endTime")
-            result = info_client.candles_snapshot(coin, interval, int(start_time), int(end_time))
+            start_time = int(args.get("startTime"))
+            end_time = int(args.get("endTime"))
+            compact = bool(args.get("compact", False))
+            if candle_store is not None:
+                # Only the missing ranges (and the still-open candle) go upstream
+                load = lambda: candle_store.get(coin, interval, start_time, end_time, compact)
+            else:
+                load = lambda: info_client.candles_snapshot(coin, interval, start_time, end_time)
+            result = read_cache.get(command, (coin, interval, start_time, end_time, compact), load)
             return {"id": request_id, "success": True, "data": result}
         
         # Trading commands
+        elif command == "batch":
+            return handle_batch(request_id, args.get("requests", []), args.get("account"))
+
+        elif command == "register_account":
+            result = accounts.register(
+                args.get("address"), args.get("secret"), args.get("vault_address"), bool(args.get("default"))
+            )
+            return {"id": request_id, "success": True, "data": result}
+
+        elif command == "unregister_account":
+            address = args.get("address")
+            removed = accounts.unregister(address)
+            account_tracker.forget(address)
+            read_cache.invalidate(ACCOUNT_READ_COMMANDS, (normalize_address(address),))
+            return {"id": request_id, "success": True, "data": {"removed": removed}}
+
+        elif command == "start_execution":
+            spec = {k: v for k, v in args.items() if k != "account"}
+            if spec.get("limit_px") and spec.get("coin"):
+                spec["limit_px"] = symbol_table.round_price(spec["coin"], spec["limit_px"])
+            result = execution_engine.start_parent(account_for(args), spec)
+            return {"id": request_id, "success": True, "data": result}
+
+        elif command == "pause_execution":
+            return {"id": request_id, "success": True, "data": execution_engine.pause(args.get("id"))}
+
+        elif command == "resume_execution":
+            return {"id": request_id, "success": True, "data": execution_engine.resume(args.get("id"))}
+
+        elif command == "cancel_execution":
+            return {"id": request_id, "success": True, "data": execution_engine.cancel(args.get("id"))}
+
         elif command == "place_order":
+            # Defaults to a GTC limit order
+            order = order_request(args)
+            result = exchange_for(args).bulk_orders([order])
+            account_tracker.on_orders(account_for(args), [order], order_statuses(result, 1))
+            account_changed(args)
+            return {"id": request_id, "success": True, "data": result}
+        
+        elif command == "place_market_order":
             coin = args.get("coin")
-            is_buy = args.get("is_buy")
-            sz = args.get("sz")  # Size
-            limit_px = args.get("limit_px")  # Limit price
-            order_type = args.get("order_type", {"limit": {"tif": "Gtc"}})  # Default to GTC limit
-            reduce_only = args.get("reduce_only", False)
+            slippage = float(args.get("slippage", DEFAULT_MAX_SLIPPAGE))
             
-            result = exchange_client.order(coin, is_buy, sz, limit_px, order_type, reduce_only)
+            result = market_order(args, coin, bool(args.get("is_buy")), float(args.get("sz")), slippage)
+            account_changed(args)
             return {"id": request_id, "success": True, "data": result}
         
         elif command == "cancel_order":
             coin = args.get("coin")
             oid = args.get("oid")  # Order ID
             
-            result = exchange_client.cancel(coin, oid)
+            result = exchange_for(args).cancel(coin, oid)
+            account_tracker.on_cancels(account_for(args), [{"coin": coin, "oid": oid}], order_statuses(result, 1))
+            account_changed(args)
             return {"id": request_id, "success": True, "data": result}
         
         elif command == "cancel_all_orders":
             coin = args.get("coin")
             
-            result = exchange_client.cancel_all(coin)
+            # One signed cancel action for every open order (optionally one coin). Unstreamed
+            # tracker state can be seconds old, so it is resynced first to catch new orders.
+            cancels = account_tracker.current_open_orders(account_for(args), coin)
+            result = bulk_cancel(args, cancels) if cancels else {"statuses": []}
+            account_changed(args)
             return {"id": request_id, "success": True, "data": result}
         
         elif command == "close_position":
             coin = args.get("coin")
             sz = args.get("sz", None)  # Optional: partial close size
             
-            # Get current position to determine side
-            user_state = info_client.user_state(ACCOUNT_ADDRESS)
-            position = None
-            for pos in user_state.get("assetPositions", []):
-                if pos["position"]["coin"] == coin:
-                    position = pos["position"]
-                    break
+            # Tracked position determines the side
+            position = account_tracker.position(account_for(args), coin)
             
             if not position:
                 return {"id": request_id, "success": False, "error": f"No open position for {coin}"}
@@ -127,54 +863,248 @@ def handle_request(request: dict) -> dict:
             # Close is opposite side of position
             is_buy = position_size < 0  # If short, buy to close
             
-            # Use market order for closing (trigger order)
-            order_type = {"trigger": {"isMarket": True, "triggerPx": 0, "tpsl": "tp"}}
-            
-            result = exchange_client.order(coin, is_buy, close_size, 0, order_type, reduce_only=True)
+            # Reduce-only IOC priced from the book
+            slippage = float(args.get("slippage", DEFAULT_MAX_SLIPPAGE))
+            result = market_order(args, coin, is_buy, close_size, slippage, reduce_only=True)
+            account_changed(args)
             return {"id": request_id, "success": True, "data": result}
         
         elif command == "modify_order":
             oid = args.get("oid")
-            coin = args.get("coin")
-            is_buy = args.get("is_buy")
-            sz = args.get("sz")
-            limit_px = args.get("limit_px")
-            order_type = args.get("order_type", {"limit": {"tif": "Gtc"}})
-            reduce_only = args.get("reduce_only", False)
             
-            result = exchange_client.modify(oid, coin, is_buy, sz, limit_px, order_type, reduce_only)
+            order = order_request(args)
+            result = exchange_for(args).bulk_modify_orders_new([{"oid": oid, "order": order}])
+            account_tracker.on_modifies(account_for(args), [dict(order, oid=oid)], order_statuses(result, 1))
+            account_changed(args)
             return {"id": request_id, "success": True, "data": result}
 
+        elif command == "bulk_place_orders":
+            orders = args.get("orders", [])
+            grouping = args.get("grouping", "na")
+            
+            requests = [order_request(o) for o in orders]
+            result = exchange_for(args).bulk_orders(requests, grouping=grouping)
+            statuses = order_statuses(result, len(orders))
+            account_tracker.on_orders(account_for(args), requests, statuses)
+            account_changed(args)
+            data = {"status": result.get("status"), "statuses": statuses}
+            return {"id": request_id, "success": True, "data": data}
+
+        elif command == "place_bracket_order":
+            result = bracket_order(args)
+            account_changed(args)
+            return {"id": request_id, "success": True, "data": result}
+
+        elif command == "bulk_cancel":
+            result = bulk_cancel(args, args.get("cancels", []))
+            account_changed(args)
+            return {"id": request_id, "success": True, "data": result}
+
+        elif command == "bulk_modify":
+            modifies = args.get("modifies", [])
+            requests = [order_request(m) for m in modifies]
+            
+            result = exchange_for(args).bulk_modify_orders_new(
+                [{"oid": m["oid"], "order": order} for m, order in zip(modifies, requests)]
+            )
+            statuses = order_statuses(result, len(modifies))
+            account_tracker.on_modifies(
+                account_for(args), [dict(order, oid=m["oid"]) for m, order in zip(modifies, requests)], statuses
+            )
+            account_changed(args)
+            data = {"status": result.get("status"), "statuses": statuses}
+            return {"id": request_id, "success": True, "data": data}
+
         else:
             return {"id": request_id, "success": False, "error": f"Unknown command: {command}"}
 
+    except Throttled as e:
+        metrics.error("Throttled")
+        return {
+            "id": request_id, "success": False, "error": str(e),
+            "throttled": True, "retry_after_ms": e.retry_after_ms,
+        }
     except Exception as e:
+        metrics.error(type(e).__name__)
+        if request.get("command") in TRADING_COMMANDS:
+            # The action may or may not have reached the exchange
+            try:
+                account_tracker.invalidate(account_for(request.get("args") or {}))
+            except Exception:
+                pass
         return {"id": request_id, "success": False, "error": str(e)}
 
+def write_response(response: dict) -> int:
+    """Write one response line and return its size. Safe to call from any worker thread."""
+    started = time.perf_counter()
+    codec = protocol
+    try:
+        if numeric_payloads:
+            for key in ("data", "chunk"):
+                if key in response:
+                    response = dict(response, **{key: to_numbers(response[key])})
+        frame = codec.encode(response)
+    except Exception as e:
+        frame = codec.encode({"id": response.get("id"), "success": False, "error": str(e)})
+    metrics.add("encode", time.perf_counter() - started)
+    with _stdout_lock:
+        sys.stdout.buffer.write(frame)
+        sys.stdout.buffer.flush()
+    return len(frame)
+
+def write_stream(request_id, chunks, priority: int) -> tuple:
+    """
+    Write a streamed read as chunk frames and a final end frame, returning
+    (success, bytes). Each frame is its own line, so other responses can
+    interleave and the client never buffers the whole result.
+    """
+    size = 0
+    count = 0
+    try:
+        # The read deadline covers the first page; once rows are flowing the rest follows
+        first = next(chunks, None)
+        with rate_limiter.context(priority):
+            for chunk in itertools.chain([] if first is None else [first], chunks):
+                size += write_response({"id": request_id, "chunk": chunk, "seq": count})
+                count += 1
+    except Exception as e:
+        metrics.error(type(e).__name__)
+        end = {"id": request_id, "end": True, "success": False, "error": str(e), "chunks": count}
+        if isinstance(e, Throttled):
+            end.update(throttled=True, retry_after_ms=e.retry_after_ms)
+        return False, size + write_response(end)
+    return True, size + write_response({"id": request_id, "end": True, "success": True, "data": {"chunks": count}})
+
+def read_deadline_ms(request: dict) -> float:
+    """A read's deadline_ms, or the default when it is missing or not a number."""
+    args = request.get("args")
+    try:
+        deadline_ms = float(args.get("deadline_ms", DEFAULT_READ_DEADLINE_MS))
+    except (AttributeError, TypeError, ValueError):
+        return DEFAULT_READ_DEADLINE_MS
+    return deadline_ms if math.isfinite(deadline_ms) else DEFAULT_READ_DEADLINE_MS
+
+class RequestExecutor:
+    """
+    Runs requests concurrently on two lanes and writes responses as they finish.
+
+    Trading commands go to a dedicated high-priority pool. Reads go to a separate
+    pool whose backlog is bounded; once it is full, further reads are rejected
+    immediately instead of queueing behind each other. Responses may be written
+    out of order and are correlated by their "id".
+    """
+
+    def __init__(self, trade_workers: int, read_workers: int, max_pending_reads: int):
+        self.trade_pool = ThreadPoolExecutor(max_workers=trade_workers, thread_name_prefix="trade")
+        self.read_pool = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix="read")
+        self.read_slots = threading.BoundedSemaphore(max_pending_reads)
+
+    def submit(self, request: dict, received: float, decode_seconds: float, request_bytes: int):
+        metrics.received()
+        timing = (received, decode_seconds, request_bytes)
+        if is_trading_request(request):
+            # Trades wait for upstream budget rather than ever being dropped
+            self.trade_pool.submit(self._run, request, None, TRADE, None, timing)
+        elif self.read_slots.acquire(blocking=False):
+            # Reads are dropped once they could no longer be answered in time
+            deadline = time.monotonic() + read_deadline_ms(request) / 1000
+            self.read_pool.submit(self._run, request, self.read_slots, READ, deadline, timing)
+        else:
+            metrics.dropped()
+            write_response({"id": request.get("id"), "success": False, "error": "Read lane is full, retry later"})
+
+    def _run(self, request: dict, slot, priority: int, deadline, timing: tuple):
+        record = metrics.begin(request.get("command"), *timing)
+        try:
+            with rate_limiter.context(priority, deadline):
+                response = handle_request(request)
+                if "stream" in response:
+                    success, size = write_stream(response["id"], response["stream"], priority)
+        finally:
+            if slot is not None:
+                slot.release()
+        if "stream" not in response:
+            success, size = bool(response.get("success")), write_response(response)
+        metrics.finish(record, success, size)
+
+    def shutdown(self):
+        """Wait for in-flight requests so their responses are still written."""
+        self.trade_pool.shutdown(wait=True)
+        self.read_pool.shutdown(wait=True)
+
 def main():
     """Main daemon loop."""
-    # Read initialization from first line
-    init_line = sys.stdin.readline()
+    global protocol, numeric_payloads
+    # Read initialization from first line (always line JSON; it negotiates the framing)
+    init_line = sys.stdin.buffer.readline()
     init_data = json.loads(init_line)
+    # Fork signers first, while this process has no other threads
+    signing_pool.start(int(init_data.get("sign_workers", DEFAULT_SIGN_WORKERS)))
+    data_dir = init_data.get("data_dir") or DEFAULT_DATA_DIR
+    start_recording(init_data, data_dir)
+    if replay is not None:
+        # Replayed candles and fills must not land in the real local stores
+        data_dir = tempfile.mkdtemp(prefix="hl-replay-")
     init_clients(
-        init_data["account_address"],
-        init_data["api_secret"],
-        init_data.get("testnet", False)
+        init_data.get("account_address"),
+        init_data.get("api_secret"),
+        init_data.get("testnet", False),
+        int(init_data.get("max_clients", DEFAULT_MAX_CLIENTS)),
+        init_data.get("api_url"),
+        init_data.get("transport"),
     )
+    # Open the pool's connections before the first order needs one (replay may have no network)
+    if replay is None:
+        transport.start()
+    executor = RequestExecutor(
+        int(init_data.get("trade_workers", DEFAULT_TRADE_WORKERS)),
+        int(init_data.get("read_workers", DEFAULT_READ_WORKERS)),
+        int(init_data.get("max_pending_reads", DEFAULT_MAX_PENDING_READS)),
+    )
+    read_cache.configure(init_data.get("cache_ttls"), init_data.get("cache_max_entries"))
+    rate_limiter.configure(init_data.get("rate_limits"), init_data.get("trade_reserve"))
+    if init_data.get("metrics_port"):
+        serve_prometheus(metrics, int(init_data["metrics_port"]))
+    if CandleStore is not None and init_data.get("candle_store", True):
+        start_candle_store(data_dir)
+    start_ledgers(data_dir)
+    if init_data.get("stream"):
+        start_market_stream(init_data["stream"])
+    if RiskScanner is not None:
+        start_risk_scanner()
+    account_tracker.configure(init_data.get("account_state"))
+    account_tracker.start()
+    start_execution_engine()
     
-    # Signal ready
-    print(json.dumps({"ready": True}), flush=True)
+    # Signal ready as a JSON line, then switch to the framing the client asked for
+    codec = codec_for(init_data.get("protocol", LineCodec.name))
+    write_response({"ready": True, "protocol": codec.name})
+    protocol = codec
+    numeric_payloads = bool(init_data.get("numeric"))
     
-    # Process requests
-    for line in sys.stdin:
-        if not line.strip():
-            continue
-        try:
-            request = json.loads(line)
-            response = handle_request(request)
-            print(json.dumps(response), flush=True)
-        except Exception as e:
-            print(json.dumps({"success": False, "error": str(e)}), flush=True)
+    # Dispatch requests; workers write their own responses
+    try:
+        for frame in codec.frames(sys.stdin.buffer):
+            received = time.perf_counter()
+            try:
+                request = codec.decode(frame)
+            except Exception as e:
+                write_response({"success": False, "error": str(e)})
+                continue
+            if not isinstance(request, dict):
+                write_response({"success": False, "error": "Request must be an object"})
+                continue
+            executor.submit(request, received, time.perf_counter() - received, len(frame))
+    except ValueError as e:
+        # A corrupt length prefix leaves no frame boundary to resync on: stop reading,
+        # but let in-flight trades finish and answer before exiting
+        print(f"[daemon] input stream out of sync, shutting down: {e}", file=sys.stderr)
+        write_response({"event": "protocol_error", "data": {"error": str(e), "fatal": True}})
+
+    executor.shutdown()
+    signing_pool.shutdown()
+    if recorder is not None:
+        recorder.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Field projection and delta encoding for polled daemon reads.
+A poller names the part of a payload it renders (book depth, user_state
+sections, fields) and, with a subscription key, receives only what changed
+since the version it last applied instead of the full payload.
+"""
+
+import copy
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+DEFAULT_MAX_SUBSCRIPTIONS = 256
+# Past this many ops a delta costs about as much as the payload; send it whole
+MAX_DELTA_OPS = 200
+
+def project(
+    data: Any,
+    depth: Optional[int] = None,
+    sections: Optional[Iterable[str]] = None,
+    fields: Optional[Iterable[str]] = None,
+) -> Any:
+    """
+    Narrow a read result without mutating it.
+
+    depth keeps the top N levels of each side of an l2 book; sections keeps
+    top-level keys of a dict payload (e.g. user_state's marginSummary);
+    fields are dotted paths kept from the payload, or from each element of
+    a list payload (e.g. open orders).
+    """
+    if depth is not None and isinstance(data, dict) and "levels" in data:
+        data = dict(data, levels=[side[: int(depth)] for side in data["levels"]])
+    if sections and isinstance(data, dict):
+        data = {key: data[key] for key in sections if key in data}
+    if fields:
+        paths = [field.split(".") for field in fields]
+        if isinstance(data, list):
+            data = [_select(item, paths) for item in data]
+        else:
+            data = _select(data, paths)
+    return data
+
+def _select(value: Any, paths: List[List[str]]) -> Any:
+    """Keep the given key paths of a dict; lists along a path are selected element-wise."""
+    if isinstance(value, list):
+        return [_select(item, paths) for item in value]
+    if not isinstance(value, dict):
+        return value
+    selected: Dict[str, Any] = {}
+    children: Dict[str, List[List[str]]] = {}
+    for path in paths:
+        if path[0] not in value:
+            continue
+        if len(path) == 1:
+            selected[path[0]] = value[path[0]]
+        else:
+            children.setdefault(path[0], []).append(path[1:])
+    for key, rest in children.items():
+        if key not in selected:
+            selected[key] = _select(value[key], rest)
+    # Keep payload key order so encoded output is stable
+    return {key: selected[key] for key in value if key in selected}
+
+def diff(old: Any, new: Any, path: Optional[list] = None, ops: Optional[list] = None) -> list:
+    """
+    Ops turning old into new: ["set", path, value] or ["del", path], where path
+    is a list of dict keys and list indexes. Lists of equal length are diffed
+    per element; anything else that differs is replaced whole.
+    """
+    path = path or []
+    ops = [] if ops is None else ops
+    if old == new:
+        return ops
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                ops.append(["del", path + [key]])
+        for key, value in new.items():
+            if key not in old:
+                ops.append(["set", path + [key], value])
+            else:
+                diff(old[key], value, path + [key], ops)
+    elif isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        for index, (before, after) in enumerate(zip(old, new)):
+            diff(before, after, path + [index], ops)
+    else:
+        ops.append(["set", path, new])
+    return ops
+
+def apply(data: Any, ops: list) -> Any:
+    """Apply diff() ops to a copy of data (the reference the TS client mirrors)."""
+    data = copy.deepcopy(data)
+    for op in ops:
+        path = op[1]
+        if not path:
+            data = op[2]
+            continue
+        parent = data
+        for key in path[:-1]:
+            parent = parent[key]
+        if op[0] == "del":
+            del parent[path[-1]]
+        else:
+            parent[path[-1]] = op[2]
+    return data
+
+class DeltaEncoder:
+    """
+    Last payload sent per subscription key, for versioned delta responses.
+
+    A request carries its subscription key and the version it last applied
+    ("since"). If that is still the stored version the response is either
+    "unchanged" or a list of ops; otherwise (first poll, daemon restart,
+    evicted key) it is the full payload. Versions come from one counter
+    seeded from the clock, so a version from an earlier daemon process never
+    matches by accident.
+    """
+
+    def __init__(self, max_subscriptions: int = DEFAULT_MAX_SUBSCRIPTIONS):
+        self.max_subscriptions = max_subscriptions
+        self._versions = itertools.count(int(time.time() * 1000))
+        self._last: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.full = 0
+        self.deltas = 0
+        self.unchanged = 0
+
+    def encode(self, key: str, since: Optional[int], data: Any) -> Dict[str, Any]:
+        with self._lock:
+            previous = self._last.get(key)
+            if previous is not None:
+                self._last.move_to_end(key)
+        if previous is not None and since is not None and int(since) == previous[0]:
+            version, old = previous
+            if old == data:
+                with self._lock:
+                    self.unchanged += 1
+                return {"version": version, "unchanged": True}
+            ops = diff(old, data)
+            if len(ops) <= MAX_DELTA_OPS:
+                version = self._store(key, data)
+                with self._lock:
+                    self.deltas += 1
+                return {"version": version, "base": since, "ops": ops}
+        version = self._store(key, data)
+        with self._lock:
+            self.full += 1
+        return {"version": version, "data": data}
+
+    def _store(self, key: str, data: Any) -> int:
+        # Upstream objects (cache entries, tracked orders) can change in place
+        snapshot = copy.deepcopy(data)
+        with self._lock:
+            version = next(self._versions)
+            self._last[key] = (version, snapshot)
+            self._last.move_to_end(key)
+            while len(self._last) > self.max_subscriptions:
+                self._last.popitem(last=False)
+            return version
+
+    def forget(self, key: str):
+        with self._lock:
+            self._last.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "subscriptions": len(self._last),
+                "max_subscriptions": self.max_subscriptions,
+                "full": self.full,
+                "deltas": self.deltas,
+                "unchanged": self.unchanged,
+            }
@@ -0,0 +1,552 @@
+#!/usr/bin/env python3
+"""
+Server-side execution of parent orders (TWAP, iceberg, participation of volume).
+Parents live in the daemon and are stepped from a hashed timer wheel, so they
+keep working when the caller disconnects and hundreds can run at once. Each
+step sends at most one child order; progress and fills are pushed as events.
+"""
+
+import itertools
+import math
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set
+
+TICK_SECONDS = 0.1
+WHEEL_SLOTS = 512
+STEP_WORKERS = 8
+MAX_ACTIVE_PARENTS = 1000
+# Finished parents kept for get_execution
+MAX_FINISHED_PARENTS = 1000
+# Iceberg/POV parents re-check their child or the traded volume this often
+DEFAULT_CHECK_SECONDS = 1.0
+# The exchange rejects orders below $10 of notional
+DEFAULT_MIN_CHILD_NOTIONAL = 10.0
+DEFAULT_SLIPPAGE = 0.01
+# A parent is done once less than this fraction of its size remains
+SIZE_EPSILON = 1e-9
+# Consecutive transient step failures (network, 5xx, 429) retried before a parent fails
+MAX_STEP_RETRIES = 5
+RETRY_SECONDS = 1.0
+
+TYPES = ("twap", "iceberg", "pov")
+# Expired: ran out of slices or time with size still unfilled
+RUNNING, PAUSED, DONE, CANCELED, FAILED, EXPIRED = "running", "paused", "done", "canceled", "failed", "expired"
+
+class TimerWheel:
+    """
+    Hashed timer wheel: O(1) schedule and cancel, one slot visited per tick.
+    Delays longer than a revolution wait out their remaining rounds in place.
+    """
+
+    def __init__(self, tick_seconds: float = TICK_SECONDS, slots: int = WHEEL_SLOTS):
+        self.tick_seconds = tick_seconds
+        self._slots: List[Dict[Any, int]] = [{} for _ in range(slots)]
+        self._where: Dict[Any, int] = {}
+        self._cursor = 0
+        self._ticks = 0
+        self._origin = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def schedule(self, key: Any, delay: float):
+        """Fire key after delay seconds (at least one tick), replacing any earlier timer."""
+        self.cancel(key)
+        ticks = max(1, math.ceil(delay / self.tick_seconds))
+        n = len(self._slots)
+        slot = (self._cursor + ticks) % n
+        self._slots[slot][key] = (ticks - 1) // n
+        self._where[key] = slot
+
+    def cancel(self, key: Any):
+        slot = self._where.pop(key, None)
+        if slot is not None:
+            self._slots[slot].pop(key, None)
+
+    def advance(self, now: float) -> List[Any]:
+        """Move the cursor up to `now` and return the keys that fell due."""
+        due = []
+        target = int((now - self._origin) / self.tick_seconds)
+        while self._ticks < target:
+            self._ticks += 1
+            self._cursor = (self._cursor + 1) % len(self._slots)
+            slot = self._slots[self._cursor]
+            for key, rounds in list(slot.items()):
+                if rounds:
+                    slot[key] = rounds - 1
+                else:
+                    del slot[key]
+                    del self._where[key]
+                    due.append(key)
+        return due
+
+class ParentOrder:
+    """One parent order and its execution progress."""
+
+    def __init__(self, parent_id: str, account: str, spec: Dict[str, Any]):
+        self.id = parent_id
+        self.account = account
+        self.type = spec["type"]
+        self.coin = spec["coin"]
+        self.is_buy = bool(spec["is_buy"])
+        self.sz = float(spec["sz"])
+        self.limit_px = float(spec["limit_px"]) if spec.get("limit_px") else None
+        self.slippage = float(spec.get("slippage", DEFAULT_SLIPPAGE))
+        self.duration = float(spec.get("duration_s") or 0)
+        self.slices = int(spec.get("slices") or 0)
+        self.display_sz = float(spec.get("display_sz") or 0)
+        self.participation = float(spec.get("participation") or 0)
+        self.check_seconds = float(spec.get("check_s", DEFAULT_CHECK_SECONDS))
+        self.min_notional = float(spec.get("min_child_notional", DEFAULT_MIN_CHILD_NOTIONAL))
+        self.status = RUNNING
+        self.created = time.time()
+        self.started = time.monotonic()
+        self.paused_for = 0.0
+        self.paused_at: Optional[float] = None
+        self.filled = 0.0
+        self.notional = 0.0
+        self.children = 0
+        self.slices_done = 0
+        self.market_volume = 0.0
+        self.child_oid: Optional[int] = None
+        self.error: Optional[str] = None
+        self.busy = False
+        self.retries = 0
+        # Held while a step or a cancel works on the parent's child order
+        self.step_lock = threading.Lock()
+
+    @property
+    def remaining(self) -> float:
+        return max(self.sz - self.filled, 0.0)
+
+    def elapsed(self) -> float:
+        """Seconds of running time, excluding pauses."""
+        paused = self.paused_for + (time.monotonic() - self.paused_at if self.paused_at else 0.0)
+        return time.monotonic() - self.started - paused
+
+    def add_fill(self, sz: float, px: float):
+        self.filled += sz
+        self.notional += sz * px
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "account": self.account,
+            "type": self.type,
+            "coin": self.coin,
+            "is_buy": self.is_buy,
+            "sz": self.sz,
+            "filled": self.filled,
+            "remaining": self.remaining,
+            "avg_px": self.notional / self.filled if self.filled else None,
+            "limit_px": self.limit_px,
+            "status": self.status,
+            "children": self.children,
+            "slices_done": self.slices_done,
+            "slices": self.slices or None,
+            "elapsed_s": self.elapsed(),
+            "child_oid": self.child_oid,
+            "error": self.error,
+            "created": self.created,
+        }
+
+def validate(spec: Dict[str, Any]):
+    kind = spec.get("type")
+    if kind not in TYPES:
+        raise ValueError(f"Execution type must be one of {', '.join(TYPES)}")
+    if not spec.get("coin") or float(spec.get("sz") or 0) <= 0:
+        raise ValueError("coin and a positive sz are required")
+    if kind == "twap" and (float(spec.get("duration_s") or 0) <= 0 or int(spec.get("slices") or 0) <= 0):
+        raise ValueError("twap requires duration_s and slices")
+    if kind == "iceberg" and (not spec.get("limit_px") or float(spec.get("display_sz") or 0) <= 0):
+        raise ValueError("iceberg requires limit_px and display_sz")
+    if kind == "pov" and not 0 < float(spec.get("participation") or 0) <= 1:
+        raise ValueError("pov requires participation in (0, 1]")
+
+class ExecutionEngine:
+    """
+    Runs parent orders against the venue through the supplied callables:
+
+    submit(account, coin, is_buy, sz, limit_px, tif) -> order status
+        ({"resting"}, {"filled"} or {"error"}, as in exchange responses)
+    price(coin, is_buy, sz, slippage) -> aggressive limit price from the book
+    round_size(coin, sz) -> size at the asset's precision
+    order_state(account, oid) -> (still_open, filled_sz)
+    cancel(account, coin, oid) -> cancel status
+    emit(event) -> push {"event", "data"} to the client
+    transient(exception) -> whether a failed step is worth retrying
+
+    The wheel thread only decides what is due; steps, which wait on the
+    network, run on a small pool, one at a time per parent.
+    """
+
+    def __init__(
+        self,
+        submit: Callable[[str, str, bool, float, float, str], Dict[str, Any]],
+        price: Callable[[str, bool, float, float], float],
+        round_size: Callable[[str, float], float],
+        order_state: Callable[[str, int], tuple],
+        cancel: Callable[[str, str, int], Any],
+        emit: Callable[[Dict[str, Any]], None],
+        streamed_coins: Optional[Set[str]] = None,
+        transient: Callable[[Exception], bool] = lambda e: isinstance(e, OSError),
+    ):
+        self._submit = submit
+        self._price = price
+        self._round_size = round_size
+        self._order_state = order_state
+        self._cancel = cancel
+        self._emit = emit
+        self._transient = transient
+        self.streamed_coins = set(streamed_coins or ())
+        self._parents: Dict[str, ParentOrder] = {}
+        self._finished: Dict[str, ParentOrder] = {}
+        self._wheel = TimerWheel()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._pool = ThreadPoolExecutor(max_workers=STEP_WORKERS, thread_name_prefix="execution")
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.child_orders = 0
+        self.child_errors = 0
+
+    # ------------------------------------------------------------------
+    # Commands
+    # ------------------------------------------------------------------
+
+    def start_parent(self, account: str, spec: Dict[str, Any]) -> Dict[str, Any]:
+        validate(spec)
+        if spec["type"] == "pov" and spec["coin"] not in self.streamed_coins:
+            raise ValueError(f"pov needs {spec['coin']} trades from the market stream")
+        with self._lock:
+            if len(self._parents) >= MAX_ACTIVE_PARENTS:
+                raise RuntimeError(f"At most {MAX_ACTIVE_PARENTS} parent orders may run at once")
+            parent = ParentOrder(f"x{int(time.time())}-{next(self._ids)}", account, spec)
+            self._parents[parent.id] = parent
+            self._wheel.schedule(parent.id, 0)
+        self._progress(parent)
+        return parent.snapshot()
+
+    def pause(self, parent_id: str) -> Dict[str, Any]:
+        with self._lock:
+            parent = self._active(parent_id)
+            if parent.status == RUNNING:
+                parent.status = PAUSED
+                parent.paused_at = time.monotonic()
+                self._wheel.cancel(parent.id)
+        self._progress(parent)
+        return parent.snapshot()
+
+    def resume(self, parent_id: str) -> Dict[str, Any]:
+        with self._lock:
+            parent = self._active(parent_id)
+            if parent.status == PAUSED:
+                parent.status = RUNNING
+                parent.paused_for += time.monotonic() - parent.paused_at
+                parent.paused_at = None
+                self._wheel.schedule(parent.id, 0)
+        self._progress(parent)
+        return parent.snapshot()
+
+    def cancel(self, parent_id: str) -> Dict[str, Any]:
+        with self._lock:
+            parent = self._active(parent_id)
+            self._wheel.cancel(parent.id)
+        # Waits out a step in flight, so a child is never collected twice
+        with parent.step_lock:
+            self._finish(parent, CANCELED)
+        return parent.snapshot()
+
+    def get(self, parent_id: str) -> Dict[str, Any]:
+        with self._lock:
+            parent = self._parents.get(parent_id) or self._finished.get(parent_id)
+            if parent is None:
+                raise ValueError(f"Unknown execution: {parent_id}")
+            return parent.snapshot()
+
+    def list(self, include_finished: bool = False) -> List[Dict[str, Any]]:
+        with self._lock:
+            parents = list(self._parents.values())
+            if include_finished:
+                parents += list(self._finished.values())
+            return [p.snapshot() for p in parents]
+
+    def _active(self, parent_id: str) -> ParentOrder:
+        parent = self._parents.get(parent_id)
+        if parent is None:
+            raise ValueError(f"No active execution: {parent_id}")
+        return parent
+
+    # ------------------------------------------------------------------
+    # Market data
+    # ------------------------------------------------------------------
+
+    def on_trades(self, trades: List[Dict[str, Any]]):
+        """Count traded volume for participation-of-volume parents (stream thread)."""
+        if not trades:
+            return
+        coin = trades[0]["coin"]
+        with self._lock:
+            for parent in self._parents.values():
+                if parent.type == "pov" and parent.coin == coin and parent.status == RUNNING:
+                    # Our own children trade too; participating in them would chase our own volume
+                    account = parent.account.lower()
+                    parent.market_volume += sum(
+                        float(t["sz"]) for t in trades if account not in (u.lower() for u in t.get("users") or ())
+                    )
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="execution-wheel", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(TICK_SECONDS):
+            with self._lock:
+                due = []
+                for parent_id in self._wheel.advance(time.monotonic()):
+                    parent = self._parents.get(parent_id)
+                    if parent is None or parent.status != RUNNING:
+                        continue
+                    if parent.busy:
+                        # Previous step still waiting on the exchange
+                        self._wheel.schedule(parent_id, TICK_SECONDS)
+                        continue
+                    parent.busy = True
+                    due.append(parent)
+            for parent in due:
+                self._pool.submit(self._step, parent)
+
+    def _step(self, parent: ParentOrder):
+        delay = None
+        try:
+            with parent.step_lock:
+                # Canceled (or paused) while this step waited for the lock
+                if parent.status == RUNNING:
+                    retries = parent.retries
+                    delay = getattr(self, f"_step_{parent.type}")(parent)
+                    if parent.retries == retries:
+                        parent.retries = 0
+        except Exception as e:
+            with parent.step_lock:
+                delay = self._retry(parent, e) if self._transient(e) else self._fail(parent, e)
+        finally:
+            with self._lock:
+                parent.busy = False
+                if delay is not None and parent.status == RUNNING:
+                    self._wheel.schedule(parent.id, delay)
+
+    def _retry(self, parent: ParentOrder, error: Any) -> Optional[float]:
+        """Delay before retrying a step that failed transiently, or None once out of retries."""
+        parent.retries += 1
+        if parent.retries > MAX_STEP_RETRIES:
+            return self._fail(parent, error)
+        parent.error = str(error)
+        print(f"[execution] {parent.id} step failed ({error}); retry {parent.retries}", file=sys.stderr)
+        return RETRY_SECONDS * parent.retries
+
+    def _fail(self, parent: ParentOrder, error: Any) -> None:
+        parent.error = str(error)
+        print(f"[execution] {parent.id} failed: {error}", file=sys.stderr)
+        self._finish(parent, FAILED)
+        return None
+
+    def _finish(self, parent: ParentOrder, status: str):
+        """End a parent (caller holds its step_lock). A resting child is canceled first."""
+        with self._lock:
+            if parent.id not in self._parents:
+                return
+            self._wheel.cancel(parent.id)
+        if parent.child_oid is not None:
+            self._cancel_child(parent)
+        with self._lock:
+            if self._parents.pop(parent.id, None) is None:
+                return
+            parent.status = status
+            self._finished[parent.id] = parent
+            while len(self._finished) > MAX_FINISHED_PARENTS:
+                self._finished.pop(next(iter(self._finished)))
+        self._progress(parent)
+
+    # ------------------------------------------------------------------
+    # Child orders
+    # ------------------------------------------------------------------
+
+    def _send(self, parent: ParentOrder, sz: float, limit_px: float, tif: str) -> Dict[str, Any]:
+        status = self._submit(parent.account, parent.coin, parent.is_buy, sz, limit_px, tif)
+        parent.children += 1
+        self.child_orders += 1
+        if "filled" in status:
+            filled = status["filled"]
+            self._fill(parent, float(filled["totalSz"]), float(filled["avgPx"]), filled.get("oid"))
+        elif "error" in status:
+            self.child_errors += 1
+            parent.error = str(status["error"])
+        return status
+
+    def _fill(self, parent: ParentOrder, sz: float, px: float, oid: Optional[int]):
+        if sz <= 0:
+            return
+        parent.add_fill(sz, px)
+        self._emit({
+            "event": "execution_fill",
+            "data": {"id": parent.id, "coin": parent.coin, "is_buy": parent.is_buy, "sz": sz, "px": px,
+                     "oid": oid, "filled": parent.filled, "remaining": parent.remaining},
+        })
+
+    def _progress(self, parent: ParentOrder):
+        self._emit({"event": "execution_progress", "data": parent.snapshot()})
+
+    def _child_price(self, parent: ParentOrder, sz: float) -> float:
+        """Aggressive price for a child of this size, capped at the parent's limit."""
+        px = self._price(parent.coin, parent.is_buy, sz, parent.slippage)
+        if parent.limit_px is not None:
+            px = min(px, parent.limit_px) if parent.is_buy else max(px, parent.limit_px)
+        return px
+
+    def _slice_price(self, parent: ParentOrder, sz: float) -> Optional[float]:
+        """Child price for a slice, or None when the book cannot take it inside the slippage band."""
+        try:
+            return self._child_price(parent, sz)
+        except ValueError as e:
+            parent.error = str(e)
+            return None
+
+    def _aggressive_child(self, parent: ParentOrder, sz: float) -> bool:
+        """
+        Send an IOC child priced from the book, capped at the parent's limit.
+        False if too small, or if the book is too thin for it right now; the
+        slice is then skipped and its size left for later steps.
+        """
+        sz = self._round_size(parent.coin, min(sz, parent.remaining))
+        if sz <= 0:
+            return False
+        px = self._slice_price(parent, sz)
+        if px is None or sz * px < parent.min_notional:
+            return False
+        self._send(parent, sz, px, "Ioc")
+        return True
+
+    def _done(self, parent: ParentOrder) -> bool:
+        if parent.remaining <= parent.sz * SIZE_EPSILON:
+            self._finish(parent, DONE)
+            return True
+        return False
+
+    def _expire(self, parent: ParentOrder):
+        """End a parent that is out of slices or time: done if filled, else expired with its remainder."""
+        if not self._done(parent):
+            parent.error = f"Ended with {parent.remaining:g} of {parent.sz:g} unfilled"
+            self._finish(parent, EXPIRED)
+
+    # ------------------------------------------------------------------
+    # Strategies: each returns the delay until its next step, or None when finished
+    # ------------------------------------------------------------------
+
+    def _step_twap(self, parent: ParentOrder) -> Optional[float]:
+        # Slices span the whole duration: the first at the start, the last at duration_s
+        interval = parent.duration / (parent.slices - 1) if parent.slices > 1 else 0.0
+        slices_left = parent.slices - parent.slices_done
+        # Size each slice from what is still unfilled so misses are caught up
+        sz = parent.remaining / slices_left
+        if slices_left == 2:
+            # A last slice too small to send goes out with this one instead. Its
+            # notional is estimated at this slice's price: pricing the whole
+            # remainder would fail on a book that only fits one slice.
+            px = self._slice_price(parent, self._round_size(parent.coin, sz))
+            if px is not None and (parent.remaining - sz) * px < parent.min_notional:
+                sz = parent.remaining
+        # A slice too small for one child rolls into the next
+        self._aggressive_child(parent, sz)
+        parent.slices_done += 1
+        self._progress(parent)
+        if self._done(parent):
+            return None
+        if parent.slices_done >= parent.slices:
+            # Out of slices: a remainder left by partial fills is reported, not forced
+            self._expire(parent)
+            return None
+        return interval
+
+    def _step_iceberg(self, parent: ParentOrder) -> Optional[float]:
+        if parent.child_oid is not None:
+            if not self._collect_child(parent):
+                return parent.check_seconds
+            self._progress(parent)
+        if self._done(parent):
+            return None
+        sz = self._round_size(parent.coin, min(parent.display_sz, parent.remaining))
+        if sz <= 0:
+            self._finish(parent, DONE)
+            return None
+        status = self._send(parent, sz, parent.limit_px, "Gtc")
+        if "resting" in status:
+            parent.child_oid = int(status["resting"]["oid"])
+        elif "error" in status:
+            # Rejections (margin, rate limits) may clear; a lasting one fails the parent
+            return self._retry(parent, status["error"])
+        parent.slices_done += 1
+        self._progress(parent)
+        return None if self._done(parent) else parent.check_seconds
+
+    def _cancel_child(self, parent: ParentOrder):
+        """Take a resting child down and count what it filled."""
+        oid = parent.child_oid
+        step = "canceled"
+        try:
+            self._cancel(parent.account, parent.coin, oid)
+            step = "collected"
+            self._collect_child(parent)
+        except Exception as e:
+            # child_oid stays on the finished parent, so the order is not lost track of
+            parent.error = f"{parent.error + '; ' if parent.error else ''}child {oid} not {step}: {e}"
+            print(f"[execution] {parent.id}: child {oid} not {step}: {e}", file=sys.stderr)
+
+    def _collect_child(self, parent: ParentOrder) -> bool:
+        """Account for a resting child once it is gone. False while it is still open."""
+        oid = parent.child_oid
+        if oid is None:
+            return True
+        still_open, filled = self._order_state(parent.account, oid)
+        if still_open:
+            return False
+        parent.child_oid = None
+        # Resting children fill at their limit or better; the limit is the conservative price
+        self._fill(parent, float(filled or 0), parent.limit_px, oid)
+        return True
+
+    def _step_pov(self, parent: ParentOrder) -> Optional[float]:
+        if parent.duration and parent.elapsed() >= parent.duration:
+            self._expire(parent)
+            return None
+        target = parent.participation * parent.market_volume
+        if self._aggressive_child(parent, target - parent.filled):
+            parent.slices_done += 1
+            self._progress(parent)
+        if self._done(parent):
+            return None
+        return parent.check_seconds
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            by_status: Dict[str, int] = {}
+            for parent in self._parents.values():
+                by_status[parent.status] = by_status.get(parent.status, 0) + 1
+            return {
+                "active": len(self._parents),
+                "by_status": by_status,
+                "finished": len(self._finished),
+                "timers": len(self._wheel),
+                "child_orders": self.child_orders,
+                "child_errors": self.child_errors,
+            }
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Local append-only ledger of fills and funding payments per address.
+Synced incrementally from a high-water-mark timestamp so repeated history
+reads come from SQLite instead of re-downloading the account's history.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Upstream page sizes: a full page means there may be more after it
+FILLS_PAGE_LIMIT = 2000
+FUNDING_PAGE_LIMIT = 500
+# Re-read a little before the high-water mark so fills sharing its
+# millisecond are never skipped; duplicates are dropped by the unique key.
+SYNC_OVERLAP_MS = 1000
+# Reads sync first, but not more often than this
+DEFAULT_MIN_SYNC_INTERVAL_SECONDS = 2.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fills (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    hash TEXT NOT NULL,
+    tid INTEGER NOT NULL,
+    time INTEGER NOT NULL,
+    coin TEXT NOT NULL,
+    data TEXT NOT NULL,
+    UNIQUE (hash, time, tid)
+);
+CREATE INDEX IF NOT EXISTS fills_time ON fills (time);
+CREATE TABLE IF NOT EXISTS funding (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    hash TEXT NOT NULL,
+    time INTEGER NOT NULL,
+    coin TEXT NOT NULL,
+    data TEXT NOT NULL,
+    UNIQUE (hash, time, coin)
+);
+CREATE INDEX IF NOT EXISTS funding_time ON funding (time);
+CREATE TABLE IF NOT EXISTS sync_state (
+    kind TEXT PRIMARY KEY,
+    high_water INTEGER NOT NULL,
+    synced_at INTEGER NOT NULL
+);
+"""
+
+FetchFills = Callable[[str, int, int], List[Dict[str, Any]]]
+FetchFunding = Callable[[str, int, int], List[Dict[str, Any]]]
+
+class Ledger:
+    """SQLite ledger for one address. Rows are only ever inserted; seq is the read cursor."""
+
+    def __init__(self, path: str, address: str, fetch_fills: FetchFills, fetch_funding: FetchFunding):
+        self.address = address
+        self._fetch_fills = fetch_fills
+        self._fetch_funding = fetch_funding
+        self._lock = threading.Lock()
+        self._last_sync = {"fills": 0.0, "funding": 0.0}
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def _high_water(self, kind: str) -> int:
+        row = self._db.execute("SELECT high_water FROM sync_state WHERE kind = ?", (kind,)).fetchone()
+        return row[0] if row else 0
+
+    def _set_high_water(self, kind: str, high_water: int):
+        self._db.execute(
+            "INSERT OR REPLACE INTO sync_state (kind, high_water, synced_at) VALUES (?, ?, ?)",
+            (kind, high_water, int(time.time() * 1000)),
+        )
+
+    def _sync(self, kind: str, fetch: Callable[[str, int, int], List[Dict[str, Any]]], page_limit: int,
+              insert: Callable[[List[Dict[str, Any]]], int]) -> int:
+        """Page forward from the high-water mark, inserting new rows. Returns rows added."""
+        high_water = self._high_water(kind)
+        start = max(0, high_water - SYNC_OVERLAP_MS)
+        now = int(time.time() * 1000)
+        added = 0
+        while True:
+            page = fetch(self.address, start, now)
+            added += insert(page)
+            if page:
+                high_water = max(high_water, max(row["time"] for row in page))
+            if len(page) < page_limit:
+                break
+            next_start = max(row["time"] for row in page)
+            if next_start <= start:
+                break  # a full page inside one millisecond; nothing more to page by time
+            start = next_start
+        self._set_high_water(kind, high_water)
+        self._db.commit()
+        return added
+
+    def _insert_fills(self, fills: List[Dict[str, Any]]) -> int:
+        before = self._db.total_changes
+        self._db.executemany(
+            "INSERT OR IGNORE INTO fills (hash, tid, time, coin, data) VALUES (?, ?, ?, ?, ?)",
+            [(f.get("hash", ""), int(f.get("tid", 0)), int(f["time"]), f.get("coin", ""), json.dumps(f)) for f in fills],
+        )
+        return self._db.total_changes - before
+
+    def _insert_funding(self, records: List[Dict[str, Any]]) -> int:
+        before = self._db.total_changes
+        self._db.executemany(
+            "INSERT OR IGNORE INTO funding (hash, time, coin, data) VALUES (?, ?, ?, ?)",
+            [(r.get("hash", ""), int(r["time"]), r.get("delta", {}).get("coin", ""), json.dumps(r)) for r in records],
+        )
+        return self._db.total_changes - before
+
+    def sync(self, min_interval: float = 0.0) -> Dict[str, int]:
+        """Pull anything newer than the high-water marks. Skips kinds synced within min_interval."""
+        added = {"fills": 0, "funding": 0}
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_sync["fills"] >= min_interval:
+                added["fills"] = self._sync("fills", self._fetch_fills, FILLS_PAGE_LIMIT, self._insert_fills)
+                self._last_sync["fills"] = now
+            if now - self._last_sync["funding"] >= min_interval:
+                added["funding"] = self._sync("funding", self._fetch_funding, FUNDING_PAGE_LIMIT, self._insert_funding)
+                self._last_sync["funding"] = now
+        return added
+
+    def read(
+        self,
+        kind: str,
+        cursor: Optional[int] = None,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Records added after `cursor` (a seq returned by a previous read) and/or
+        within [start_time, end_time]. Cursor reads return the last seq included;
+        range-only reads return the current tip to continue from incrementally.
+        """
+        if kind not in ("fills", "funding"):
+            raise ValueError(f"Unknown ledger kind: {kind}")
+        clauses, params = [], []
+        if cursor is not None:
+            clauses.append("seq > ?")
+            params.append(int(cursor))
+        if start_time is not None:
+            clauses.append("time >= ?")
+            params.append(int(start_time))
+        if end_time is not None:
+            clauses.append("time <= ?")
+            params.append(int(end_time))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        order = "seq" if cursor is not None else "time, seq"
+        sql = f"SELECT seq, data FROM {kind} {where} ORDER BY {order}"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+            tip = self.last_seq(kind)
+        if cursor is not None:
+            next_cursor = rows[-1][0] if rows else int(cursor)
+        else:
+            next_cursor = tip
+        return {"records": [json.loads(data) for _, data in rows], "cursor": next_cursor}
+
+    def rows(
+        self,
+        kind: str,
+        paths: List[str],
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> List[tuple]:
+        """
+        (time, *fields) tuples for every record in [start_time, end_time], ordered
+        by time. Fields are JSON paths extracted inside SQLite, which is much
+        cheaper than decoding whole records for bulk analytics.
+        """
+        if kind not in ("fills", "funding"):
+            raise ValueError(f"Unknown ledger kind: {kind}")
+        columns = ", ".join(["time"] + ["json_extract(data, ?)"] * len(paths))
+        params: List[Any] = list(paths)
+        clauses = []
+        if start_time is not None:
+            clauses.append("time >= ?")
+            params.append(int(start_time))
+        if end_time is not None:
+            clauses.append("time <= ?")
+            params.append(int(end_time))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            return self._db.execute(f"SELECT {columns} FROM {kind} {where} ORDER BY time, seq", params).fetchall()
+
+    def last_seq(self, kind: str) -> int:
+        row = self._db.execute(f"SELECT MAX(seq) FROM {kind}").fetchone()
+        return row[0] or 0
+
+    def version(self) -> tuple:
+        """Changes whenever a fill or funding row is added."""
+        with self._lock:
+            return (self.last_seq("fills"), self.last_seq("funding"))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                kind: {
+                    "rows": self._db.execute(f"SELECT COUNT(*) FROM {kind}").fetchone()[0],
+                    "high_water": self._high_water(kind),
+                    "cursor": self.last_seq(kind),
+                }
+                for kind in ("fills", "funding")
+            }
+
+class Ledgers:
+    """One Ledger per address, stored as <root>/ledger/<address>.sqlite3."""
+
+    def __init__(self, root: str, fetch_fills: FetchFills, fetch_funding: FetchFunding):
+        self.root = os.path.join(root, "ledger")
+        os.makedirs(self.root, exist_ok=True)
+        self._fetch_fills = fetch_fills
+        self._fetch_funding = fetch_funding
+        self._ledgers: Dict[str, Ledger] = {}
+        self._lock = threading.Lock()
+
+    def get(self, address: str) -> Ledger:
+        address = address.lower()
+        with self._lock:
+            ledger = self._ledgers.get(address)
+            if ledger is None:
+                if not re.fullmatch(r"0x[0-9a-f]{40}", address):
+                    raise ValueError(f"Invalid address: {address}")
+                path = os.path.join(self.root, f"{address}.sqlite3")
+                ledger = self._ledgers[address] = Ledger(path, address, self._fetch_fills, self._fetch_funding)
+            return ledger
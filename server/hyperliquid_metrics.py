@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Low-overhead request instrumentation for the daemon.
+Records per-command latency histograms split into phases (queue wait,
+upstream HTTP, rate-limit wait, signing, JSON decode/encode), error counts by
+type, in-flight requests and payload sizes, and renders them as a stats dict
+or Prometheus text format.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152)
+PHASES = ("queue", "decode", "rate_limit", "upstream", "sign", "encode")
+# Timings from threads that are not serving a request (stream, scanners, fan-out)
+BACKGROUND = "_background"
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th observation (None past the last bound)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.bounds, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return None
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+class _CommandStats:
+    __slots__ = ("latency", "phases", "request_bytes", "response_bytes", "errors")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.phases = {phase: Histogram(LATENCY_BUCKETS) for phase in PHASES}
+        self.request_bytes = Histogram(SIZE_BUCKETS)
+        self.response_bytes = Histogram(SIZE_BUCKETS)
+        self.errors: Dict[str, int] = {}
+
+class RequestRecord:
+    """Timings gathered on the serving thread while one request runs."""
+
+    __slots__ = ("command", "received", "phases", "request_bytes", "error")
+
+    def __init__(self, command: str, received: float, decode: float, request_bytes: int):
+        self.command = command
+        self.received = received
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.phases["decode"] = decode
+        self.request_bytes = request_bytes
+        self.error: Optional[str] = None
+
+class Metrics:
+    """
+    Aggregated daemon metrics. A request's record lives in a thread-local
+    while it is served, so wrapped functions (upstream post, signing) add
+    their time to whichever request called them without extra plumbing.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._commands: Dict[str, _CommandStats] = {}
+        self.inflight = 0
+        self.started = time.time()
+
+    def _stats(self, command: str) -> _CommandStats:
+        stats = self._commands.get(command)
+        if stats is None:
+            stats = self._commands[command] = _CommandStats()
+        return stats
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def received(self):
+        """A request was read and is waiting for a worker."""
+        with self._lock:
+            self.inflight += 1
+
+    def begin(self, command: str, received: float, decode: float, request_bytes: int) -> RequestRecord:
+        record = RequestRecord(command, received, decode, request_bytes)
+        # received is taken before decoding, so the decode phase is not queueing
+        record.phases["queue"] = time.perf_counter() - received - decode
+        self._local.record = record
+        return record
+
+    def add(self, phase: str, seconds: float):
+        record = getattr(self._local, "record", None)
+        if record is not None:
+            record.phases[phase] += seconds
+        else:
+            with self._lock:
+                self._stats(BACKGROUND).phases[phase].observe(seconds)
+
+    def error(self, error_type: str):
+        record = getattr(self._local, "record", None)
+        if record is not None and record.error is None:
+            record.error = error_type
+
+    def finish(self, record: RequestRecord, success: bool, response_bytes: int):
+        self._local.record = None
+        total = time.perf_counter() - record.received
+        with self._lock:
+            self.inflight -= 1
+            stats = self._stats(record.command)
+            stats.latency.observe(total)
+            for phase, seconds in record.phases.items():
+                if seconds:
+                    stats.phases[phase].observe(seconds)
+            stats.request_bytes.observe(record.request_bytes)
+            stats.response_bytes.observe(response_bytes)
+            if not success:
+                error_type = record.error or "error"
+                stats.errors[error_type] = stats.errors.get(error_type, 0) + 1
+
+    def dropped(self):
+        """A received request was answered without running (e.g. rejected by the read lane)."""
+        with self._lock:
+            self.inflight -= 1
+
+    def timed(self, phase: str, fn: Callable) -> Callable:
+        """Wrap fn so its duration counts toward `phase` of the calling request."""
+        metrics = self
+
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                metrics.add(phase, time.perf_counter() - started)
+        return wrapper
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "uptime_seconds": time.time() - self.started,
+                "inflight": self.inflight,
+                "commands": {
+                    command: {
+                        **s.latency.summary(),
+                        "errors": dict(s.errors),
+                        "phases": {p: h.summary() for p, h in s.phases.items() if h.count},
+                        "request_bytes": s.request_bytes.summary(),
+                        "response_bytes": s.response_bytes.summary(),
+                    }
+                    for command, s in self._commands.items()
+                },
+            }
+
+    def prometheus(self, prefix: str = "hyperliquid_daemon") -> str:
+        """Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def histogram(name: str, help_text: str, series: List[Tuple[str, Histogram]]):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for labels, h in series:
+                cumulative = 0
+                for bound, n in zip(h.bounds, h.counts):
+                    cumulative += n
+                    lines.append(f'{prefix}_{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_{name}_bucket{{{labels},le="+Inf"}} {h.count}')
+                lines.append(f"{prefix}_{name}_sum{{{labels}}} {h.sum}")
+                lines.append(f"{prefix}_{name}_count{{{labels}}} {h.count}")
+
+        with self._lock:
+            commands = sorted(self._commands.items())
+            histogram("request_seconds", "End-to-end request latency.",
+                      [(f'command="{c}"', s.latency) for c, s in commands if s.latency.count])
+            histogram("phase_seconds", "Time spent per request phase.",
+                      [(f'command="{c}",phase="{p}"', h) for c, s in commands for p, h in s.phases.items() if h.count])
+            histogram("request_bytes", "Request line size.",
+                      [(f'command="{c}"', s.request_bytes) for c, s in commands if s.request_bytes.count])
+            histogram("response_bytes", "Response line size.",
+                      [(f'command="{c}"', s.response_bytes) for c, s in commands if s.response_bytes.count])
+            lines.append(f"# HELP {prefix}_errors_total Failed requests by error type.")
+            lines.append(f"# TYPE {prefix}_errors_total counter")
+            for c, s in commands:
+                for error_type, n in sorted(s.errors.items()):
+                    lines.append(f'{prefix}_errors_total{{command="{c}",type="{error_type}"}} {n}')
+            lines.append(f"# HELP {prefix}_inflight_requests Requests received and not yet answered.")
+            lines.append(f"# TYPE {prefix}_inflight_requests gauge")
+            lines.append(f"{prefix}_inflight_requests {self.inflight}")
+        return "\n".join(lines) + "\n"
+
+def serve_prometheus(metrics: Metrics, port: int, host: str = "127.0.0.1"):
+    """Serve GET /metrics on a background thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass  # stdout is the daemon's response channel
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
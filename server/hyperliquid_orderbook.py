@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Local L2 order book engine.
+Keeps sorted, array-backed price levels per coin and answers depth, VWAP,
+slippage and fill-price queries without touching the network.
+"""
+
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+BID = 0
+ASK = 1
+
+# Extra room past the last level a market order needs, to absorb book movement
+DEFAULT_FILL_BUFFER_BPS = 10.0
+DEFAULT_MAX_SLIPPAGE = 0.05
+
+class OrderBook:
+    """
+    Sorted price levels for one coin.
+
+    Each side stores "keys" in ascending order of distance from the touch:
+    asks by price and bids by negated price, so index 0 is the best level on
+    either side and every query is a bisect plus a prefix-sum lookup. Prefix
+    sums are rebuilt lazily after the book changes. Every read holds the lock
+    load_snapshot swaps the levels under, so it never sees half a snapshot.
+    """
+
+    def __init__(self, coin: str):
+        self.coin = coin
+        self.time = 0
+        self._keys = (array("d"), array("d"))
+        self._sizes = (array("d"), array("d"))
+        self._cum_sz: List[Optional[array]] = [None, None]
+        self._cum_ntl: List[Optional[array]] = [None, None]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(side: int, px: float) -> float:
+        return -px if side == BID else px
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def load_snapshot(self, l2: Dict[str, Any]):
+        """Replace both sides from an l2Book snapshot ({"levels": [bids, asks], "time"})."""
+        levels = l2.get("levels", [[], []])
+        with self._lock:
+            for side in (BID, ASK):
+                pairs = sorted((self._key(side, float(lvl["px"])), float(lvl["sz"])) for lvl in levels[side])
+                self._keys[side][:] = array("d", (k for k, _ in pairs))
+                self._sizes[side][:] = array("d", (s for _, s in pairs))
+                self._cum_sz[side] = self._cum_ntl[side] = None
+            self.time = l2.get("time", self.time)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _prefix(self, side: int) -> Tuple[array, array, array]:
+        keys = self._keys[side]
+        if self._cum_sz[side] is None:
+            cum_sz, cum_ntl = array("d"), array("d")
+            total_sz = total_ntl = 0.0
+            for key, sz in zip(keys, self._sizes[side]):
+                total_sz += sz
+                total_ntl += sz * abs(key)
+                cum_sz.append(total_sz)
+                cum_ntl.append(total_ntl)
+            self._cum_sz[side], self._cum_ntl[side] = cum_sz, cum_ntl
+        return keys, self._cum_sz[side], self._cum_ntl[side]
+
+    def _best(self, side: int) -> Optional[Tuple[float, float]]:
+        keys = self._keys[side]
+        return (abs(keys[0]), self._sizes[side][0]) if keys else None
+
+    def _mid(self) -> Optional[float]:
+        bid, ask = self._best(BID), self._best(ASK)
+        if bid is None or ask is None:
+            return None
+        return (bid[0] + ask[0]) / 2
+
+    def _spread(self) -> Optional[Dict[str, float]]:
+        bid, ask, mid = self._best(BID), self._best(ASK), self._mid()
+        if mid is None:
+            return None
+        return {"abs": ask[0] - bid[0], "bps": (ask[0] - bid[0]) / mid * 1e4}
+
+    def best(self, side: int) -> Optional[Tuple[float, float]]:
+        """(price, size) at the top of one side."""
+        with self._lock:
+            return self._best(side)
+
+    def best_bid(self) -> Optional[Tuple[float, float]]:
+        return self.best(BID)
+
+    def best_ask(self) -> Optional[Tuple[float, float]]:
+        return self.best(ASK)
+
+    def mid(self) -> Optional[float]:
+        with self._lock:
+            return self._mid()
+
+    def spread(self) -> Optional[Dict[str, float]]:
+        with self._lock:
+            return self._spread()
+
+    def depth(self, bps: float) -> Dict[str, float]:
+        """Cumulative size and notional on each side within `bps` of mid."""
+        result = {"bid_sz": 0.0, "bid_ntl": 0.0, "ask_sz": 0.0, "ask_ntl": 0.0}
+        with self._lock:
+            mid = self._mid()
+            if mid is None:
+                return result
+            for side, name, bound in ((BID, "bid", -mid * (1 - bps / 1e4)), (ASK, "ask", mid * (1 + bps / 1e4))):
+                keys, cum_sz, cum_ntl = self._prefix(side)
+                n = bisect_right(keys, bound)
+                if n:
+                    result[f"{name}_sz"] = cum_sz[n - 1]
+                    result[f"{name}_ntl"] = cum_ntl[n - 1]
+        return result
+
+    def estimate_fill(self, is_buy: bool, size: float) -> Dict[str, Any]:
+        """
+        Walk the opposite side for an order of `size`.
+
+        Returns the VWAP, the worst price touched (the limit price needed to
+        fill), the size that fits in the visible book and the slippage from mid.
+        """
+        side = ASK if is_buy else BID
+        with self._lock:
+            mid = self._mid()
+            keys, cum_sz, cum_ntl = self._prefix(side)
+            if not keys or size <= 0:
+                return {"filled": 0.0, "vwap": None, "fill_px": None, "slippage_bps": None, "mid": mid, "complete": False}
+            i = bisect_left(cum_sz, size)
+            if i >= len(keys):
+                filled, notional, fill_px = cum_sz[-1], cum_ntl[-1], abs(keys[-1])
+            else:
+                before_sz = cum_sz[i - 1] if i else 0.0
+                before_ntl = cum_ntl[i - 1] if i else 0.0
+                fill_px = abs(keys[i])
+                filled, notional = size, before_ntl + (size - before_sz) * fill_px
+        vwap = notional / filled
+        slippage = None
+        if mid:
+            slippage = (vwap - mid) / mid * 1e4 if is_buy else (mid - vwap) / mid * 1e4
+        return {
+            "filled": filled,
+            "vwap": vwap,
+            "fill_px": fill_px,
+            "slippage_bps": slippage,
+            "mid": mid,
+            "complete": filled >= size,
+        }
+
+    def quote(self) -> Dict[str, Any]:
+        with self._lock:
+            bid, ask = self._best(BID), self._best(ASK)
+            return {
+                "coin": self.coin,
+                "time": self.time,
+                "bid": {"px": bid[0], "sz": bid[1]} if bid else None,
+                "ask": {"px": ask[0], "sz": ask[1]} if ask else None,
+                "mid": self._mid(),
+                "spread": self._spread(),
+            }
+
+class OrderBooks:
+    """Registry of local books keyed by coin."""
+
+    def __init__(self):
+        self._books: Dict[str, OrderBook] = {}
+        self._lock = threading.Lock()
+
+    def get(self, coin: str) -> Optional[OrderBook]:
+        return self._books.get(coin)
+
+    def load(self, l2: Dict[str, Any]) -> OrderBook:
+        """Create or refresh the book for l2["coin"] from a snapshot."""
+        coin = l2["coin"]
+        book = self._books.get(coin)
+        if book is None:
+            with self._lock:
+                book = self._books.setdefault(coin, OrderBook(coin))
+        book.load_snapshot(l2)
+        return book
+
+def market_limit_price(
+    book: OrderBook,
+    is_buy: bool,
+    size: float,
+    max_slippage: float = DEFAULT_MAX_SLIPPAGE,
+    buffer_bps: float = DEFAULT_FILL_BUFFER_BPS,
+    allow_partial: bool = False,
+) -> float:
+    """
+    Limit price for an IOC market order sized against the book.
+
+    The price covers the deepest level the order needs plus a small buffer,
+    capped at mid +/- max_slippage. Raises ValueError when the visible book
+    cannot fill the size inside that band, instead of sending an order that
+    would only partially fill. With allow_partial (reduce-only closes, where
+    shrinking the position beats leaving it whole) the capped price is
+    returned instead and the IOC fills what the band holds.
+    """
+    # Mid and fill come from one read, so a snapshot landing between them cannot skew the cap
+    estimate = book.estimate_fill(is_buy, size)
+    mid = estimate["mid"]
+    if mid is None:
+        raise ValueError(f"No two-sided book for {book.coin}")
+    cap = mid * (1 + max_slippage) if is_buy else mid * (1 - max_slippage)
+    if allow_partial and (
+        not estimate["complete"] or (estimate["fill_px"] > cap if is_buy else estimate["fill_px"] < cap)
+    ):
+        return cap
+    if not estimate["complete"]:
+        raise ValueError(f"Visible book for {book.coin} only fills {estimate['filled']} of {size}")
+    fill_px = estimate["fill_px"]
+    if (is_buy and fill_px > cap) or (not is_buy and fill_px < cap):
+        raise ValueError(f"Filling {size} {book.coin} needs {fill_px}, beyond {max_slippage:.2%} slippage")
+    buffered = fill_px * (1 + buffer_bps / 1e4) if is_buy else fill_px * (1 - buffer_bps / 1e4)
+    return min(buffered, cap) if is_buy else max(buffered, cap)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Time-paginated upstream fetches for large history reads.
+Fills, funding and candles are pulled one time window at a time and handed
+on as bounded chunks, so the first rows reach the client while later pages
+are still loading and no request ever holds its whole range in memory.
+"""
+
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+# Fixed-width candle intervals in ms
+INTERVAL_MS = {
+    "1m": 60_000,
+    "3m": 3 * 60_000,
+    "5m": 5 * 60_000,
+    "15m": 15 * 60_000,
+    "30m": 30 * 60_000,
+    "1h": 3_600_000,
+    "2h": 2 * 3_600_000,
+    "4h": 4 * 3_600_000,
+    "8h": 8 * 3_600_000,
+    "12h": 12 * 3_600_000,
+    "1d": 86_400_000,
+    "3d": 3 * 86_400_000,
+    "1w": 7 * 86_400_000,
+}
+# Upstream returns at most this many candles per candleSnapshot call
+MAX_CANDLES_PER_FETCH = 5000
+# Rows per chunk frame written to the client
+DEFAULT_CHUNK_ROWS = 500
+
+Page = List[Dict[str, Any]]
+
+def _row_key(row: Dict[str, Any]) -> str:
+    return json.dumps(row, sort_keys=True)
+
+def time_pages(
+    fetch: Callable[[int, int], Page],
+    start: int,
+    end: int,
+    page_limit: int,
+    time_of: Callable[[Dict[str, Any]], int] = lambda row: row["time"],
+) -> Iterator[Page]:
+    """
+    Pages of [start, end], oldest first. An endpoint returning at most
+    page_limit rows from start is re-queried from the newest time it
+    returned; rows in that boundary millisecond already yielded are dropped.
+    """
+    boundary: set = set()
+    while start <= end:
+        page = fetch(start, end)
+        fresh = [row for row in page if time_of(row) > start or _row_key(row) not in boundary]
+        if fresh:
+            yield fresh
+        if len(page) < page_limit:
+            return
+        last = max(time_of(row) for row in page)
+        if last <= start:
+            return  # a full page inside one millisecond; nothing more to page by time
+        boundary = {_row_key(row) for row in page if time_of(row) == last}
+        start = last
+
+def candle_windows(interval: str, start: int, end: int) -> Iterator[Tuple[int, int]]:
+    """[start, end] split into windows of at most MAX_CANDLES_PER_FETCH candles."""
+    if interval not in INTERVAL_MS:
+        # Calendar intervals (1M) have no fixed width, and never many candles
+        yield start, end
+        return
+    step = INTERVAL_MS[interval] * MAX_CANDLES_PER_FETCH
+    while start <= end:
+        window_end = min(end, start + step - 1)
+        yield start, window_end
+        start = window_end + 1
+
+def chunked(pages: Iterable[Any], size: int = DEFAULT_CHUNK_ROWS) -> Iterator[Any]:
+    """Re-slice list pages into chunks of at most size rows; non-list pages pass through whole."""
+    for page in pages:
+        if not isinstance(page, list):
+            yield page
+            continue
+        for offset in range(0, len(page), size):
+            yield page[offset:offset + size]
@@ -4,15 +4,68 @@
  */
 
 import { spawn, ChildProcess } from "child_process";
+import { EventEmitter } from "events";
 import path from "path";
 import { fileURLToPath } from "url";
 import { dirname } from "path";
 import readline from "readline";
+import { decode as decodeMsgpack, encode as encodeMsgpack } from "@msgpack/msgpack";
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = dirname(__filename);
 const DAEMON_SCRIPT = path.join(__dirname, "hyperliquid_daemon.py");
 
+// Optional daemon executor sizing; unset values fall back to the daemon defaults
+function envInt(name: string): number | undefined {
+  const value = parseInt(process.env[name] || "", 10);
+  return Number.isFinite(value) && value > 0 ? value : undefined;
+}
+
+// Optional WebSocket market-state mode, e.g. HYPERLIQUID_DAEMON_STREAM_COINS=BTC,ETH
+function streamConfig() {
+  const coins = (process.env.HYPERLIQUID_DAEMON_STREAM_COINS || "")
+    .split(",")
+    .map((coin) => coin.trim())
+    .filter(Boolean);
+  if (coins.length === 0) return undefined;
+  return {
+    coins,
+    ws_url: process.env.HYPERLIQUID_DAEMON_STREAM_WS_URL || undefined,
+    max_staleness_ms: envInt("HYPERLIQUID_DAEMON_STREAM_MAX_STALENESS_MS"),
+    // Account whose order updates and fills are streamed (default: the daemon's account)
+    user: process.env.HYPERLIQUID_DAEMON_STREAM_USER || undefined,
+  };
+}
+
+// Unsolicited frames ({"event", "data"}) pushed by the daemon, e.g. liquidation_risk
+const daemonEvents = new EventEmitter();
+
+// Optional upstream weight budget per minute for the daemon's rate-limit scheduler
+function rateLimitConfig() {
+  const ip = envInt("HYPERLIQUID_DAEMON_WEIGHT_PER_MINUTE");
+  return ip ? { ip, exchange: ip } : undefined;
+}
+
+// Optional shared HTTP pool tuning; unset values fall back to the daemon defaults
+function transportConfig() {
+  const config = {
+    pool_size: envInt("HYPERLIQUID_DAEMON_HTTP_POOL_SIZE"),
+    keepalive_seconds: envInt("HYPERLIQUID_DAEMON_KEEPALIVE_SECONDS"),
+  };
+  return Object.fromEntries(Object.entries(config).filter(([, value]) => value !== undefined));
+}
+
+// Optional record/replay of upstream Info traffic; replay takes precedence and needs no network for reads
+function recordingConfig() {
+  const replayDir = process.env.HYPERLIQUID_DAEMON_REPLAY_DIR;
+  if (replayDir) {
+    const speed = process.env.HYPERLIQUID_DAEMON_REPLAY_SPEED || "1";
+    return { replay: { dir: replayDir, speed: speed === "max" ? "max" : Number(speed), loop: true } };
+  }
+  const recordDir = process.env.HYPERLIQUID_DAEMON_RECORD_DIR;
+  return recordDir ? { record: { dir: recordDir } } : {};
+}
+
 class HyperliquidDaemon {
   private process: ChildProcess | null = null;
   private rl: readline.Interface | null = null;
@@ -21,8 +74,12 @@ class HyperliquidDaemon {
     resolve: (value: any) => void;
     reject: (error: Error) => void;
     timer: NodeJS.Timeout;
+    // Streamed reads: called per chunk frame before the end frame settles the request
+    onChunk?: (chunk: any) => void;
+    command?: string;
   }>();
   private requestIdCounter = 0;
+  private protocol: "line" | "msgpack" = "line";
 
   async start() {
     if (this.process && this.ready) {
@@ -77,10 +134,15 @@ class HyperliquidDaemon {
       return;
     }
 
-    this.rl = readline.createInterface({
-      input: this.process.stdout!,
-      crlfDelay: Infinity,
-    });
+    // Line mode reads stdout with readline; MessagePack frames are parsed from raw chunks
+    const requestedProtocol = process.env.HYPERLIQUID_DAEMON_PROTOCOL === "msgpack" ? "msgpack" : "line";
+    this.protocol = "line";
+    if (requestedProtocol === "line") {
+      this.rl = readline.createInterface({
+        input: this.process.stdout!,
+        crlfDelay: Infinity,
+      });
+    }
 
     // Send initialization
     this.process.stdin!.write(
@@ -88,29 +150,50 @@ class HyperliquidDaemon {
         account_address: ACCOUNT_ADDRESS,
         api_secret: API_SECRET,
         testnet: USE_TESTNET,
+        trade_workers: envInt("HYPERLIQUID_DAEMON_TRADE_WORKERS"),
+        read_workers: envInt("HYPERLIQUID_DAEMON_READ_WORKERS"),
+        max_pending_reads: envInt("HYPERLIQUID_DAEMON_MAX_PENDING_READS"),
+        max_clients: envInt("HYPERLIQUID_DAEMON_MAX_CLIENTS"),
+        rate_limits: rateLimitConfig(),
+        metrics_port: envInt("HYPERLIQUID_DAEMON_METRICS_PORT"),
+        sign_workers: envInt("HYPERLIQUID_DAEMON_SIGN_WORKERS"),
+        transport: transportConfig(),
+        stream: streamConfig(),
+        ...recordingConfig(),
+        protocol: requestedProtocol,
+        numeric: process.env.HYPERLIQUID_DAEMON_NUMERIC === "true" || undefined,
       }) + "\n"
     );
 
-    // Wait for ready signal
+    // Wait for ready signal (always a JSON line; it confirms the framing)
     await new Promise<void>((resolve, reject) => {
       const timeout = setTimeout(() => {
         reject(new Error("Daemon initialization timeout"));
       }, 10000);
 
-      this.rl!.once("line", (line) => {
+      const onReady = (response: any) => {
         clearTimeout(timeout);
+        console.log("[Hyperliquid Daemon] Parsed response:", response);
+        if (response.ready) {
+          this.protocol = response.protocol === "msgpack" ? "msgpack" : "line";
+          this.ready = true;
+          console.log(`[Hyperliquid Daemon] Ready! (protocol: ${this.protocol})`);
+          resolve();
+        } else {
+          reject(new Error("Daemon failed to initialize"));
+        }
+      };
+
+      if (!this.rl) {
+        this.readFrames(onReady);
+        return;
+      }
+      this.rl.once("line", (line) => {
         console.log("[Hyperliquid Daemon] Received first line:", line);
         try {
-          const response = JSON.parse(line);
-          console.log("[Hyperliquid Daemon] Parsed response:", response);
-          if (response.ready) {
-            this.ready = true;
-            console.log("[Hyperliquid Daemon] Ready!");
-            resolve();
-          } else {
-            reject(new Error("Daemon failed to initialize"));
-          }
+          onReady(JSON.parse(line));
         } catch (e) {
+          clearTimeout(timeout);
           console.error("[Hyperliquid Daemon] Failed to parse response:", e);
           reject(e);
         }
@@ -118,31 +201,11 @@ class HyperliquidDaemon {
     });
 
     // Handle responses
-    this.rl.on("line", (line) => {
+    this.rl?.on("line", (line) => {
       if (!line.trim()) return;
 
       try {
-        const response = JSON.parse(line);
-        const requestId = response.id;
-
-        if (!requestId) {
-          console.warn("[Hyperliquid Daemon] Response missing request ID:", line);
-          return;
-        }
-
-        const pending = this.pendingRequests.get(requestId);
-        if (pending) {
-          clearTimeout(pending.timer);
-          this.pendingRequests.delete(requestId);
-
-          if (response.success) {
-            pending.resolve(response.data);
-          } else {
-            pending.reject(new Error(response.error || "Unknown error"));
-          }
-        } else {
-          console.warn("[Hyperliquid Daemon] No pending request for ID:", requestId);
-        }
+        this.dispatch(JSON.parse(line));
       } catch (error) {
         console.error("[Hyperliquid Daemon] Failed to parse response:", error, "Line:", line);
       }
@@ -170,6 +233,88 @@ class HyperliquidDaemon {
     });
   }
 
+  // Route one decoded daemon message: pushed event, stream chunk, or final response
+  private dispatch(response: any) {
+    const requestId = response.id;
+
+    if (response.event) {
+      daemonEvents.emit(response.event, response.data);
+      return;
+    }
+
+    if (!requestId) {
+      console.warn("[Hyperliquid Daemon] Response missing request ID:", response);
+      return;
+    }
+
+    const pending = this.pendingRequests.get(requestId);
+    if (pending && response.chunk !== undefined) {
+      // Each chunk proves progress; restart the timeout instead of settling
+      clearTimeout(pending.timer);
+      pending.timer = this.requestTimer(requestId, pending.command || "stream");
+      pending.onChunk?.(response.chunk);
+      return;
+    }
+    if (pending) {
+      clearTimeout(pending.timer);
+      this.pendingRequests.delete(requestId);
+
+      if (response.success) {
+        pending.resolve(response.data);
+      } else if (response.throttled) {
+        // Upstream budget exhausted: callers can back off for retryAfterMs
+        pending.reject(Object.assign(new Error(response.error || "Throttled"), {
+          throttled: true,
+          retryAfterMs: response.retry_after_ms,
+        }));
+      } else {
+        pending.reject(new Error(response.error || "Unknown error"));
+      }
+    } else {
+      console.warn("[Hyperliquid Daemon] No pending request for ID:", requestId);
+    }
+  }
+
+  // After the JSON ready line, stdout carries 4-byte big-endian length-prefixed MessagePack frames
+  private readFrames(onReady: (response: any) => void) {
+    let buffer = Buffer.alloc(0);
+    let awaitingReady = true;
+    this.process!.stdout!.on("data", (data: Buffer) => {
+      buffer = buffer.length ? Buffer.concat([buffer, data]) : data;
+      while (true) {
+        if (awaitingReady || this.protocol === "line") {
+          const newline = buffer.indexOf(10);
+          if (newline < 0) return;
+          const line = buffer.subarray(0, newline).toString();
+          buffer = buffer.subarray(newline + 1);
+          if (!line.trim()) continue;
+          try {
+            const message = JSON.parse(line);
+            if (awaitingReady) {
+              awaitingReady = false;
+              onReady(message);
+            } else {
+              this.dispatch(message);
+            }
+          } catch (error) {
+            console.error("[Hyperliquid Daemon] Failed to parse response:", error, "Line:", line);
+          }
+          continue;
+        }
+        if (buffer.length < 4) return;
+        const length = buffer.readUInt32BE(0);
+        if (buffer.length < 4 + length) return;
+        const frame = buffer.subarray(4, 4 + length);
+        buffer = buffer.subarray(4 + length);
+        try {
+          this.dispatch(decodeMsgpack(frame));
+        } catch (error) {
+          console.error("[Hyperliquid Daemon] Failed to decode frame:", error);
+        }
+      }
+    });
+  }
+
   async restart() {
     console.log("[Hyperliquid Daemon] Restarting...");
     try {
@@ -196,7 +341,29 @@ class HyperliquidDaemon {
     }
   }
 
-  async request(command: string, args: any = {}) {
+  private encodeRequest(request: { id: string; command: string; args: any }) {
+    if (this.protocol === "line") return JSON.stringify(request) + "\n";
+    // MessagePack has no undefined; drop unset args as JSON.stringify does
+    const body = encodeMsgpack(request, { ignoreUndefined: true });
+    const header = Buffer.alloc(4);
+    header.writeUInt32BE(body.length, 0);
+    return Buffer.concat([header, body]);
+  }
+
+  private requestTimer(requestId: string, command: string) {
+    return setTimeout(() => {
+      const pending = this.pendingRequests.get(requestId);
+      this.pendingRequests.delete(requestId);
+      pending?.reject(new Error(`Request timeout: ${command}`));
+    }, 30000);
+  }
+
+  // Large history reads arrive as chunk frames; resolves with the end frame's summary
+  async requestStream(command: string, args: any, onChunk: (chunk: any) => void) {
+    return this.request(command, { ...args, stream: true }, onChunk);
+  }
+
+  async request(command: string, args: any = {}, onChunk?: (chunk: any) => void) {
     console.log(`[Hyperliquid Daemon] Request: ${command}`);
     if (!this.process || !this.ready) {
       console.log(`[Hyperliquid Daemon] Not ready, starting... (process=${!!this.process}, ready=${this.ready})`);
@@ -206,19 +373,18 @@ class HyperliquidDaemon {
     return new Promise((resolve, reject) => {
       const requestId = `req_${++this.requestIdCounter}_${Date.now()}`;
 
-      const timer = setTimeout(() => {
-        this.pendingRequests.delete(requestId);
-        reject(new Error(`Request timeout: ${command}`));
-      }, 30000);
+      const timer = this.requestTimer(requestId, command);
 
       this.pendingRequests.set(requestId, {
         resolve,
         reject,
         timer,
+        onChunk,
+        command,
       });
 
       // Send request with ID
-      const requestPayload = JSON.stringify({ id: requestId, command, args }) + "\n";
+      const requestPayload = this.encodeRequest({ id: requestId, command, args });
 
       try {
         const written = this.process!.stdin!.write(requestPayload);
@@ -240,9 +406,71 @@ class HyperliquidDaemon {
 // Singleton instance
 const daemon = new HyperliquidDaemon();
 
+// Narrow a polled read: top `depth` book levels, user_state `sections`, dotted `fields`
+export interface Projection {
+  depth?: number;
+  sections?: string[];
+  fields?: string[];
+}
+
+type DeltaOp = ["set", Array<string | number>, any] | ["del", Array<string | number>];
+
+// Keeps the last payload of one polled read and asks the daemon only for changes
+export class DeltaPoller<T = any> {
+  private version?: number;
+  private value?: T;
+  private static counter = 0;
+  private readonly subscription: string;
+
+  constructor(
+    private readonly command: string,
+    private readonly args: Record<string, any> = {},
+    subscription?: string
+  ) {
+    this.subscription = subscription ?? `${command}:${++DeltaPoller.counter}`;
+  }
+
+  async poll(): Promise<T> {
+    const reply: any = await daemon.request(this.command, {
+      ...this.args,
+      subscription: this.subscription,
+      since: this.version,
+    });
+    if (reply.ops) {
+      this.value = applyDeltaOps(this.value, reply.ops);
+    } else if (!reply.unchanged) {
+      this.value = reply.data;
+    }
+    this.version = reply.version;
+    return this.value as T;
+  }
+}
+
+function applyDeltaOps(value: any, ops: DeltaOp[]) {
+  let root = structuredClone(value);
+  for (const op of ops) {
+    const path = op[1];
+    if (path.length === 0) {
+      root = op[2];
+      continue;
+    }
+    let parent = root;
+    for (const key of path.slice(0, -1)) parent = parent[key];
+    if (op[0] === "del") delete parent[path[path.length - 1]];
+    else parent[path[path.length - 1]] = op[2];
+  }
+  return root;
+}
+
 // Export API functions
-export async function getUserState(address?: string) {
-  return daemon.request("get_user_state", { address });
+export async function getUserState(address?: string, projection?: Projection) {
+  return daemon.request("get_user_state", { address, ...projection });
+}
+
+export async function getUserStates(addresses: string[]) {
+  return daemon.request("get_user_states", { addresses }) as Promise<
+    Record<string, { success: boolean; data?: any; error?: string }>
+  >;
 }
 
 export async function getAllMids() {
@@ -253,25 +481,144 @@ export async function getMeta() {
   return daemon.request("get_meta");
 }
 
-export async function getL2Snapshot(coin: string) {
-  return daemon.request("get_l2_snapshot", { coin });
+export interface HistoryQuery {
+  address?: string;
+  startTime?: number;
+  endTime?: number;
+  // Rows per chunk frame (daemon default 500)
+  chunk_rows?: number;
+}
+
+// Stream a large history read chunk by chunk: get_user_fills, get_candles,
+// get_user_funding or get_funding_history. Rows arrive oldest first.
+export async function streamHistory(
+  command: "get_user_fills" | "get_candles" | "get_user_funding" | "get_funding_history",
+  args: HistoryQuery & Record<string, any>,
+  onChunk: (rows: any) => void
+) {
+  return daemon.requestStream(command, args, onChunk) as Promise<{ chunks: number }>;
+}
+
+export async function getUserFunding(query: HistoryQuery = {}) {
+  return daemon.request("get_user_funding", query);
+}
+
+export async function getFundingHistory(coin: string, startTime: number, endTime?: number) {
+  return daemon.request("get_funding_history", { coin, startTime, endTime });
+}
+
+export async function getL2Snapshot(coin: string, projection?: Projection) {
+  return daemon.request("get_l2_snapshot", { coin, ...projection });
 }
 
-export async function getOpenOrders(address?: string) {
-  return daemon.request("get_open_orders", { address });
+export async function getOpenOrders(address?: string, projection?: Projection) {
+  return daemon.request("get_open_orders", { address, ...projection });
 }
 
 export async function getUserFills(address?: string) {
   return daemon.request("get_user_fills", { address });
 }
 
+export interface LedgerQuery {
+  address?: string;
+  cursor?: number;
+  startTime?: number;
+  endTime?: number;
+  limit?: number;
+  sync?: boolean;
+}
+
+export async function getLedgerFills(query: LedgerQuery = {}) {
+  return daemon.request("get_ledger_fills", query);
+}
+
+export async function getLedgerFunding(query: LedgerQuery = {}) {
+  return daemon.request("get_ledger_funding", query);
+}
+
+export async function syncLedger(address?: string) {
+  return daemon.request("sync_ledger", { address });
+}
+
+export async function getPerformanceMetrics(
+  query: { address?: string; startTime?: number; endTime?: number; curvePoints?: number; sync?: boolean } = {}
+) {
+  return daemon.request("get_performance_metrics", query);
+}
+
 export async function getCandles(
   coin: string,
   interval: string,
   startTime: number,
-  endTime: number
+  endTime: number,
+  compact?: boolean
 ) {
-  return daemon.request("get_candles", { coin, interval, startTime, endTime });
+  return daemon.request("get_candles", { coin, interval, startTime, endTime, compact });
+}
+
+export async function getCandleStoreStats() {
+  return daemon.request("candle_store_stats");
+}
+
+export async function getBookQuote(coin: string) {
+  return daemon.request("get_book_quote", { coin });
+}
+
+export async function getBookDepth(coin: string, bps?: number[]) {
+  return daemon.request("get_book_depth", { coin, bps });
+}
+
+export async function estimateFill(coin: string, is_buy: boolean, sz: number) {
+  return daemon.request("estimate_fill", { coin, is_buy, sz });
+}
+
+export async function getRecentTrades(coin: string, limit?: number) {
+  return daemon.request("get_recent_trades", { coin, limit });
+}
+
+export async function getStreamStatus() {
+  return daemon.request("stream_status");
+}
+
+export async function getRateLimitStatus() {
+  return daemon.request("rate_limit_status");
+}
+
+/**
+ * Per-command latency (split by phase), error and payload-size stats.
+ * Pass "prometheus" for the text exposition format.
+ */
+export async function getDaemonStats(format?: "json" | "prometheus") {
+  return daemon.request("stats", { format });
+}
+
+/** Tracked positions/open orders per account, with sync and hit counts. */
+export async function getAccountStateStats() {
+  return daemon.request("account_state_stats");
+}
+
+/** Signing pool size, per-action sign time and signer throughput. */
+export async function getSigningStats() {
+  return daemon.request("signing_stats");
+}
+
+/** Delta-encoded polling: open subscriptions and full / delta / unchanged response counts. */
+export async function getDeltaStats() {
+  return daemon.request("delta_stats");
+}
+
+/** Shared HTTP pool: connection reuse rate, keep-alive pings and timeouts per endpoint. */
+export async function getTransportStats() {
+  return daemon.request("transport_stats");
+}
+
+/** Upstream recording or replay: segments, records written or served, and misses. */
+export async function getRecorderStats() {
+  return daemon.request("recorder_stats");
+}
+
+export async function getCacheStats() {
+  return daemon.request("cache_stats");
 }
 
 // Trading functions
@@ -293,11 +640,20 @@ export async function placeOrder(
   });
 }
 
+export async function placeMarketOrder(
+  coin: string,
+  is_buy: boolean,
+  sz: number,
+  slippage?: number
+) {
+  return daemon.request("place_market_order", { coin, is_buy, sz, slippage });
+}
+
 export async function cancelOrder(coin: string, oid: number) {
   return daemon.request("cancel_order", { coin, oid });
 }
 
-export async function cancelAllOrders(coin: string) {
+export async function cancelAllOrders(coin?: string) {
   return daemon.request("cancel_all_orders", { coin });
 }
 
@@ -325,3 +681,176 @@ export async function modifyOrder(
   });
 }
 
+
+export interface BulkOrder {
+  coin: string;
+  is_buy: boolean;
+  sz: number;
+  limit_px: number;
+  order_type?: any;
+  reduce_only?: boolean;
+  cloid?: string;
+}
+
+export async function batch(requests: Array<{ id?: string; command: string; args?: any }>) {
+  return daemon.request("batch", { requests });
+}
+
+export async function bulkPlaceOrders(orders: BulkOrder[], grouping: string = "na") {
+  return daemon.request("bulk_place_orders", { orders, grouping });
+}
+
+export async function bulkCancel(cancels: Array<{ coin: string; oid?: number; cloid?: string }>) {
+  return daemon.request("bulk_cancel", { cancels });
+}
+
+export async function bulkModify(modifies: Array<BulkOrder & { oid: number | string }>) {
+  return daemon.request("bulk_modify", { modifies });
+}
+
+// Entry with attached TP/SL in one grouped action; omit limit_px for a market (IOC) entry
+export async function placeBracketOrder(
+  coin: string,
+  is_buy: boolean,
+  sz: number,
+  exits: { stop_loss_px?: number; take_profit_px?: number },
+  limit_px?: number,
+  options: { tif?: string; slippage?: number; cloid?: string } = {}
+) {
+  return daemon.request("place_bracket_order", { coin, is_buy, sz, limit_px, ...exits, ...options });
+}
+
+// Multi-account: register credentials at runtime, then name the account per request
+export async function registerAccount(
+  address: string,
+  secret: string,
+  vaultAddress?: string,
+  isDefault?: boolean
+) {
+  return daemon.request("register_account", { address, secret, vault_address: vaultAddress, default: isDefault });
+}
+
+export async function unregisterAccount(address: string) {
+  return daemon.request("unregister_account", { address });
+}
+
+export async function listAccounts() {
+  return daemon.request("list_accounts");
+}
+
+export async function accountRequest(account: string, command: string, args: any = {}) {
+  return daemon.request(command, { ...args, account });
+}
+
+export function onDaemonEvent(event: string, listener: (data: any) => void) {
+  daemonEvents.on(event, listener);
+  return () => daemonEvents.off(event, listener);
+}
+
+export interface LiquidationRiskEvent {
+  /** Lowercase, whatever case it was watched with */
+  address: string;
+  coin: string;
+  size: number;
+  entryPx: number;
+  liquidationPx: number;
+  markPx: number;
+  marginUsed: number;
+  distancePercent: number | null;
+  level: "ok" | "warning" | "critical";
+  previousLevel: "ok" | "warning" | "critical";
+}
+
+export async function watchLiquidationRisk(addresses: string[], replace: boolean = false, thresholds?: number[]) {
+  return daemon.request("watch_liquidation_risk", { addresses, replace, thresholds });
+}
+
+export async function unwatchLiquidationRisk(addresses: string[]) {
+  return daemon.request("unwatch_liquidation_risk", { addresses });
+}
+
+export async function scanLiquidationRisk(maxDistancePercent?: number) {
+  return daemon.request("scan_liquidation_risk", { maxDistancePercent });
+}
+
+// Parent orders executed inside the daemon; they keep running if the caller goes away
+export interface ExecutionSpec {
+  type: "twap" | "iceberg" | "pov";
+  coin: string;
+  is_buy: boolean;
+  sz: number;
+  limit_px?: number;
+  slippage?: number;
+  /** TWAP: slices go out evenly from now (first) to duration_s (last). */
+  duration_s?: number;
+  slices?: number;
+  display_sz?: number;
+  participation?: number;
+  check_s?: number;
+  min_child_notional?: number;
+}
+
+export interface ExecutionState {
+  id: string;
+  account: string;
+  type: ExecutionSpec["type"];
+  coin: string;
+  is_buy: boolean;
+  sz: number;
+  filled: number;
+  remaining: number;
+  avg_px: number | null;
+  limit_px: number | null;
+  status: "running" | "paused" | "done" | "canceled" | "failed" | "expired";
+  children: number;
+  slices_done: number;
+  slices: number | null;
+  elapsed_s: number;
+  child_oid: number | null;
+  error: string | null;
+  created: number;
+}
+
+export async function startExecution(spec: ExecutionSpec, account?: string): Promise<ExecutionState> {
+  return daemon.request("start_execution", { ...spec, account });
+}
+
+/** TWAP from the trading page's form (duration in minutes). */
+export async function startTwap(params: {
+  coin: string;
+  isBuy: boolean;
+  totalSize: number;
+  duration: number;
+  numOrders: number;
+  priceLimit?: number;
+}): Promise<ExecutionState> {
+  return startExecution({
+    type: "twap",
+    coin: params.coin,
+    is_buy: params.isBuy,
+    sz: params.totalSize,
+    duration_s: params.duration * 60,
+    slices: params.numOrders,
+    limit_px: params.priceLimit,
+  });
+}
+
+export async function pauseExecution(id: string): Promise<ExecutionState> {
+  return daemon.request("pause_execution", { id });
+}
+
+export async function resumeExecution(id: string): Promise<ExecutionState> {
+  return daemon.request("resume_execution", { id });
+}
+
+export async function cancelExecution(id: string): Promise<ExecutionState> {
+  return daemon.request("cancel_execution", { id });
+}
+
+export async function getExecution(id: string): Promise<ExecutionState> {
+  return daemon.request("get_execution", { id });
+}
+
+export async function listExecutions(includeFinished: boolean = false) {
+  return daemon.request("list_executions", { include_finished: includeFinished });
+}
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Weight-aware rate-limit scheduler for upstream Hyperliquid calls.
+Every REST call made through the SDK waits for tokens from the shared IP
+budget and its weight class, in priority order: trading first, then reads,
+then background work. Reads that cannot be served before their deadline are
+dropped with a retry-after hint instead of queueing behind the limit.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Priorities, most urgent first
+TRADE = 0
+READ = 1
+BACKGROUND = 2
+PRIORITY_NAMES = ("trade", "read", "background")
+
+# Hyperliquid allows 1200 weight per minute per IP across all REST calls.
+# Budgets are per minute and leave headroom below the upstream limit; the
+# read classes are capped so they can never use up the whole IP budget.
+DEFAULT_BUDGETS = {
+    "ip": 1080,
+    "exchange": 1080,
+    "info_light": 600,
+    "info_heavy": 480,
+}
+
+# Info requests weighted 2; userRole is 60 and everything else 20
+LIGHT_INFO_TYPES = {
+    "l2Book", "allMids", "clearinghouseState", "orderStatus", "spotClearinghouseState", "exchangeStatus",
+}
+USER_ROLE_WEIGHT = 60
+HEAVY_INFO_WEIGHT = 20
+# Responses of these types cost one more unit per this many items returned
+PER_ITEM_INFO_TYPES = {
+    "userFills": 20, "userFillsByTime": 20, "userFunding": 20, "userNonFundingLedgerUpdates": 20,
+    "historicalOrders": 20, "fundingHistory": 20, "candleSnapshot": 60,
+}
+# Exchange actions weigh 1 + floor(batch length / 40)
+EXCHANGE_BATCH_DIVISOR = 40
+
+# IP weight that reads and background calls may not spend, kept for trading
+DEFAULT_TRADE_RESERVE = 60
+
+DEFAULT_READ_DEADLINE_MS = 5000
+
+class Throttled(Exception):
+    """A call was dropped because it could not be served before its deadline."""
+
+    def __init__(self, retry_after_ms: int):
+        super().__init__(f"Rate limited upstream budget, retry after {retry_after_ms}ms")
+        self.retry_after_ms = retry_after_ms
+
+def request_weight(url_path: str, payload: Any) -> Tuple[str, int]:
+    """(weight class, weight) of one upstream call, before any per-item surcharge."""
+    payload = payload or {}
+    if url_path == "/exchange":
+        action = payload.get("action", {})
+        batch = action.get("orders") or action.get("cancels") or action.get("modifies") or []
+        return "exchange", 1 + len(batch) // EXCHANGE_BATCH_DIVISOR
+    kind = payload.get("type")
+    if kind in LIGHT_INFO_TYPES:
+        return "info_light", 2
+    if kind == "userRole":
+        return "info_heavy", USER_ROLE_WEIGHT
+    return "info_heavy", HEAVY_INFO_WEIGHT
+
+def response_surcharge(payload: Any, result: Any) -> int:
+    per = PER_ITEM_INFO_TYPES.get((payload or {}).get("type"))
+    if per is None or not isinstance(result, list):
+        return 0
+    return len(result) // per
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (after refill)."""
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+class _Ticket:
+    __slots__ = ("priority", "seq", "klass", "weight", "deadline", "event", "error")
+
+    def __init__(self, priority: int, seq: int, klass: str, weight: int, deadline: Optional[float]):
+        self.priority = priority
+        self.seq = seq
+        self.klass = klass
+        self.weight = weight
+        self.deadline = deadline
+        self.event = threading.Event()
+        self.error: Optional[Throttled] = None
+
+    def __lt__(self, other: "_Ticket") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+class RateLimitScheduler:
+    """
+    Token buckets plus a priority queue in front of upstream calls.
+
+    Callers block in acquire() until their ticket reaches the front and both
+    the IP bucket and the ticket's class bucket have room. A dispatcher thread
+    grants tickets as tokens refill and drops any whose deadline has passed.
+    The priority and deadline come from the calling thread's context().
+    """
+
+    def __init__(self, budgets: Optional[Dict[str, float]] = None, trade_reserve: float = DEFAULT_TRADE_RESERVE):
+        self._buckets = {name: TokenBucket(v) for name, v in {**DEFAULT_BUDGETS, **(budgets or {})}.items()}
+        self.trade_reserve = trade_reserve
+        self._queue: List[_Ticket] = []
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._local = threading.local()
+        self._thread: Optional[threading.Thread] = None
+        self.granted = [0, 0, 0]
+        self.throttled = [0, 0, 0]
+        self.upstream_429 = 0
+        self.wait_seconds = 0.0
+
+    def configure(self, budgets: Optional[Dict[str, float]] = None, trade_reserve: Optional[float] = None):
+        """Override per-minute budgets and the trade reserve (e.g. from the daemon init line)."""
+        with self._cond:
+            for name, per_minute in (budgets or {}).items():
+                self._buckets[name] = TokenBucket(float(per_minute))
+            if trade_reserve is not None:
+                self.trade_reserve = float(trade_reserve)
+
+    # ------------------------------------------------------------------
+    # Caller context
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def context(self, priority: int, deadline: Optional[float] = None):
+        """Run upstream calls made by this thread at `priority`, dropped after monotonic `deadline`."""
+        previous = getattr(self._local, "ctx", None)
+        self._local.ctx = (priority, deadline)
+        try:
+            yield
+        finally:
+            self._local.ctx = previous
+
+    def current(self) -> Tuple[int, Optional[float]]:
+        return getattr(self._local, "ctx", None) or (BACKGROUND, None)
+
+    def propagate(self, fn: Callable) -> Callable:
+        """Wrap fn to run under the caller's context on another thread."""
+        ctx = self.current()
+
+        def run(*args, **kwargs):
+            with self.context(*ctx):
+                return fn(*args, **kwargs)
+        return run
+
+    # ------------------------------------------------------------------
+    # Admission
+    # ------------------------------------------------------------------
+
+    def _ip_need(self, ticket: _Ticket) -> float:
+        return ticket.weight + (0 if ticket.priority == TRADE else self.trade_reserve)
+
+    def _fits(self, ticket: _Ticket) -> bool:
+        return self._buckets["ip"].tokens >= self._ip_need(ticket) and self._buckets[ticket.klass].tokens >= ticket.weight
+
+    def _take(self, ticket: _Ticket):
+        self._buckets["ip"].tokens -= ticket.weight
+        self._buckets[ticket.klass].tokens -= ticket.weight
+        self.granted[ticket.priority] += 1
+
+    def _refill(self, now: float):
+        for bucket in self._buckets.values():
+            bucket.refill(now)
+
+    def _estimate_wait(self, ticket: _Ticket) -> float:
+        """Seconds until the ticket could be granted behind everything queued ahead of it."""
+        ahead = [t for t in self._queue if t < ticket]
+        ip_need = self._ip_need(ticket) + sum(t.weight for t in ahead)
+        class_need = ticket.weight + sum(t.weight for t in ahead if t.klass == ticket.klass)
+        return max(self._buckets["ip"].time_until(ip_need), self._buckets[ticket.klass].time_until(class_need))
+
+    def acquire(self, klass: str, weight: int):
+        priority, deadline = self.current()
+        started = time.monotonic()
+        with self._cond:
+            self._refill(started)
+            ticket = _Ticket(priority, next(self._seq), klass, weight, deadline)
+            if not any(t < ticket for t in self._queue) and self._fits(ticket):
+                self._take(ticket)
+                return
+            wait = self._estimate_wait(ticket)
+            if deadline is not None and started + wait > deadline:
+                self.throttled[priority] += 1
+                raise Throttled(int(wait * 1000) + 1)
+            heapq.heappush(self._queue, ticket)
+            self._ensure_dispatcher()
+            self._cond.notify()
+        ticket.event.wait()
+        self.wait_seconds += time.monotonic() - started
+        if ticket.error is not None:
+            raise ticket.error
+
+    def debit(self, klass: str, weight: int):
+        """Charge weight that only became known from the response."""
+        if weight > 0:
+            with self._cond:
+                self._buckets["ip"].tokens -= weight
+                self._buckets[klass].tokens -= weight
+
+    def penalize(self):
+        """Upstream answered 429: stop spending until the IP bucket refills."""
+        with self._cond:
+            self.upstream_429 += 1
+            self._buckets["ip"].tokens = min(self._buckets["ip"].tokens, 0.0)
+
+    def _ensure_dispatcher(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._dispatch, name="rate-limit", daemon=True)
+            self._thread.start()
+
+    def _dispatch(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                expired = [t for t in self._queue if t.deadline is not None and t.deadline <= now]
+                if expired:
+                    self._queue = [t for t in self._queue if t not in expired]
+                    heapq.heapify(self._queue)
+                    for ticket in expired:
+                        ticket.error = Throttled(int(self._estimate_wait(ticket) * 1000) + 1)
+                        self.throttled[ticket.priority] += 1
+                        ticket.event.set()
+                if not self._queue:
+                    self._cond.wait()
+                    continue
+                head = self._queue[0]
+                if self._fits(head):
+                    heapq.heappop(self._queue)
+                    self._take(head)
+                    head.event.set()
+                    continue
+                wait = max(
+                    self._buckets["ip"].time_until(self._ip_need(head)),
+                    self._buckets[head.klass].time_until(head.weight),
+                )
+                deadlines = [t.deadline - now for t in self._queue if t.deadline is not None]
+                self._cond.wait(min([wait] + deadlines))
+
+    # ------------------------------------------------------------------
+    # Integration
+    # ------------------------------------------------------------------
+
+    def wrap_post(self, post: Callable) -> Callable:
+        """Wrap the SDK's API.post so every upstream call is scheduled."""
+        scheduler = self
+
+        def scheduled_post(api, url_path: str, payload: Any = None) -> Any:
+            klass, weight = request_weight(url_path, payload)
+            scheduler.acquire(klass, weight)
+            try:
+                result = post(api, url_path, payload)
+            except Exception as e:
+                if getattr(e, "status_code", None) == 429:
+                    scheduler.penalize()
+                raise
+            scheduler.debit(klass, response_surcharge(payload, result))
+            return result
+        return scheduled_post
+
+    def status(self) -> Dict[str, Any]:
+        with self._cond:
+            self._refill(time.monotonic())
+            depth = [0, 0, 0]
+            for ticket in self._queue:
+                depth[ticket.priority] += 1
+            return {
+                "queue_depth": dict(zip(PRIORITY_NAMES, depth)),
+                "buckets": {
+                    name: {"tokens": round(b.tokens, 2), "capacity": b.capacity, "per_second": round(b.rate, 3)}
+                    for name, b in self._buckets.items()
+                },
+                "granted": dict(zip(PRIORITY_NAMES, self.granted)),
+                "throttled": dict(zip(PRIORITY_NAMES, self.throttled)),
+                "trade_reserve": self.trade_reserve,
+                "upstream_429": self.upstream_429,
+                "wait_seconds": round(self.wait_seconds, 3),
+            }
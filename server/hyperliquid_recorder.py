@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Recording and deterministic replay of upstream Info traffic.
+The recorder appends every /info request and response, timestamped, to
+gzip-compressed JSON-lines segments. Replay serves those recordings in
+place of the network at recorded pace, N times faster, or as fast as they
+are asked for, so the daemon, its caches and the UI can be load-tested on
+a machine with no network access.
+"""
+
+import glob
+import gzip
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import zlib
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Rotate a segment after this many uncompressed bytes or seconds
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+DEFAULT_SEGMENT_SECONDS = 3600
+# Records buffered for the writer; beyond this new records are dropped, never waited on
+DEFAULT_QUEUE_SIZE = 10000
+# Longest a written record stays in the compressor before it is readable on disk
+FLUSH_SECONDS = 1.0
+SEGMENT_GLOB = "info-*.jsonl.gz"
+# Request fields ignored when no recording matches exactly (a UI asking for a shifted range)
+TIME_FIELDS = ("startTime", "endTime")
+
+def request_key(payload: Any) -> str:
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"))
+
+def loose_key(payload: Any) -> str:
+    """Key of a request with its time range dropped, at top level and inside "req"."""
+    if not isinstance(payload, dict):
+        return request_key(payload)
+    loose = {k: v for k, v in payload.items() if k not in TIME_FIELDS}
+    if isinstance(loose.get("req"), dict):
+        loose["req"] = {k: v for k, v in loose["req"].items() if k not in TIME_FIELDS}
+    return request_key(loose)
+
+def read_segments(directory: str):
+    """Records of every segment under directory, oldest segment first. A torn tail is skipped."""
+    for path in sorted(glob.glob(os.path.join(directory, SEGMENT_GLOB))):
+        try:
+            with gzip.open(path, "rt") as segment:
+                for line in segment:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        break  # partial last line of a segment that was being written
+        except (EOFError, OSError, zlib.error) as e:
+            # Killed mid-write: everything flushed before the tear was still read
+            print(f"[recorder] {os.path.basename(path)}: stopped at damaged tail ({e})", file=sys.stderr)
+
+class Recorder:
+    """
+    Append-only writer of upstream Info traffic.
+
+    record() only enqueues, so the request path never waits on compression
+    or disk; one writer thread batches records into the current segment and
+    flushes at least every FLUSH_SECONDS.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        segment_seconds: float = DEFAULT_SEGMENT_SECONDS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self._queue: "queue.Queue[Optional[Tuple[int, str, Any, Any]]]" = queue.Queue(queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._segment = None
+        self._segment_path: Optional[str] = None
+        self._segment_started = 0.0
+        self._segment_written = 0
+        self.records = 0
+        self.dropped = 0
+        self.bytes_written = 0
+        self.segments = 0
+        self.last_error: Optional[str] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="info-recorder", daemon=True)
+        self._thread.start()
+
+    def record(self, url_path: str, payload: Any, response: Any):
+        try:
+            self._queue.put_nowait((int(time.time() * 1000), url_path, payload, response))
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """Write what is queued and close the segment."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=10)
+        self._thread = None
+
+    def _open_segment(self, now_ms: int):
+        self._close_segment()
+        self._segment_path = os.path.join(self.directory, f"info-{now_ms:015d}.jsonl.gz")
+        self._segment = gzip.open(self._segment_path, "ab")
+        self._segment_started = time.monotonic()
+        self._segment_written = 0
+        self.segments += 1
+
+    def _close_segment(self):
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+    def _write(self, item: Tuple[int, str, Any, Any]):
+        t, url_path, payload, response = item
+        if (
+            self._segment is None
+            or self._segment_written >= self.segment_bytes
+            or time.monotonic() - self._segment_started >= self.segment_seconds
+        ):
+            self._open_segment(t)
+        line = json.dumps({"t": t, "path": url_path, "req": payload, "res": response}).encode() + b"\n"
+        self._segment.write(line)
+        self._segment_written += len(line)
+        self.bytes_written += len(line)
+        self.records += 1
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=FLUSH_SECONDS)
+            except queue.Empty:
+                continue
+            try:
+                while item is not None:
+                    self._write(item)
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if self._segment is not None:
+                    # Sync-flush so a reader (or a crash) sees every record written so far
+                    self._segment.flush()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"[recorder] write failed: {e}", file=sys.stderr)
+            if item is None:
+                self._close_segment()
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": "record",
+            "directory": self.directory,
+            "segment": os.path.basename(self._segment_path) if self._segment_path else None,
+            "segments": self.segments,
+            "records": self.records,
+            "queued": self._queue.qsize(),
+            "dropped": self.dropped,
+            "bytes_written": self.bytes_written,
+            "last_error": self.last_error,
+        }
+
+class ReplayUpstream:
+    """
+    Answers /info requests from recordings instead of the network.
+
+    At a numeric speed a replay clock starts at the first recorded time when
+    start() is called and runs `speed` times faster than the wall clock; each
+    request gets the newest recording of itself at or before that clock
+    (the earliest one before the clock reaches it). At "max" speed there is
+    no clock: successive requests for the same key step through its
+    recordings in order and then keep the last one, so a run is repeatable
+    for a given request sequence. A request never recorded exactly falls
+    back to a recording of it with another time range.
+    """
+
+    def __init__(self, directory: str, speed: Union[float, str] = 1.0, loop: bool = False):
+        self.directory = directory
+        self.max_speed = speed == "max"
+        self.speed = None if self.max_speed else float(speed)
+        self.loop = loop
+        self._times: Dict[str, List[int]] = {}
+        self._responses: Dict[str, List[Any]] = {}
+        self._loose: Dict[str, str] = {}
+        self._cursors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.first_ms = 0
+        self.last_ms = 0
+        self._started: Optional[float] = None
+        self.records = 0
+        self.served = 0
+        self.fallbacks = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        for record in read_segments(self.directory):
+            if record.get("path", "/info") != "/info":
+                continue
+            key = request_key(record["req"])
+            self._times.setdefault(key, []).append(record["t"])
+            self._responses.setdefault(key, []).append(record["res"])
+            # Newest recording of a shape wins as its fallback
+            self._loose[loose_key(record["req"])] = key
+            self.first_ms = record["t"] if not self.records else min(self.first_ms, record["t"])
+            self.last_ms = max(self.last_ms, record["t"])
+            self.records += 1
+        if not self.records:
+            raise ValueError(f"No recordings under {self.directory}")
+
+    def start(self):
+        """Start the replay clock (the first request starts it otherwise)."""
+        with self._lock:
+            if self._started is None:
+                self._started = time.monotonic()
+
+    def clock_ms(self) -> int:
+        """Recorded time the replay has reached."""
+        if self._started is None:
+            self.start()
+        elapsed = (time.monotonic() - self._started) * 1000 * self.speed
+        span = self.last_ms - self.first_ms + 1
+        if self.loop:
+            elapsed %= span
+        return self.first_ms + int(elapsed)
+
+    def post(self, payload: Any) -> Any:
+        key = request_key(payload)
+        with self._lock:
+            if key not in self._times:
+                key = self._loose.get(loose_key(payload))
+                if key is None:
+                    self.misses += 1
+                    raise LookupError(f"No recorded response for {request_key(payload)}")
+                self.fallbacks += 1
+            self.served += 1
+            responses = self._responses[key]
+            if self.max_speed:
+                index = self._cursors.get(key, 0)
+                self._cursors[key] = index + 1
+                return responses[index % len(responses)] if self.loop else responses[min(index, len(responses) - 1)]
+        index = bisect_right(self._times[key], self.clock_ms()) - 1
+        return responses[max(index, 0)]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": "replay",
+                "directory": self.directory,
+                "speed": "max" if self.max_speed else self.speed,
+                "loop": self.loop,
+                "records": self.records,
+                "requests": len(self._times),
+                "first_ms": self.first_ms,
+                "last_ms": self.last_ms,
+                "clock_ms": None if self.max_speed or self._started is None else self.clock_ms(),
+                "served": self.served,
+                "fallbacks": self.fallbacks,
+                "misses": self.misses,
+            }
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Vectorized liquidation-risk scanner.
+Holds every watched user's positions in NumPy arrays and recomputes the
+distance to liquidation for all of them in one pass per mids update,
+emitting an event as soon as a position crosses a risk threshold.
+"""
+
+import heapq
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Distance-to-liquidation thresholds in percent of mark, loosest first:
+# below 25% is a warning and below 10% is critical, as in liquidation_monitor.ts
+DEFAULT_THRESHOLDS = (25.0, 10.0)
+LEVELS = ("ok", "warning", "critical")
+# A position must move this many points back past a threshold to step down,
+# so one jittering around the line does not emit an event per tick
+DEFAULT_HYSTERESIS = 1.0
+
+# Positions are re-read per user, at-risk users much more often
+REFRESH_SECONDS = 60.0
+AT_RISK_REFRESH_SECONDS = 5.0
+TICK_SECONDS = 1.0
+MAX_REFRESHES_PER_TICK = 50
+REFRESH_WORKERS = 8
+INITIAL_CAPACITY = 256
+
+# Position table columns: (attribute, dtype, value of an empty slot)
+_COLUMNS = (
+    ("_user", np.int32, -1),
+    ("_coin", np.int32, 0),
+    ("_size", np.float64, 0.0),
+    ("_entry", np.float64, 0.0),
+    ("_liq", np.float64, 0.0),
+    ("_margin", np.float64, 0.0),
+    ("_level", np.int8, 0),
+    ("_active", np.bool_, False),
+)
+
+class RiskScanner:
+    """
+    Structure-of-arrays position table with incremental per-user refresh.
+
+    Each position occupies one slot; refreshing a user frees and refills only
+    that user's slots. Mids arrive from the market stream (on_mids) or, when
+    fetch_mids is given, from polling on the refresh thread.
+    """
+
+    def __init__(
+        self,
+        fetch_state: Callable[[str], Dict[str, Any]],
+        emit: Callable[[Dict[str, Any]], None],
+        fetch_mids: Optional[Callable[[], Dict[str, str]]] = None,
+        thresholds: Iterable[float] = DEFAULT_THRESHOLDS,
+        hysteresis: float = DEFAULT_HYSTERESIS,
+    ):
+        self._fetch_state = fetch_state
+        self._emit = emit
+        self._fetch_mids = fetch_mids
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._pool = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix="risk-refresh")
+        self.configure(thresholds, hysteresis)
+
+        self._users: List[str] = []
+        self._user_index: Dict[str, int] = {}
+        self._user_slots: Dict[str, List[int]] = {}
+        self._coins: List[str] = []
+        self._coin_index: Dict[str, int] = {}
+        self._prices = np.full(0, np.nan)
+        self._free: List[int] = []
+        self._n = 0
+        for name, dtype, fill in _COLUMNS:
+            setattr(self, name, np.full(0, fill, dtype=dtype))
+        self._alloc(INITIAL_CAPACITY)
+
+        # (due time, address) refresh schedule; stale entries are skipped
+        self._due: List[tuple] = []
+        self._next_refresh: Dict[str, float] = {}
+        self.scans = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.events = 0
+        self.last_scan_ms = 0.0
+
+    def configure(self, thresholds: Iterable[float], hysteresis: float = DEFAULT_HYSTERESIS):
+        thresholds = sorted((float(t) for t in thresholds), reverse=True)
+        if len(thresholds) != len(LEVELS) - 1:
+            raise ValueError(f"Expected {len(LEVELS) - 1} thresholds, got {len(thresholds)}")
+        self.thresholds = np.array(thresholds)
+        self.hysteresis = float(hysteresis)
+
+    # ------------------------------------------------------------------
+    # Position table
+    # ------------------------------------------------------------------
+
+    def _alloc(self, capacity: int):
+        """Grow every column to `capacity` slots, keeping existing ones."""
+        for name, dtype, fill in _COLUMNS:
+            grown = np.full(capacity, fill, dtype=dtype)
+            grown[: self._n] = getattr(self, name)
+            setattr(self, name, grown)
+        # Hand out low slots first so active rows stay packed
+        self._free.extend(range(capacity - 1, self._n - 1, -1))
+        self._n = capacity
+
+    def _release(self, slot: int):
+        self._active[slot] = False
+        self._level[slot] = 0
+        self._free.append(slot)
+
+    def _coin_id(self, coin: str) -> int:
+        index = self._coin_index.get(coin)
+        if index is None:
+            index = self._coin_index[coin] = len(self._coins)
+            self._coins.append(coin)
+            self._prices = np.append(self._prices, np.nan)
+        return index
+
+    def set_positions(self, address: str, state: Dict[str, Any]):
+        """Replace one user's rows from a clearinghouseState response."""
+        with self._lock:
+            if address not in self._user_index:
+                return  # unwatched while the refresh was in flight
+            previous = {}
+            for slot in self._user_slots.pop(address, []):
+                previous[self._coins[self._coin[slot]]] = self._level[slot]
+                self._release(slot)
+            slots = []
+            for item in state.get("assetPositions", []):
+                position = item.get("position", {})
+                size = float(position.get("szi") or 0)
+                if size == 0:
+                    continue
+                if not self._free:
+                    self._alloc(self._n * 2)
+                slot = self._free.pop()
+                coin = position["coin"]
+                self._user[slot] = self._user_index[address]
+                self._coin[slot] = self._coin_id(coin)
+                self._size[slot] = size
+                self._entry[slot] = float(position.get("entryPx") or 0)
+                self._liq[slot] = float(position.get("liquidationPx") or 0)
+                self._margin[slot] = float(position.get("marginUsed") or 0)
+                # Keep the level across refreshes so an unchanged position does not re-alert
+                self._level[slot] = previous.get(coin, 0)
+                self._active[slot] = True
+                slots.append(slot)
+            self._user_slots[address] = slots
+
+    def watch(self, addresses: Iterable[str], replace: bool = False) -> int:
+        """Start monitoring addresses; their positions load on the refresh thread."""
+        # Keyed lowercase, as fills report them, whatever case callers watch with
+        addresses = list(dict.fromkeys(address.lower() for address in addresses))
+        if replace:
+            keep = set(addresses)
+            with self._lock:
+                dropped = [a for a in self._user_index if a not in keep]
+            self.unwatch(dropped)
+        added = 0
+        with self._lock:
+            for address in addresses:
+                if address in self._user_index:
+                    continue
+                self._user_index[address] = len(self._users)
+                self._users.append(address)
+                added += 1
+        for address in addresses:
+            self.refresh_soon(address)
+        return added
+
+    def unwatch(self, addresses: Iterable[str]) -> int:
+        removed = 0
+        with self._lock:
+            for address in addresses:
+                address = address.lower()
+                if self._user_index.pop(address, None) is None:
+                    continue
+                for slot in self._user_slots.pop(address, []):
+                    self._release(slot)
+                self._next_refresh.pop(address, None)
+                removed += 1
+        return removed
+
+    def refresh_soon(self, address: str):
+        """Re-read an address on the next tick (e.g. after it traded)."""
+        address = address.lower()
+        with self._lock:
+            if address in self._user_index:
+                self._schedule(address, time.monotonic())
+
+    def _schedule(self, address: str, due: float):
+        self._next_refresh[address] = due
+        heapq.heappush(self._due, (due, address))
+
+    # ------------------------------------------------------------------
+    # Scanning
+    # ------------------------------------------------------------------
+
+    def on_mids(self, mids: Dict[str, str]):
+        """Update marks and rescan every position."""
+        with self._lock:
+            for coin, index in self._coin_index.items():
+                mid = mids.get(coin)
+                if mid is not None:
+                    self._prices[index] = float(mid)
+        self.scan()
+
+    def _distances(self, n: int) -> np.ndarray:
+        """Percent distance from mark to liquidation price; NaN where not computable."""
+        mark = self._prices[self._coin[:n]]
+        liq = self._liq[:n]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            distance = np.where(self._size[:n] > 0, mark - liq, liq - mark) / mark * 100
+        valid = self._active[:n] & (liq > 0) & (mark > 0)
+        return np.where(valid, distance, np.nan)
+
+    def scan(self) -> int:
+        """One vectorized pass over all positions; emits an event per level change."""
+        started = time.perf_counter()
+        with self._lock:
+            n = self._n
+            distance = self._distances(n)
+            # NaN compares False everywhere, so unknown positions sit at level 0
+            enter = (distance[:, None] < self.thresholds[None, :]).sum(axis=1)
+            stay = (distance[:, None] < self.thresholds[None, :] + self.hysteresis).sum(axis=1)
+            level = self._level[:n].astype(np.int64)
+            new_level = np.where(enter > level, enter, np.minimum(level, stay))
+            changed = np.flatnonzero(new_level != level)
+            events = [self._event(int(slot), float(distance[slot]), int(level[slot]), int(new_level[slot]))
+                      for slot in changed]
+            self._level[changed] = new_level[changed]
+            now = time.monotonic()
+            for slot in changed:
+                if new_level[slot] > 0:
+                    address = self._users[self._user[slot]]
+                    if self._next_refresh.get(address, 0) > now + AT_RISK_REFRESH_SECONDS:
+                        self._schedule(address, now + AT_RISK_REFRESH_SECONDS)
+            self.scans += 1
+            self.last_scan_ms = (time.perf_counter() - started) * 1000
+        for event in events:
+            self.events += 1
+            self._emit(event)
+        return len(events)
+
+    def _event(self, slot: int, distance: float, previous: int, level: int) -> Dict[str, Any]:
+        return {
+            "event": "liquidation_risk",
+            "data": self._position(slot, distance, level) | {"previousLevel": LEVELS[previous]},
+        }
+
+    def _position(self, slot: int, distance: float, level: int) -> Dict[str, Any]:
+        coin = self._coin[slot]
+        return {
+            "address": self._users[self._user[slot]],
+            "coin": self._coins[coin],
+            "size": float(self._size[slot]),
+            "entryPx": float(self._entry[slot]),
+            "liquidationPx": float(self._liq[slot]),
+            "markPx": float(self._prices[coin]),
+            "marginUsed": float(self._margin[slot]),
+            "distancePercent": None if np.isnan(distance) else distance,
+            "level": LEVELS[level],
+        }
+
+    def snapshot(self, max_distance: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Positions within max_distance of liquidation (default: the loosest threshold), nearest first."""
+        limit = self.thresholds[0] if max_distance is None else float(max_distance)
+        with self._lock:
+            distance = self._distances(self._n)
+            slots = np.flatnonzero(distance < limit)
+            slots = slots[np.argsort(distance[slots])]
+            return [self._position(int(s), float(distance[s]), int(self._level[s])) for s in slots]
+
+    # ------------------------------------------------------------------
+    # Refresh thread
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="risk-scanner", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(TICK_SECONDS):
+            try:
+                self._refresh_due()
+                # Only poll mids while someone is watched
+                if self._fetch_mids is not None and self._user_index:
+                    self.on_mids(self._fetch_mids())
+            except Exception as e:
+                print(f"[risk-scanner] {e}", file=sys.stderr)
+
+    def _refresh_due(self):
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            while self._due and self._due[0][0] <= now and len(due) < MAX_REFRESHES_PER_TICK:
+                at, address = heapq.heappop(self._due)
+                if self._next_refresh.get(address) == at:
+                    due.append(address)
+        if due:
+            list(self._pool.map(self._refresh, due))
+
+    def _refresh(self, address: str):
+        try:
+            self.set_positions(address, self._fetch_state(address))
+            self.refreshes += 1
+        except Exception as e:
+            self.refresh_errors += 1
+            print(f"[risk-scanner] refresh {address} failed: {e}", file=sys.stderr)
+        with self._lock:
+            if address in self._user_index:
+                at_risk = any(self._level[slot] > 0 for slot in self._user_slots.get(address, []))
+                self._schedule(address, time.monotonic() + (AT_RISK_REFRESH_SECONDS if at_risk else REFRESH_SECONDS))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            levels = self._level[: self._n][self._active[: self._n]]
+            return {
+                "users": len(self._user_index),
+                "positions": int(self._active.sum()),
+                "coins": len(self._coins),
+                "by_level": {name: int((levels == i).sum()) for i, name in enumerate(LEVELS)},
+                "thresholds": self.thresholds.tolist(),
+                "scans": self.scans,
+                "last_scan_ms": self.last_scan_ms,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+                "events": self.events,
+            }
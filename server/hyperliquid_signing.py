@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Process-pool signing for exchange actions.
+L1 action signing (msgpack hash + EIP-712 over secp256k1) is pure CPU work
+that holds the GIL, so during order bursts it serializes every trading
+thread. The pool moves it to worker processes; request threads only build
+the action and take its nonce, then wait on the signature.
+"""
+
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from eth_account import Account
+from hyperliquid.utils.signing import sign_l1_action as _sign_l1_action
+from hyperliquid_metrics import Histogram
+
+# Leave a core for the request threads; on one core the pool would only add IPC
+DEFAULT_SIGN_WORKERS = max(0, min(4, (os.cpu_count() or 1) - 1))
+SIGN_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+
+# Derived key objects by key id, kept for the worker's lifetime
+_worker_wallets: Dict[int, Any] = {}
+
+def _worker_init():
+    # Ctrl-C reaches the whole process group; the daemon shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def _worker_pid(_index: int) -> int:
+    return os.getpid()
+
+def _sign(key_id: int, key: Optional[bytes], action: Dict[str, Any], vault_address: Optional[str], nonce: int,
+          expires_after: Optional[int], is_mainnet: bool):
+    """
+    Runs in a worker: sign one action, returning (signature, seconds spent
+    signing), or None when this worker has not been sent the key yet.
+    """
+    started = time.perf_counter()
+    wallet = _worker_wallets.get(key_id)
+    if wallet is None:
+        if key is None:
+            return None
+        wallet = _worker_wallets[key_id] = Account.from_key(key)
+    signature = _sign_l1_action(wallet, action, vault_address, nonce, expires_after, is_mainnet)
+    return signature, time.perf_counter() - started
+
+class SigningPool:
+    """
+    Drop-in replacement for the SDK's sign_l1_action backed by worker processes.
+
+    Keys cross to each worker once: calls carry only a key id, and a worker
+    that has not seen the id answers None, so the call is retried with the
+    key. Nonces are allocated by the caller before hand-off, so parallel
+    signing never reorders them; the exchange accepts any unique nonce above
+    the lowest of an account's 100 most recent, so signatures finishing out
+    of order stay valid. Until start() is called (or after the pool breaks)
+    actions are signed inline on the calling thread.
+    """
+
+    def __init__(self):
+        self.workers = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.sign_seconds = Histogram(SIGN_BUCKETS)
+        self.wait_seconds = Histogram(SIGN_BUCKETS)
+        self._key_ids: Dict[bytes, int] = {}
+        self.inflight = 0
+        self.inline = 0
+        self.failures = 0
+
+    def start(self, workers: int = DEFAULT_SIGN_WORKERS):
+        """Fork the workers. Call before starting other threads so none is forked mid-lock."""
+        if workers <= 0 or self._pool is not None:
+            return
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork") if "fork" in methods else None
+        self._pool = ProcessPoolExecutor(workers, mp_context=context, initializer=_worker_init)
+        # A fork-context pool creates every worker on first submit; do it now
+        list(self._pool.map(_worker_pid, range(workers)))
+        self.workers = workers
+
+    def shutdown(self):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def sign_l1_action(self, wallet, action, vault_address, nonce, expires_after, is_mainnet):
+        started = time.perf_counter()
+        pool = self._pool
+        signature = None
+        if pool is not None:
+            key = bytes(wallet.key)
+            with self._lock:
+                self.inflight += 1
+                key_id = self._key_ids.setdefault(key, len(self._key_ids))
+            try:
+                signing = (action, vault_address, nonce, expires_after, is_mainnet)
+                signed = pool.submit(_sign, key_id, None, *signing).result()
+                if signed is None:
+                    # First use of this key on that worker
+                    signed = pool.submit(_sign, key_id, key, *signing).result()
+                signature, seconds = signed
+            except BrokenProcessPool as e:
+                # A worker died (e.g. OOM-killed): keep trading on the inline path
+                with self._lock:
+                    self.failures += 1
+                    self._pool = None
+                    self.workers = 0
+                print(f"[signing] pool broken, signing inline: {e}", file=sys.stderr)
+            finally:
+                with self._lock:
+                    self.inflight -= 1
+        if signature is None:
+            signature = _sign_l1_action(wallet, action, vault_address, nonce, expires_after, is_mainnet)
+            seconds = time.perf_counter() - started
+            with self._lock:
+                self.inline += 1
+        with self._lock:
+            self.sign_seconds.observe(seconds)
+            self.wait_seconds.observe(time.perf_counter() - started)
+        return signature
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sign = self.sign_seconds.summary()
+            mean = sign["mean"]
+            return {
+                "workers": self.workers,
+                "signed": self.sign_seconds.count,
+                "inline": self.inline,
+                "failures": self.failures,
+                "inflight": self.inflight,
+                # Time in the signer vs. the caller's total wait (adds queueing and IPC)
+                "sign_seconds": sign,
+                "wait_seconds": self.wait_seconds.summary(),
+                "max_signs_per_second": max(self.workers, 1) / mean if mean else None,
+            }
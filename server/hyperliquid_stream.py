@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+WebSocket-fed market state for the daemon.
+Subscribes to allMids, l2Book and trades and keeps the latest state in memory
+so mids and book reads can be answered without a REST round trip. Optionally
+also subscribes to one user's orderUpdates and userFills for account tracking.
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+DEFAULT_MAX_STALENESS_MS = 2000
+TRADES_PER_COIN = 200
+# The server drops connections that stay silent for 60s
+PING_INTERVAL_SECONDS = 30.0
+RECV_TIMEOUT_SECONDS = 1.0
+RECONNECT_MIN_SECONDS = 0.5
+RECONNECT_MAX_SECONDS = 30.0
+
+def ws_url_for(api_url: str) -> str:
+    """Derive the WebSocket endpoint from a REST base URL."""
+    return api_url.replace("https://", "wss://", 1).replace("http://", "ws://", 1).rstrip("/") + "/ws"
+
+class MarketStream:
+    """
+    Background WebSocket subscriber holding the latest mids, books and trades.
+
+    Every (re)connect subscribes again and re-seeds state from REST through
+    the supplied snapshot functions, so a dropped connection never leaves a
+    gap that looks fresh. Reads return None when the state is older than the
+    caller's staleness bound, letting the caller fall back to REST.
+    """
+
+    def __init__(
+        self,
+        ws_url: str,
+        coins: Iterable[str],
+        snapshot_mids: Optional[Callable[[], Dict[str, str]]] = None,
+        snapshot_book: Optional[Callable[[str], Dict[str, Any]]] = None,
+        user: Optional[str] = None,
+    ):
+        self.ws_url = ws_url
+        self.coins = list(coins)
+        # The exchange delivers order updates for one user per connection
+        self.user = user.lower() if user else None
+        self._snapshot_mids = snapshot_mids
+        self._snapshot_book = snapshot_book
+        self._mids: Optional[Dict[str, str]] = None
+        self._mids_at = 0.0
+        self._books: Dict[str, Dict[str, Any]] = {}
+        self._books_at: Dict[str, float] = {}
+        self._trades: Dict[str, deque] = {coin: deque(maxlen=TRADES_PER_COIN) for coin in self.coins}
+        self._listeners: Dict[str, List[Callable[[Any], None]]] = {
+            "allMids": [], "l2Book": [], "trades": [], "orderUpdates": [], "userFills": [], "connected": [],
+        }
+        self._ws = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.connected = False
+        self.reconnects = 0
+        self.messages = 0
+        self.last_error: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="market-stream", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        ws = self._ws
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+
+    def add_listener(self, channel: str, callback: Callable[[Any], None]):
+        """
+        Call back on every allMids / l2Book / trades / orderUpdates / userFills
+        update, or on each (re)connect for "connected" (on the stream thread).
+        """
+        self._listeners[channel].append(callback)
+
+    def _run(self):
+        backoff = RECONNECT_MIN_SECONDS
+        while not self._stop.is_set():
+            try:
+                self._session()
+                backoff = RECONNECT_MIN_SECONDS
+            except Exception as e:
+                self.last_error = str(e)
+                if self.connected:
+                    # The session got going before it dropped: retry promptly, not at the grown backoff
+                    backoff = RECONNECT_MIN_SECONDS
+                print(f"[market-stream] {e}; reconnecting in {backoff:.1f}s", file=sys.stderr)
+            self.connected = False
+            if self._stop.wait(backoff):
+                break
+            backoff = min(backoff * 2, RECONNECT_MAX_SECONDS)
+            self.reconnects += 1
+
+    def _session(self):
+        import websocket  # websocket-client ships with the Hyperliquid SDK
+
+        ws = websocket.create_connection(self.ws_url, timeout=10)
+        self._ws = ws
+        try:
+            self._subscribe(ws)
+            self.connected = True
+            self._resnapshot()
+            self._notify("connected", None)
+            ws.settimeout(RECV_TIMEOUT_SECONDS)
+            last_ping = time.monotonic()
+            while not self._stop.is_set():
+                if time.monotonic() - last_ping > PING_INTERVAL_SECONDS:
+                    ws.send(json.dumps({"method": "ping"}))
+                    last_ping = time.monotonic()
+                try:
+                    raw = ws.recv()
+                except websocket.WebSocketTimeoutException:
+                    continue
+                if not raw:
+                    raise ConnectionError("WebSocket closed by server")
+                self._on_message(json.loads(raw))
+        finally:
+            self._ws = None
+            ws.close()
+
+    def _subscribe(self, ws):
+        subscriptions = [{"type": "allMids"}]
+        for coin in self.coins:
+            subscriptions.append({"type": "l2Book", "coin": coin})
+            subscriptions.append({"type": "trades", "coin": coin})
+        if self.user:
+            subscriptions.append({"type": "orderUpdates", "user": self.user})
+            subscriptions.append({"type": "userFills", "user": self.user})
+        for subscription in subscriptions:
+            ws.send(json.dumps({"method": "subscribe", "subscription": subscription}))
+
+    def _resnapshot(self):
+        """Seed state from REST after (re)connecting."""
+        try:
+            if self._snapshot_mids is not None:
+                self._set_mids(self._snapshot_mids())
+            if self._snapshot_book is not None:
+                for coin in self.coins:
+                    book = self._snapshot_book(coin)
+                    current = self._books.get(coin)
+                    # Keep a newer book that already arrived over the socket
+                    if current is None or book.get("time", 0) >= current.get("time", 0):
+                        self._set_book(coin, book)
+        except Exception as e:
+            # The subscriptions deliver their own snapshots shortly anyway
+            self.last_error = f"resnapshot failed: {e}"
+            print(f"[market-stream] {self.last_error}", file=sys.stderr)
+
+    # ------------------------------------------------------------------
+    # Message handling
+    # ------------------------------------------------------------------
+
+    def _on_message(self, message: Dict[str, Any]):
+        self.messages += 1
+        channel = message.get("channel")
+        data = message.get("data")
+        if channel == "allMids":
+            self._set_mids(data.get("mids", {}))
+        elif channel == "l2Book":
+            self._set_book(data["coin"], data)
+        elif channel == "trades" and data:
+            trades = self._trades.setdefault(data[0]["coin"], deque(maxlen=TRADES_PER_COIN))
+            trades.extend(data)
+            self._notify("trades", data)
+        elif channel in ("orderUpdates", "userFills"):
+            self._notify(channel, data)
+
+    def _set_mids(self, mids: Dict[str, str]):
+        if self._mids is not None:
+            # allMids updates carry every coin, but merge in case of partial frames
+            mids = {**self._mids, **mids}
+        self._mids = mids
+        self._mids_at = time.monotonic()
+        self._notify("allMids", mids)
+
+    def _set_book(self, coin: str, book: Dict[str, Any]):
+        self._books[coin] = book
+        self._books_at[coin] = time.monotonic()
+        self._notify("l2Book", book)
+
+    def _notify(self, channel: str, data: Any):
+        for callback in self._listeners[channel]:
+            try:
+                callback(data)
+            except Exception as e:
+                print(f"[market-stream] {channel} listener failed: {e}", file=sys.stderr)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _age_ms(at: float) -> int:
+        return int((time.monotonic() - at) * 1000)
+
+    def mids(self, max_staleness_ms: int = DEFAULT_MAX_STALENESS_MS):
+        """Return (mids, age_ms), or None if there is no fresh state."""
+        if not self.connected or self._mids is None:
+            return None
+        age = self._age_ms(self._mids_at)
+        return (self._mids, age) if age <= max_staleness_ms else None
+
+    def book(self, coin: str, max_staleness_ms: int = DEFAULT_MAX_STALENESS_MS):
+        """Return (l2 book, age_ms), or None if the coin is not streamed or is stale."""
+        if not self.connected or coin not in self._books:
+            return None
+        age = self._age_ms(self._books_at[coin])
+        return (self._books[coin], age) if age <= max_staleness_ms else None
+
+    def trades(self, coin: str, limit: int = 50) -> List[Dict[str, Any]]:
+        trades = self._trades.get(coin)
+        return list(trades)[-limit:] if trades else []
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ws_url": self.ws_url,
+            "connected": self.connected,
+            "coins": self.coins,
+            "user": self.user,
+            "reconnects": self.reconnects,
+            "messages": self.messages,
+            "last_error": self.last_error,
+            "mids_age_ms": self._age_ms(self._mids_at) if self._mids is not None else None,
+            "book_age_ms": {coin: self._age_ms(at) for coin, at in self._books_at.items()},
+        }
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Cached Hyperliquid symbol table.
+Maps coin names to asset index and size/price precision for perps and spot,
+so order paths never need a metadata round trip.
+"""
+
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+# Hyperliquid precision rules: prices have at most 5 significant figures and
+# at most (MAX_DECIMALS - szDecimals) decimals; integer prices are always valid.
+PERP_MAX_DECIMALS = 6
+SPOT_MAX_DECIMALS = 8
+PRICE_SIG_FIGS = 5
+SPOT_ASSET_OFFSET = 10000
+
+DEFAULT_TTL_SECONDS = 300.0
+# Unknown coins trigger a reload, but no more often than this
+MISS_REFRESH_INTERVAL_SECONDS = 5.0
+
+class AssetInfo(NamedTuple):
+    name: str
+    asset: int
+    sz_decimals: int
+    px_decimals: int
+    is_spot: bool
+
+def build_symbol_map(meta: Dict[str, Any], spot_meta: Optional[Dict[str, Any]]) -> Dict[str, AssetInfo]:
+    """Build a coin name -> AssetInfo map from perp and spot metadata."""
+    symbols: Dict[str, AssetInfo] = {}
+
+    for idx, asset in enumerate(meta.get("universe", [])):
+        sz_decimals = int(asset.get("szDecimals", 0))
+        symbols[asset["name"]] = AssetInfo(
+            asset["name"], idx, sz_decimals, max(PERP_MAX_DECIMALS - sz_decimals, 0), False
+        )
+
+    if spot_meta:
+        tokens = {token["index"]: token for token in spot_meta.get("tokens", [])}
+        for pair in spot_meta.get("universe", []):
+            base, quote = pair["tokens"]
+            sz_decimals = int(tokens.get(base, {}).get("szDecimals", 0))
+            info = AssetInfo(
+                pair["name"],
+                SPOT_ASSET_OFFSET + pair["index"],
+                sz_decimals,
+                max(SPOT_MAX_DECIMALS - sz_decimals, 0),
+                True,
+            )
+            symbols.setdefault(pair["name"], info)
+            # Also accept the readable "BASE/QUOTE" form for "@123" style pairs
+            if base in tokens and quote in tokens:
+                symbols.setdefault(f'{tokens[base]["name"]}/{tokens[quote]["name"]}', info)
+
+    return symbols
+
+def round_size(sz: float, sz_decimals: int) -> float:
+    """Round an order size to the asset's lot size."""
+    return round(float(sz), sz_decimals)
+
+def round_price(px: float, px_decimals: int) -> float:
+    """Round a price to 5 significant figures and the asset's decimal limit."""
+    px = float(px)
+    if abs(px) >= 10 ** PRICE_SIG_FIGS:
+        return float(round(px))
+    return round(float(f"{px:.{PRICE_SIG_FIGS}g}"), px_decimals)
+
+def to_wire(x: float) -> str:
+    """Format an already-rounded number the way the exchange expects it."""
+    normalized = Decimal(f"{x:.8f}").normalize()
+    return "0" if normalized.is_zero() else f"{normalized:f}"
+
+class SymbolTable:
+    """
+    Memoized coin -> AssetInfo lookups.
+
+    Metadata is loaded on first use. Lookups are plain dict reads; once the TTL
+    has passed, a background reload is started and the current map keeps
+    serving until it lands. An unknown coin forces a synchronous reload
+    (rate limited) so newly listed assets are picked up without a restart.
+    """
+
+    def __init__(
+        self,
+        load_meta: Callable[[], Dict[str, Any]],
+        load_spot_meta: Optional[Callable[[], Dict[str, Any]]] = None,
+        ttl: float = DEFAULT_TTL_SECONDS,
+    ):
+        self._load_meta = load_meta
+        self._load_spot_meta = load_spot_meta
+        self._ttl = ttl
+        self._symbols: Optional[Dict[str, AssetInfo]] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def refresh(self) -> Dict[str, AssetInfo]:
+        """Reload metadata and atomically swap in the new map."""
+        meta = self._load_meta()
+        spot_meta = None
+        if self._load_spot_meta is not None:
+            try:
+                spot_meta = self._load_spot_meta()
+            except Exception:
+                # Perps still trade if spot metadata is unavailable
+                spot_meta = None
+        symbols = build_symbol_map(meta, spot_meta)
+        self._symbols = symbols
+        self._loaded_at = time.monotonic()
+        return symbols
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            except Exception:
+                pass  # keep serving the previous map; retried after the next lookup
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="symbol-refresh", daemon=True).start()
+
+    def get(self, coin: str) -> AssetInfo:
+        """Look up a coin, loading or refreshing metadata as needed."""
+        symbols = self._symbols
+        if symbols is None:
+            with self._lock:
+                symbols = self._symbols if self._symbols is not None else self.refresh()
+        elif time.monotonic() - self._loaded_at > self._ttl:
+            self._refresh_in_background()
+
+        info = symbols.get(coin)
+        if info is not None:
+            return info
+
+        # Unknown coin: reload once in case it was just listed
+        with self._lock:
+            if time.monotonic() - self._loaded_at > MISS_REFRESH_INTERVAL_SECONDS:
+                symbols = self.refresh()
+            else:
+                symbols = self._symbols
+        info = symbols.get(coin)
+        if info is None:
+            raise ValueError(f"Asset {coin} not found in universe")
+        return info
+
+    def asset_index(self, coin: str) -> int:
+        return self.get(coin).asset
+
+    def round_size(self, coin: str, sz: float) -> float:
+        return round_size(sz, self.get(coin).sz_decimals)
+
+    def round_price(self, coin: str, px: float) -> float:
+        return round_price(px, self.get(coin).px_decimals)
+
+    def size_wire(self, coin: str, sz: float) -> str:
+        return to_wire(self.round_size(coin, sz))
+
+    def price_wire(self, coin: str, px: float) -> str:
+        return to_wire(self.round_price(coin, px))
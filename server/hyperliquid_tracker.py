@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+In-memory position and open-order state per account.
+Kept current from our own order/cancel/modify responses and, when streamed,
+from orderUpdates/userFills, with periodic REST reconciliation, so closes,
+cancel-all and open-order reads need no pre-trade round trip.
+"""
+
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Unstreamed state is trusted for this long after a REST sync. Streamed state
+# is trusted while the stream is connected.
+DEFAULT_MAX_AGE_SECONDS = 10.0
+# Background reconciliation interval for every tracked account
+DEFAULT_RECONCILE_SECONDS = 30.0
+# Accounts not read or traded for this long stop being reconciled
+IDLE_SECONDS = 600.0
+TICK_SECONDS = 1.0
+
+FetchState = Callable[[str], Dict[str, Any]]
+FetchOrders = Callable[[str], List[Dict[str, Any]]]
+
+class AccountState:
+    """
+    Positions by coin and open orders by oid, with cloid and coin indexes.
+
+    Orders are kept in the REST openOrders shape and positions in the
+    clearinghouseState position shape, so reads can be returned as-is.
+    """
+
+    def __init__(self, address: str):
+        self.address = address
+        self.positions: Dict[str, Dict[str, Any]] = {}
+        self.orders: Dict[int, Dict[str, Any]] = {}
+        self._by_cloid: Dict[str, int] = {}
+        self._by_coin: Dict[str, set] = {}
+        self.synced_at: Optional[float] = None
+        self.used_at = time.monotonic()
+        self.needs_sync = True
+        # Set while a REST sync is in flight: updates applied meanwhile are
+        # recorded so the (possibly older) snapshot does not undo them
+        self._touched_coins: Optional[set] = None
+        self._order_ops: Optional[list] = None
+        self.sync_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Orders
+    # ------------------------------------------------------------------
+
+    def upsert_order(self, order: Dict[str, Any]):
+        oid = int(order["oid"])
+        self._drop_order(oid)
+        self.orders[oid] = order
+        if order.get("cloid"):
+            self._by_cloid[order["cloid"]] = oid
+        self._by_coin.setdefault(order["coin"], set()).add(oid)
+        if self._order_ops is not None:
+            self._order_ops.append((self.upsert_order, order))
+
+    def remove_order(self, oid: int):
+        self._drop_order(int(oid))
+        if self._order_ops is not None:
+            self._order_ops.append((self.remove_order, oid))
+
+    def _drop_order(self, oid: int):
+        order = self.orders.pop(oid, None)
+        if order is None:
+            return
+        if order.get("cloid"):
+            self._by_cloid.pop(order["cloid"], None)
+        coin_oids = self._by_coin.get(order["coin"])
+        if coin_oids is not None:
+            coin_oids.discard(oid)
+            if not coin_oids:
+                del self._by_coin[order["coin"]]
+
+    def reduce_order(self, oid: int, filled_sz: float):
+        """Shrink a resting order by a fill, dropping it once fully filled."""
+        order = self.orders.get(int(oid))
+        if order is None:
+            return
+        remaining = float(order["sz"]) - filled_sz
+        if remaining <= 1e-12:
+            self.remove_order(oid)
+        else:
+            self.upsert_order(dict(order, sz=str(remaining)))
+
+    def open_orders(self, coin: Optional[str] = None) -> List[Dict[str, Any]]:
+        if coin is None:
+            return list(self.orders.values())
+        return [self.orders[oid] for oid in self._by_coin.get(coin, ())]
+
+    def oid_for_cloid(self, cloid: str) -> Optional[int]:
+        return self._by_cloid.get(cloid)
+
+    # ------------------------------------------------------------------
+    # Positions
+    # ------------------------------------------------------------------
+
+    def set_position_size(self, coin: str, szi: float):
+        if self._touched_coins is not None:
+            self._touched_coins.add(coin)
+        if abs(szi) <= 1e-12:
+            self.positions.pop(coin, None)
+        else:
+            self.positions[coin] = dict(self.positions.get(coin) or {"coin": coin}, szi=str(szi))
+
+    def add_position_size(self, coin: str, delta: float):
+        self.set_position_size(coin, self.position_size(coin) + delta)
+
+    def position_size(self, coin: str) -> float:
+        position = self.positions.get(coin)
+        return float(position["szi"]) if position else 0.0
+
+    # ------------------------------------------------------------------
+    # Reconciliation
+    # ------------------------------------------------------------------
+
+    def begin_sync(self):
+        self._touched_coins = set()
+        self._order_ops = []
+
+    def finish_sync(self, user_state: Dict[str, Any], open_orders: List[Dict[str, Any]]):
+        """Replace state from REST, keeping anything applied while the fetch was in flight."""
+        touched, ops = self._touched_coins, self._order_ops
+        self._touched_coins = self._order_ops = None
+
+        positions = {}
+        for item in user_state.get("assetPositions", []):
+            position = item.get("position", {})
+            if float(position.get("szi") or 0) != 0:
+                positions[position["coin"]] = position
+        for coin in touched or ():
+            positions.pop(coin, None)
+            if coin in self.positions:
+                positions[coin] = self.positions[coin]
+        self.positions = positions
+
+        self.orders, self._by_cloid, self._by_coin = {}, {}, {}
+        for order in open_orders:
+            self.upsert_order(order)
+        for op, arg in ops or ():
+            op(arg)
+
+        self.synced_at = time.monotonic()
+        # A snapshot that raced local updates may be stale; confirm soon
+        self.needs_sync = bool(touched or ops)
+
+    def abort_sync(self):
+        self._touched_coins = self._order_ops = None
+
+    def age(self) -> Optional[float]:
+        return None if self.synced_at is None else time.monotonic() - self.synced_at
+
+class AccountTracker:
+    """
+    AccountState per address plus the hooks that keep it current.
+
+    Addresses are tracked from their first read or trade. Reads go through
+    fresh(), which syncs from REST only when the state cannot be trusted: it
+    has never been synced, a sync was requested, or it is unstreamed and
+    older than max_age_seconds.
+    """
+
+    def __init__(
+        self,
+        fetch_state: FetchState,
+        fetch_orders: FetchOrders,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+        reconcile_seconds: float = DEFAULT_RECONCILE_SECONDS,
+    ):
+        self._fetch_state = fetch_state
+        self._fetch_orders = fetch_orders
+        self.max_age_seconds = max_age_seconds
+        self.reconcile_seconds = reconcile_seconds
+        self._accounts: Dict[str, AccountState] = {}
+        self._lock = threading.RLock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.streamed_user: Optional[str] = None
+        self.stream_connected: Callable[[], bool] = lambda: False
+        self.hits = 0
+        self.syncs = 0
+        self.sync_errors = 0
+
+    def configure(self, config: Optional[Dict[str, Any]] = None):
+        """Override max_age_seconds / reconcile_seconds (e.g. from the daemon init line)."""
+        config = config or {}
+        if config.get("max_age_seconds") is not None:
+            self.max_age_seconds = float(config["max_age_seconds"])
+        if config.get("reconcile_seconds") is not None:
+            self.reconcile_seconds = float(config["reconcile_seconds"])
+
+    def _state(self, address: str, touch: bool = True) -> AccountState:
+        address = address.lower()
+        with self._lock:
+            state = self._accounts.get(address)
+            if state is None:
+                state = self._accounts[address] = AccountState(address)
+            if touch:
+                state.used_at = time.monotonic()
+            return state
+
+    def streamed(self, address: str) -> bool:
+        return self.streamed_user == address.lower() and self.stream_connected()
+
+    def _trusted(self, state: AccountState) -> bool:
+        if state.synced_at is None or state.needs_sync:
+            return False
+        return self.streamed(state.address) or state.age() <= self.max_age_seconds
+
+    def sync(self, address: str) -> AccountState:
+        """Reload an account from REST (user state and open orders)."""
+        # Background reconciliation must not keep an idle account alive
+        state = self._state(address, touch=False)
+        started = time.monotonic()
+        with state.sync_lock:
+            # Someone else synced while we waited for the lock
+            if state.synced_at is not None and state.synced_at >= started and not state.needs_sync:
+                return state
+            with self._lock:
+                state.begin_sync()
+            try:
+                user_state = self._fetch_state(state.address)
+                open_orders = self._fetch_orders(state.address)
+            except Exception:
+                with self._lock:
+                    state.abort_sync()
+                self.sync_errors += 1
+                raise
+            with self._lock:
+                state.finish_sync(user_state, open_orders)
+            self.syncs += 1
+        return state
+
+    def fresh(self, address: str) -> AccountState:
+        """The account's state, synced first only if it cannot be trusted."""
+        state = self._state(address)
+        if self._trusted(state):
+            self.hits += 1
+            return state
+        return self.sync(address)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def open_orders(self, address: str, coin: Optional[str] = None) -> List[Dict[str, Any]]:
+        state = self.fresh(address)
+        with self._lock:
+            return state.open_orders(coin)
+
+    def current_open_orders(self, address: str, coin: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Open orders exact enough to act on: reloaded from REST unless the stream is feeding them."""
+        state = self._state(address)
+        if not (self._trusted(state) and self.streamed(state.address)):
+            state = self.sync(address)
+        with self._lock:
+            return state.open_orders(coin)
+
+    def position(self, address: str, coin: str) -> Optional[Dict[str, Any]]:
+        """Current position in a coin, or None if flat."""
+        state = self._state(address)
+        with self._lock:
+            # Without fills streamed, a resting order may have filled unseen
+            resting = bool(state.open_orders(coin)) and not self.streamed(state.address)
+        if resting:
+            state = self.sync(address)
+        else:
+            state = self.fresh(address)
+        with self._lock:
+            position = state.positions.get(coin)
+            return dict(position) if position else None
+
+    # ------------------------------------------------------------------
+    # Exchange responses
+    # ------------------------------------------------------------------
+
+    def on_orders(self, address: str, orders: List[Dict[str, Any]], statuses: List[Any]):
+        """
+        Apply order statuses. orders are {"coin", "is_buy", "sz", "limit_px",
+        "cloid"?}, aligned with the statuses of the exchange response.
+        """
+        state = self._state(address)
+        streamed = self.streamed(address)
+        now_ms = int(time.time() * 1000)
+        with self._lock:
+            for order, status in zip(orders, statuses):
+                if not isinstance(status, dict):
+                    # e.g. a trigger order acknowledged without an oid
+                    state.needs_sync = True
+                    continue
+                if "resting" in status:
+                    resting = status["resting"]
+                    entry = {
+                        "coin": order["coin"],
+                        "side": "B" if order["is_buy"] else "A",
+                        "limitPx": str(order["limit_px"]),
+                        "sz": str(order["sz"]),
+                        "oid": int(resting["oid"]),
+                        "timestamp": now_ms,
+                        "origSz": str(order["sz"]),
+                    }
+                    cloid = resting.get("cloid") or order.get("cloid")
+                    if cloid:
+                        entry["cloid"] = str(cloid)
+                    state.upsert_order(entry)
+                elif "filled" in status and not streamed:
+                    # Streamed fills carry the absolute position; don't count twice
+                    filled = float(status["filled"].get("totalSz") or 0)
+                    state.add_position_size(order["coin"], filled if order["is_buy"] else -filled)
+
+    def on_cancels(self, address: str, cancels: List[Dict[str, Any]], statuses: List[Any]):
+        """Apply cancel statuses for {"coin", "oid" | "cloid"} cancels."""
+        state = self._state(address)
+        with self._lock:
+            for cancel, status in zip(cancels, statuses):
+                oid = cancel.get("oid")
+                if oid is None and cancel.get("cloid"):
+                    oid = state.oid_for_cloid(str(cancel["cloid"]))
+                if status == "success" and oid is not None:
+                    state.remove_order(oid)
+                else:
+                    # Already filled or canceled elsewhere: REST knows the outcome
+                    state.needs_sync = True
+
+    def on_modifies(self, address: str, modifies: List[Dict[str, Any]], statuses: List[Any]):
+        """Apply batchModify statuses: the old oid goes away, the new order is applied."""
+        state = self._state(address)
+        with self._lock:
+            for modify, status in zip(modifies, statuses):
+                # Orders may be modified by cloid as well as by oid
+                oid = modify["oid"]
+                if not isinstance(oid, int) and not str(oid).isdigit():
+                    oid = state.oid_for_cloid(str(oid))
+                if isinstance(status, dict) and "error" not in status and oid is not None:
+                    state.remove_order(oid)
+                else:
+                    state.needs_sync = True
+        self.on_orders(address, modifies, statuses)
+
+    def forget(self, address: str):
+        with self._lock:
+            self._accounts.pop(address.lower(), None)
+
+    def invalidate(self, address: str):
+        """Force the next read to sync (e.g. after an action whose effect is unknown)."""
+        with self._lock:
+            self._state(address).needs_sync = True
+
+    # ------------------------------------------------------------------
+    # Stream updates (one user, as the exchange allows per connection)
+    # ------------------------------------------------------------------
+
+    def on_order_updates(self, updates: List[Dict[str, Any]]):
+        if self.streamed_user is None:
+            return
+        state = self._state(self.streamed_user)
+        with self._lock:
+            for update in updates:
+                order = update.get("order", {})
+                if update.get("status") == "open":
+                    state.upsert_order(order)
+                elif order.get("oid") is not None:
+                    state.remove_order(order["oid"])
+
+    def on_user_fills(self, data: Dict[str, Any]):
+        # The first message replays recent history, which REST sync already covers
+        if data.get("isSnapshot") or not data.get("user"):
+            return
+        state = self._state(data["user"])
+        with self._lock:
+            for fill in data.get("fills", []):
+                sz = float(fill["sz"])
+                signed = sz if fill["side"] == "B" else -sz
+                start = fill.get("startPosition")
+                if start is not None and not fill["coin"].startswith("@"):
+                    state.set_position_size(fill["coin"], float(start) + signed)
+                if fill.get("oid") is not None:
+                    state.reduce_order(fill["oid"], sz)
+
+    def on_stream_connected(self, _data: Any = None):
+        """Updates may have been missed while disconnected."""
+        if self.streamed_user is not None:
+            self.invalidate(self.streamed_user)
+
+    # ------------------------------------------------------------------
+    # Reconciliation thread
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="account-tracker", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(TICK_SECONDS):
+            now = time.monotonic()
+            with self._lock:
+                for address in [a for a, s in self._accounts.items() if now - s.used_at > IDLE_SECONDS]:
+                    del self._accounts[address]
+                due = [
+                    s.address for s in self._accounts.values()
+                    if s.needs_sync or s.synced_at is None or now - s.synced_at > self.reconcile_seconds
+                ]
+            for address in due:
+                try:
+                    self.sync(address)
+                except Exception as e:
+                    print(f"[account-tracker] sync {address} failed: {e}", file=sys.stderr)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "accounts": {
+                    s.address: {
+                        "positions": len(s.positions),
+                        "open_orders": len(s.orders),
+                        "age_seconds": s.age(),
+                        "streamed": self.streamed(s.address),
+                    }
+                    for s in self._accounts.values()
+                },
+                "max_age_seconds": self.max_age_seconds,
+                "reconcile_seconds": self.reconcile_seconds,
+                "hits": self.hits,
+                "syncs": self.syncs,
+                "sync_errors": self.sync_errors,
+            }
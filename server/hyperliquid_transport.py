@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Shared pooled HTTP transport for the Info and Exchange clients.
+One requests session with a bounded keep-alive pool serves every client, so
+an order reuses the connection a read just warmed. Idle connections are
+pinged before the server closes them and the first order after a quiet
+period does not pay a cold TCP/TLS handshake.
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Connections kept per host; callers beyond this wait for a free one
+DEFAULT_POOL_SIZE = 16
+# Connections opened at start and kept warm by pings
+DEFAULT_WARM_CONNECTIONS = 2
+# Ping when the pool has been idle this long (servers drop idle sockets at ~60s)
+DEFAULT_KEEPALIVE_SECONDS = 20.0
+# (connect, read) seconds per endpoint path. Info payloads (fills, candles)
+# can be large; an order should fail fast enough to be retried or reconciled.
+DEFAULT_TIMEOUTS = {
+    "/info": (3.05, 30.0),
+    "/exchange": (3.05, 10.0),
+}
+DEFAULT_TIMEOUT = (3.05, 30.0)
+
+Timeout = Tuple[float, float]
+
+class _TimedSession(requests.Session):
+    """Session that fills in the endpoint's timeouts when the caller gives none (the SDK never does)."""
+
+    def __init__(self, timeouts: Dict[str, Timeout]):
+        super().__init__()
+        self.timeouts = timeouts
+        self.timed_out: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def request(self, method, url, *args, **kwargs):
+        path = urlparse(url).path
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeouts.get(path, DEFAULT_TIMEOUT)
+        try:
+            return super().request(method, url, *args, **kwargs)
+        except requests.Timeout:
+            with self._lock:
+                self.timed_out[path] = self.timed_out.get(path, 0) + 1
+            raise
+
+class Transport:
+    """
+    Bounded connection pool shared by every Info/Exchange client of a process.
+
+    attach() swaps a client's private session for the shared one. Reuse is
+    read from urllib3's own per-pool counters: every request that did not
+    open a new connection went out on a warm one.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        warm_connections: int = DEFAULT_WARM_CONNECTIONS,
+        keepalive_seconds: float = DEFAULT_KEEPALIVE_SECONDS,
+        timeouts: Optional[Dict[str, Any]] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.warm_connections = min(warm_connections, pool_size)
+        self.keepalive_seconds = keepalive_seconds
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        for path, timeout in (timeouts or {}).items():
+            self.timeouts[path] = tuple(timeout)
+        self.session = _TimedSession(self.timeouts)
+        self.session.headers.update({"Content-Type": "application/json", "Accept-Encoding": "gzip, deflate"})
+        # pool_block bounds sockets per host instead of opening and discarding extras
+        self._adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+        self.session.hooks["response"].append(self._on_response)
+        self._lock = threading.Lock()
+        self._last_used = time.monotonic()
+        self._thread: Optional[threading.Thread] = None
+        self.responses = 0
+        self.compressed = 0
+        self.pings = 0
+        self.ping_failures = 0
+
+    def attach(self, client):
+        """Route a client (and an Exchange's embedded Info) through the shared session."""
+        client.session = self.session
+        info = getattr(client, "info", None)
+        if info is not None and hasattr(info, "session"):
+            info.session = self.session
+        return client
+
+    def _on_response(self, response, *args, **kwargs):
+        with self._lock:
+            self._last_used = time.monotonic()
+            self.responses += 1
+            if response.headers.get("Content-Encoding") in ("gzip", "deflate"):
+                self.compressed += 1
+
+    def ping(self) -> bool:
+        """Cheap round trip on a pooled connection; HEAD / carries no info weight."""
+        try:
+            self.session.head(self.base_url + "/", timeout=self.timeouts.get("/info", DEFAULT_TIMEOUT))
+            with self._lock:
+                self.pings += 1
+            return True
+        except requests.RequestException as e:
+            with self._lock:
+                self.ping_failures += 1
+            print(f"[transport] keep-alive ping failed: {e}", file=sys.stderr)
+            return False
+
+    def warm(self, connections: Optional[int] = None):
+        """Open (or refresh) this many pooled connections concurrently."""
+        count = self.warm_connections if connections is None else min(connections, self.pool_size)
+        if count <= 0:
+            return
+        with ThreadPoolExecutor(max_workers=count) as pool:
+            list(pool.map(lambda _: self.ping(), range(count)))
+
+    def start(self):
+        """Warm the pool now and keep it warm from a background thread."""
+        if self._thread is not None:
+            return
+        self.warm()
+        if self.keepalive_seconds > 0:
+            self._thread = threading.Thread(target=self._keepalive, name="http-keepalive", daemon=True)
+            self._thread.start()
+
+    def _keepalive(self):
+        while True:
+            with self._lock:
+                idle = time.monotonic() - self._last_used
+            if idle >= self.keepalive_seconds:
+                self.warm()
+                idle = 0.0
+            time.sleep(max(1.0, self.keepalive_seconds - idle))
+
+    def stats(self) -> Dict[str, Any]:
+        requests_sent = 0
+        connections = 0
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                requests_sent += pool.num_requests
+                connections += pool.num_connections
+        with self._lock:
+            return {
+                "base_url": self.base_url,
+                "pool_size": self.pool_size,
+                "requests": requests_sent,
+                "new_connections": connections,
+                # Share of requests (pings included) that went out on an already-open socket
+                "reuse_rate": 1 - connections / requests_sent if requests_sent else None,
+                "responses": self.responses,
+                "compressed_responses": self.compressed,
+                "pings": self.pings,
+                "ping_failures": self.ping_failures,
+                "idle_seconds": round(time.monotonic() - self._last_used, 3),
+                "timeouts": {path: list(timeout) for path, timeout in self.timeouts.items()},
+                "timed_out": dict(self.session.timed_out),
+            }
@@ -27,10 +27,15 @@ const ALERT_COOLDOWN = 15 * 60 * 1000; // 15 minutes between alerts
 /**
  * Check if a user needs a liquidation alert
  */
-async function checkUserLiquidation(userId: string, email: string): Promise<LiquidationAlert | null> {
+async function checkUserLiquidation(
+  userId: string,
+  email: string,
+  prefetchedState?: any,
+  prefetchedMids?: any
+): Promise<LiquidationAlert | null> {
   try {
-    // Get user state
-    const userState = await hyperliquidPersistent.getUserState(userId).catch(() =>
+    // Get user state (prefetched by the sweep when the daemon fan-out succeeded)
+    const userState = prefetchedState ?? await hyperliquidPersistent.getUserState(userId).catch(() =>
       hyperliquidHTTP.getUserState(userId)
     ) as any;
 
@@ -39,7 +44,7 @@ async function checkUserLiquidation(userId: string, email: string): Promise<Liqu
     }
 
     // Get current prices
-    const mids = await hyperliquidPersistent.getAllMids().catch(() =>
+    const mids = prefetchedMids ?? await hyperliquidPersistent.getAllMids().catch(() =>
       hyperliquidHTTP.getAllMids()
     ) as any;
 
@@ -91,6 +96,99 @@ async function checkUserLiquidation(userId: string, email: string): Promise<Liqu
   }
 }
 
+/**
+ * Send email/Telegram alerts for an alert and record each position
+ */
+async function deliverAlert(alert: LiquidationAlert) {
+  console.log(`[Liquidation Monitor] Alert needed for ${alert.email}:`, alert.positions.length, "positions at risk");
+
+  // Send email alert
+  const sent = await sendLiquidationWarning(alert.email, alert.positions);
+
+  // Send Telegram alerts
+  const userSettings = await db.getUserSettings(alert.userId);
+  if (userSettings?.telegramAlertsEnabled && userSettings?.telegramLiquidationAlerts && userSettings?.telegramChatId) {
+    const { sendLiquidationAlert } = await import('./telegram_bot');
+    const chatId = userSettings.telegramChatId;
+    for (const pos of alert.positions) {
+      await sendLiquidationAlert(chatId, pos);
+    }
+  }
+
+  // Log each position alert to database
+  for (const pos of alert.positions) {
+    const alertType = pos.distancePercent < 10 ? "critical" : "warning";
+
+    await db.saveLiquidationAlert({
+      id: `${alert.userId}_${pos.coin}_${Date.now()}`,
+      userId: alert.userId,
+      coin: pos.coin,
+      positionSize: pos.size,
+      currentPrice: pos.currentPrice,
+      liquidationPrice: pos.liquidationPrice,
+      distancePercent: pos.distancePercent.toString(),
+      alertType,
+      emailSent: sent,
+      emailError: sent ? null : "Failed to send email",
+    });
+  }
+
+  if (sent) {
+    lastAlertTime.set(alert.userId, Date.now());
+    console.log(`[Liquidation Monitor] Alert sent to ${alert.email}`);
+  }
+}
+
+// Users the daemon's risk scanner is watching, by lowercased address (as its
+// events report them), with their user id and email
+const watchedUsers = new Map<string, { id: string; email: string }>();
+
+// Positions the scanner last reported at warning/critical, by lowercased address then coin.
+// Kept until the scanner reports them ok, so a user who stays at risk is
+// re-alerted once the cooldown ends (or after a failed send).
+const atRisk = new Map<string, Map<string, LiquidationAlert["positions"][number]>>();
+
+/**
+ * Alert a watched user about their at-risk positions unless alerted within the cooldown
+ */
+async function alertIfDue(address: string) {
+  const positions = atRisk.get(address);
+  const user = watchedUsers.get(address);
+  const lastAlert = user && lastAlertTime.get(user.id);
+  if (!positions?.size || !user || (lastAlert && Date.now() - lastAlert < ALERT_COOLDOWN)) {
+    return;
+  }
+  try {
+    await deliverAlert({ userId: user.id, email: user.email, positions: Array.from(positions.values()) });
+  } catch (error: any) {
+    console.error(`[Liquidation Monitor] Error alerting ${address}:`, error.message);
+  }
+}
+
+/**
+ * Record the daemon's risk level for a position and alert as soon as it is due
+ */
+async function onRiskEvent(event: hyperliquidPersistent.LiquidationRiskEvent) {
+  let positions = atRisk.get(event.address);
+  if (event.level === "ok" || event.distancePercent === null) {
+    positions?.delete(event.coin);
+    if (positions?.size === 0) atRisk.delete(event.address);
+    return;
+  }
+  if (!positions) {
+    positions = new Map();
+    atRisk.set(event.address, positions);
+  }
+  positions.set(event.coin, {
+    coin: event.coin,
+    size: Math.abs(event.size).toFixed(4),
+    currentPrice: event.markPx.toFixed(2),
+    liquidationPrice: event.liquidationPx.toFixed(2),
+    distancePercent: event.distancePercent,
+  });
+  await alertIfDue(event.address);
+}
+
 /**
  * Check all users for liquidation risk
  */
@@ -101,58 +199,49 @@ async function checkAllUsers() {
 
     console.log(`[Liquidation Monitor] Checking ${users.length} users...`);
 
+    // Keep the daemon's scanner watching every user with an email; it alerts
+    // between sweeps, so the sweep only polls when the scanner is unavailable
+    watchedUsers.clear();
     for (const user of users) {
-      // Skip users without email
-      if (!user.email) {
-        continue;
+      if (user.email) watchedUsers.set(user.id.toLowerCase(), { id: user.id, email: user.email });
+    }
+    const scannerActive = await hyperliquidPersistent
+      .watchLiquidationRisk(Array.from(watchedUsers.keys()), true)
+      .then(() => true, () => false);
+    if (scannerActive) {
+      // Scanner events only mark level changes: re-check users it last saw at
+      // risk and repeat the alert once due (a closed position emits nothing)
+      for (const address of Array.from(atRisk.keys())) {
+        const user = watchedUsers.get(address);
+        const lastAlert = user && lastAlertTime.get(user.id);
+        if (!user) {
+          atRisk.delete(address);
+        } else if (!(lastAlert && Date.now() - lastAlert < ALERT_COOLDOWN)) {
+          const alert = await checkUserLiquidation(user.id, user.email);
+          if (alert) await deliverAlert(alert);
+          else atRisk.delete(address);
+        }
       }
+      return;
+    }
 
-      // Skip if we recently sent an alert to this user
+    // Skip users without email and users we recently alerted
+    const dueUsers = users.filter(user => {
       const lastAlert = lastAlertTime.get(user.id);
-      if (lastAlert && Date.now() - lastAlert < ALERT_COOLDOWN) {
-        continue;
-      }
+      return user.email && !(lastAlert && Date.now() - lastAlert < ALERT_COOLDOWN);
+    });
 
-      const alert = await checkUserLiquidation(user.id, user.email);
-
-      if (alert) {
-        console.log(`[Liquidation Monitor] Alert needed for ${user.email}:`, alert.positions.length, "positions at risk");
-
-        // Send email alert
-        const sent = await sendLiquidationWarning(alert.email, alert.positions);
-
-        // Send Telegram alerts
-        const userSettings = await db.getUserSettings(user.id);
-        if (userSettings?.telegramAlertsEnabled && userSettings?.telegramLiquidationAlerts && userSettings?.telegramChatId) {
-          const { sendLiquidationAlert } = await import('./telegram_bot');
-          const chatId = userSettings.telegramChatId;
-          for (const pos of alert.positions) {
-            await sendLiquidationAlert(chatId, pos);
-          }
-        }
+    // One daemon round trip for every user's state and one for prices;
+    // users missing from the fan-out fall back to per-user fetches
+    const states = await hyperliquidPersistent.getUserStates(dueUsers.map(user => user.id)).catch(() => null);
+    const mids = await hyperliquidPersistent.getAllMids().catch(() => undefined);
 
-        // Log each position alert to database
-        for (const pos of alert.positions) {
-          const alertType = pos.distancePercent < 10 ? "critical" : "warning";
-
-          await db.saveLiquidationAlert({
-            id: `${user.id}_${pos.coin}_${Date.now()}`,
-            userId: user.id,
-            coin: pos.coin,
-            positionSize: pos.size,
-            currentPrice: pos.currentPrice,
-            liquidationPrice: pos.liquidationPrice,
-            distancePercent: pos.distancePercent.toString(),
-            alertType,
-            emailSent: sent,
-            emailError: sent ? null : "Failed to send email",
-          });
-        }
+    for (const user of dueUsers) {
+      const state = states?.[user.id];
+      const alert = await checkUserLiquidation(user.id, user.email!, state?.success ? state.data : undefined, mids);
 
-        if (sent) {
-          lastAlertTime.set(user.id, Date.now());
-          console.log(`[Liquidation Monitor] Alert sent to ${user.email}`);
-        }
+      if (alert) {
+        await deliverAlert(alert);
       }
     }
   } catch (error: any) {
@@ -166,6 +255,8 @@ async function checkAllUsers() {
 export function startLiquidationMonitor() {
   console.log("[Liquidation Monitor] Starting...");
 
+  const stopEvents = hyperliquidPersistent.onDaemonEvent("liquidation_risk", onRiskEvent);
+
   // Check immediately on startup
   checkAllUsers();
 
@@ -176,6 +267,7 @@ export function startLiquidationMonitor() {
   return () => {
     console.log("[Liquidation Monitor] Stopping...");
     clearInterval(interval);
+    stopEvents();
   };
 }
 